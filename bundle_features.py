@@ -0,0 +1,8 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import sys
+
+from geometric_features.__main__ import bundle_features
+
+if __name__ == '__main__':
+    sys.exit(bundle_features())
@@ -1,3 +1,9 @@
+from geometric_features.__main__ import (
+    bundle_features as bundle_features,
+)
+from geometric_features.__main__ import (
+    cache_features as cache_features,
+)
 from geometric_features.__main__ import (
     combine_features as combine_features,
 )
@@ -25,15 +31,42 @@ from geometric_features.__main__ import (
 from geometric_features.__main__ import (
     tag_features as tag_features,
 )
+from geometric_features.bundle import (
+    build_bundles as build_bundles,
+)
+from geometric_features.catalog_cache import (
+    build_catalog_cache as build_catalog_cache,
+)
+from geometric_features.columnar import (
+    ColumnarGeometry as ColumnarGeometry,
+)
+from geometric_features.feature import (
+    Feature as Feature,
+)
 from geometric_features.feature_collection import (
     FeatureCollection as FeatureCollection,
 )
+from geometric_features.feature_collection import (
+    iter_features as iter_features,
+)
 from geometric_features.feature_collection import (
     read_feature_collection as read_feature_collection,
 )
 from geometric_features.geometric_features import (
     GeometricFeatures as GeometricFeatures,
 )
+from geometric_features.json_backend import (
+    get_json_backend as get_json_backend,
+)
+from geometric_features.json_backend import (
+    get_json_backends as get_json_backends,
+)
+from geometric_features.json_backend import (
+    set_json_backend as set_json_backend,
+)
+from geometric_features.utils import (
+    open_feature_file as open_feature_file,
+)
 from geometric_features.utils import (
     write_feature_names_and_tags as write_feature_names_and_tags,
 )
@@ -7,6 +7,66 @@ from geometric_features.geometric_features import GeometricFeatures
 from geometric_features.version import __version__
 
 
+def bundle_features():
+    """
+    Entry point for building single-file bundles of the features in the
+    geometric_data cache, one for each component and object type
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("-c", "--component", dest="component",
+                        help="The component (ocean, landice, etc.) to build "
+                             "bundles for, all components by default",
+                        metavar="COMP")
+    parser.add_argument("-b", "--object_type", dest="object_type",
+                        help="The type of geometry (point, transect or "
+                             "region) to build bundles for, all types by "
+                             "default",
+                        metavar="TYPE")
+    parser.add_argument("--cache", dest="cache_location",
+                        help="Location of local geometric_data cache.",
+                        metavar="PATH")
+    parser.add_argument('-v', '--version',
+                        action='version',
+                        version=f'geometric_features {__version__}',
+                        help="Show version number and exit")
+
+    args = parser.parse_args()
+
+    gf = GeometricFeatures(args.cache_location)
+    gf.build_bundles(args.component, args.object_type, quiet=False)
+
+
+def cache_features():
+    """
+    Entry point for building a binary cache of the features in the
+    geometric_data cache to speed up reading them
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("-c", "--component", dest="component",
+                        help="The component (ocean, landice, etc.) to build "
+                             "the cache for, all components by default",
+                        metavar="COMP")
+    parser.add_argument("-b", "--object_type", dest="object_type",
+                        help="The type of geometry (point, transect or "
+                             "region) to build the cache for, all types by "
+                             "default",
+                        metavar="TYPE")
+    parser.add_argument("--cache", dest="cache_location",
+                        help="Location of local geometric_data cache.",
+                        metavar="PATH")
+    parser.add_argument('-v', '--version',
+                        action='version',
+                        version=f'geometric_features {__version__}',
+                        help="Show version number and exit")
+
+    args = parser.parse_args()
+
+    gf = GeometricFeatures(args.cache_location)
+    gf.build_cache(args.component, args.object_type, quiet=False)
+
+
 def combine_features():
     """
     Entry point for combining features from a file
@@ -52,6 +112,10 @@ def difference_features():
     parser.add_argument("-o", "--output", dest="output_file_name",
                         help="Output file, e.g., features.geojson.",
                         metavar="PATH", default="features.geojson")
+    parser.add_argument("-j", "--jobs", dest="jobs", type=int, default=1,
+                        help="The number of processes to use to mask "
+                             "features",
+                        metavar="N")
     parser.add_argument('-v', '--version',
                         action='version',
                         version=f'geometric_features {__version__}',
@@ -61,7 +125,7 @@ def difference_features():
 
     fc = read_feature_collection(args.feature_file)
     maskingFC = read_feature_collection(args.mask_file)
-    fc = fc.difference(maskingFC)
+    fc = fc.difference(maskingFC, maxWorkers=args.jobs)
     fc.to_geojson(args.output_file_name)
 
 
@@ -261,6 +325,14 @@ def split_features():
                         help="Output directory, default is determined by the "
                              "component property",
                         metavar="PATH", default="./geometric_data")
+    parser.add_argument("--compression", dest="compression",
+                        choices=['gz', 'zst'],
+                        help="Compress each file with gzip or zstandard")
+    parser.add_argument("--compression_level", dest="compression_level",
+                        type=int,
+                        help="The compression level, 6 for gzip and 3 for "
+                             "zstandard by default",
+                        metavar="LEVEL")
     parser.add_argument('-v', '--version',
                         action='version',
                         version=f'geometric_features {__version__}',
@@ -269,7 +341,8 @@ def split_features():
 
     fc = read_feature_collection(args.feature_file)
     gf = GeometricFeatures()
-    gf.split(fc, args.output_dir_name)
+    gf.split(fc, args.output_dir_name, compression=args.compression,
+             compressionLevel=args.compression_level)
 
 
 def tag_features():
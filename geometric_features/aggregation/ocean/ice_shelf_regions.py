@@ -146,7 +146,9 @@ def ice_shelves(gf):
         fcShelf = gf.read(componentName='iceshelves', objectType='region',
                           tags=subNames, allTags=False)
 
-        fcShelf = fcShelf.combine(featureName=shelfName)
+        # ice-shelf regions share their boundaries, so they can be combined
+        # as a coverage
+        fcShelf = fcShelf.combine(featureName=shelfName, coverage=True)
 
         # merge the feature for the basin into the collection of all basins
         fc.merge(fcShelf)
@@ -157,7 +159,9 @@ def ice_shelves(gf):
         fcShelf = gf.read(componentName='iceshelves', objectType='region',
                           tags=[shelfName])
 
-        fcShelf = fcShelf.combine(featureName=shelfName)
+        # ice-shelf regions share their boundaries, so they can be combined
+        # as a coverage
+        fcShelf = fcShelf.combine(featureName=shelfName, coverage=True)
 
         # merge the feature for the basin into the collection of all basins
         fc.merge(fcShelf)
@@ -0,0 +1,412 @@
+import json
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.feather
+import pyarrow.parquet
+import shapely
+
+from geometric_features.columnar import ColumnarGeometry, from_shapely
+from geometric_features.feature_collection import FeatureCollection
+
+# the geometry types that have a GeoArrow-native encoding
+_geoArrowTypes = [
+    'Point',
+    'LineString',
+    'Polygon',
+    'MultiPoint',
+    'MultiLineString',
+    'MultiPolygon',
+]
+
+# field metadata marking property columns with json-encoded values
+_jsonKey = b'geometric_features:json'
+
+# schema metadata with the other properties of the feature collection
+_otherPropertiesKey = b'geometric_features:otherProperties'
+
+# marks properties that a feature doesn't have, as opposed to properties
+# that are null
+_missing = object()
+
+
+def to_arrow_table(fc, geometryEncoding=None):
+    """
+    Convert a feature collection to an Arrow table following the GeoParquet
+    convention, with one column for each property and a ``geometry`` column
+
+    Parameters
+    ----------
+    fc : geometric_features.FeatureCollection
+        The feature collection to convert
+
+    geometryEncoding : {'WKB', 'geoarrow'}, optional
+        Whether to encode geometries as well-known binary or with the
+        GeoArrow-native encoding for their geometry type, which is faster to
+        read but is only possible if all geometries have the same type.  By
+        default, the GeoArrow-native encoding is used whenever possible.
+
+    Returns
+    -------
+    table : pyarrow.Table
+        The table
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    features = fc.features
+    shapes = fc.get_shapes()
+    geomTypes = sorted({shape.geom_type for shape in shapes})
+    singleType = len(geomTypes) == 1 and geomTypes[0] in _geoArrowTypes
+
+    if geometryEncoding is None:
+        geometryEncoding = 'geoarrow' if singleType else 'WKB'
+    if geometryEncoding == 'WKB':
+        encoding = 'WKB'
+        geometry = pa.array(shapely.to_wkb(shapes), type=pa.binary())
+        extensionName = 'geoarrow.wkb'
+    elif geometryEncoding == 'geoarrow':
+        if not singleType:
+            raise ValueError(
+                f'The geoarrow encoding requires a single '
+                f'geometry type but found: '
+                f'{", ".join(geomTypes)}'
+            )
+        encoding = geomTypes[0].lower()
+        geometry = _to_geoarrow(shapes)
+        extensionName = f'geoarrow.{encoding}'
+    else:
+        raise ValueError(f'Unexpected geometry encoding {geometryEncoding}')
+
+    # keep the properties in the order they first appear
+    keys = dict()
+    for feature in features:
+        keys.update(dict.fromkeys(feature['properties']))
+
+    fields = []
+    columns = []
+    for key in keys:
+        field, column = _get_property_column(key, features)
+        fields.append(field)
+        columns.append(column)
+
+    fields.append(
+        pa.field(
+            'geometry',
+            geometry.type,
+            metadata={'ARROW:extension:name': extensionName},
+        )
+    )
+    columns.append(geometry)
+
+    if len(shapes) > 0:
+        bounds = shapely.total_bounds(shapes).tolist()
+    else:
+        bounds = []
+    geo = {
+        'version': '1.1.0',
+        'primary_column': 'geometry',
+        'columns': {
+            'geometry': {
+                'encoding': encoding,
+                'geometry_types': geomTypes,
+                'bbox': bounds,
+            }
+        },
+    }
+    metadata = {
+        b'geo': json.dumps(geo),
+        _otherPropertiesKey: json.dumps(fc.otherProperties),
+    }
+    schema = pa.schema(fields, metadata=metadata)
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def from_arrow_table(table, columnar=False):
+    """
+    Convert an Arrow table following the GeoParquet convention to a feature
+    collection
+
+    Parameters
+    ----------
+    table : pyarrow.Table
+        The table, with a geometry column and a column for each property
+
+    columnar : bool, optional
+        Whether to store the coordinates of each geometry in NumPy arrays
+        (see :class:`geometric_features.ColumnarGeometry`) rather than nested
+        lists
+
+    Returns
+    -------
+    fc : geometric_features.FeatureCollection
+        The feature collection
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    metadata = table.schema.metadata
+    if metadata is None or b'geo' not in metadata:
+        raise ValueError('The table does not have GeoParquet metadata')
+    geo = json.loads(metadata[b'geo'])
+    geometryName = geo['primary_column']
+    encoding = geo['columns'][geometryName]['encoding']
+
+    geometry = table.column(geometryName).combine_chunks()
+    if encoding == 'WKB':
+        shapes = shapely.from_wkb(geometry.to_numpy(zero_copy_only=False))
+    else:
+        shapes = _from_geoarrow(encoding, geometry)
+
+    geometries = from_shapely(shapes)
+    if not columnar:
+        geometries = [
+            geometry.to_geojson()
+            if isinstance(geometry, ColumnarGeometry)
+            else geometry
+            for geometry in geometries
+        ]
+
+    names = []
+    columns = []
+    for field in table.schema:
+        if field.name == geometryName:
+            continue
+        # features without the property have nulls in the column, whereas
+        # null properties are json-encoded (or, in tables that weren't
+        # written by to_arrow_table(), are treated as missing)
+        values = table.column(field.name).to_pylist()
+        if field.metadata is not None and _jsonKey in field.metadata:
+            values = [
+                _missing if value is None else json.loads(value)
+                for value in values
+            ]
+        else:
+            values = [_missing if value is None else value for value in values]
+        names.append(field.name)
+        columns.append(values)
+
+    fc = FeatureCollection()
+    for index, geometry in enumerate(geometries):
+        properties = dict()
+        for name, values in zip(names, columns, strict=True):
+            if values[index] is not _missing:
+                properties[name] = values[index]
+        fc.add_feature(
+            {'type': 'Feature', 'properties': properties, 'geometry': geometry}
+        )
+
+    if _otherPropertiesKey in metadata:
+        otherProperties = json.loads(metadata[_otherPropertiesKey])
+        for key in sorted(otherProperties):
+            fc.otherProperties[key] = otherProperties[key]
+    return fc
+
+
+def write_parquet(fc, fileName, geometryEncoding=None):
+    """
+    Write a feature collection to a GeoParquet file
+
+    Parameters
+    ----------
+    fc : geometric_features.FeatureCollection
+        The feature collection to write
+
+    fileName : str
+        The file to write to
+
+    geometryEncoding : {'WKB', 'geoarrow'}, optional
+        The encoding of the geometry column (see ``to_arrow_table()``)
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    table = to_arrow_table(fc, geometryEncoding)
+    pyarrow.parquet.write_table(table, fileName)
+
+
+def read_parquet(fileName, columns=None, columnar=False):
+    """
+    Read a feature collection from a GeoParquet file
+
+    Parameters
+    ----------
+    fileName : str
+        The file to read
+
+    columns : list of str, optional
+        The properties to read, all by default.  The ``name``, ``object`` and
+        ``component`` properties and the geometry are always read.
+
+    columnar : bool, optional
+        Whether to store the coordinates of each geometry in NumPy arrays
+
+    Returns
+    -------
+    fc : geometric_features.FeatureCollection
+        The feature collection
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    columns = _get_columns(pyarrow.parquet.read_schema(fileName), columns)
+    table = pyarrow.parquet.read_table(fileName, columns=columns)
+    return from_arrow_table(table, columnar)
+
+
+def write_arrow_ipc(fc, fileName, geometryEncoding=None):
+    """
+    Write a feature collection to an uncompressed Arrow IPC (Feather) file,
+    which can be memory-mapped when it is read
+
+    Parameters
+    ----------
+    fc : geometric_features.FeatureCollection
+        The feature collection to write
+
+    fileName : str
+        The file to write to
+
+    geometryEncoding : {'WKB', 'geoarrow'}, optional
+        The encoding of the geometry column (see ``to_arrow_table()``)
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    table = to_arrow_table(fc, geometryEncoding)
+    pyarrow.feather.write_feather(table, fileName, compression='uncompressed')
+
+
+def read_arrow_ipc(fileName, columns=None, columnar=False):
+    """
+    Read a feature collection from an Arrow IPC (Feather) file
+
+    Parameters
+    ----------
+    fileName : str
+        The file to read
+
+    columns : list of str, optional
+        The properties to read, all by default.  The ``name``, ``object`` and
+        ``component`` properties and the geometry are always read.
+
+    columnar : bool, optional
+        Whether to store the coordinates of each geometry in NumPy arrays
+
+    Returns
+    -------
+    fc : geometric_features.FeatureCollection
+        The feature collection
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    with pa.memory_map(fileName) as source:
+        table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(_get_columns(table.schema, columns))
+    return from_arrow_table(table, columnar)
+
+
+def _get_property_column(key, features):
+    """
+    Get the field and values of the column for a property.  Properties
+    missing from a feature are null.  Columns with values of a single scalar
+    type are stored natively, while others (e.g. lists or mixed types) are
+    stored as json strings so they round-trip exactly.
+    """
+    values = []
+    types = set()
+    hasNone = False
+    for feature in features:
+        properties = feature['properties']
+        if key in properties:
+            value = properties[key]
+            if value is None:
+                hasNone = True
+            types.add(type(value))
+        else:
+            value = None
+        values.append(value)
+
+    native = (
+        not hasNone
+        and len(types) == 1
+        and types.issubset({str, int, float, bool})
+    )
+    if native:
+        column = pa.array(values)
+        field = pa.field(key, column.type)
+    else:
+        values = [
+            None
+            if key not in feature['properties']
+            else json.dumps(feature['properties'][key])
+            for feature in features
+        ]
+        column = pa.array(values, type=pa.string())
+        field = pa.field(key, pa.string(), metadata={_jsonKey: b'true'})
+    return field, column
+
+
+def _get_columns(schema, columns):
+    """
+    Get the names of the columns to read, always including the properties
+    required of every feature and the geometry
+    """
+    if columns is None:
+        return None
+    geo = json.loads(schema.metadata[b'geo'])
+    columns = list(columns)
+    for column in ['name', 'object', 'component', geo['primary_column']]:
+        if column not in columns and column in schema.names:
+            columns.append(column)
+    return columns
+
+
+def _to_geoarrow(shapes):
+    """
+    Convert ``shapely`` geometries of a single type to a GeoArrow-native
+    array with separate x and y coordinates
+    """
+    _, coords, offsets = shapely.to_ragged_array(shapes, include_z=False)
+    array = pa.StructArray.from_arrays(
+        [pa.array(coords[:, 0]), pa.array(coords[:, 1])], names=['x', 'y']
+    )
+    # the offsets go from the innermost to the outermost level of nesting
+    for offset in offsets:
+        array = pa.ListArray.from_arrays(
+            pa.array(offset, type=pa.int32()), array
+        )
+    return array
+
+
+def _from_geoarrow(encoding, array):
+    """
+    Convert a GeoArrow-native array to ``shapely`` geometries
+    """
+    offsets = []
+    while pa.types.is_list(array.type) or pa.types.is_large_list(array.type):
+        offsets.append(array.offsets.to_numpy())
+        array = array.values
+    if pa.types.is_fixed_size_list(array.type):
+        coords = array.values.to_numpy().reshape((-1, array.type.list_size))[
+            :, 0:2
+        ]
+    else:
+        coords = np.column_stack(
+            [array.field('x').to_numpy(), array.field('y').to_numpy()]
+        )
+
+    geomType = shapely.GeometryType[encoding.upper()]
+    if len(offsets) == 0:
+        offsets = None
+    else:
+        offsets = tuple(reversed(offsets))
+    return shapely.from_ragged_array(geomType, coords, offsets)
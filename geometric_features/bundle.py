@@ -0,0 +1,303 @@
+import glob
+import hashlib
+import json
+import os
+import struct
+
+from geometric_features.catalog_cache import _is_current
+from geometric_features.columnar import ColumnarGeometry
+from geometric_features.feature_collection import FeatureCollection
+from geometric_features.json_backend import loads
+from geometric_features.utils import (
+    geojsonExtensions,
+    get_compression,
+    open_feature_file,
+)
+
+# the version of the bundle format, incremented if it changes so that
+# incompatible bundles are ignored
+_bundleVersion = 2
+
+# the end of each bundle file, after the offset of the index
+_magic = b'GFBUNDLE'
+
+# the offset of the index (a little-endian unsigned 64-bit integer) and the
+# magic bytes
+_trailer = struct.Struct('<Q8s')
+
+
+def build_bundles(
+    cacheLocation, componentName=None, objectType=None, quiet=True
+):
+    """
+    Build single-file bundles of the geometric features in a local cache of
+    geometric data, one for each component and object type.  Each bundle,
+    ``<cacheLocation>/<component>/<object>.bundle``, holds the contents of
+    each feature's ``geojson`` file followed by an index of where each
+    feature is in the bundle, so that features can be read without opening
+    a file for each feature.  The size, modification time and hash of each
+    file are stored as well, so that features whose files have changed can
+    be detected (see
+    :py:meth:`~geometric_features.bundle.FeatureBundle.is_current()`).
+
+    Parameters
+    ----------
+    cacheLocation : str
+        The location of the local geometric features cache
+
+    componentName : str, optional
+        A component to build bundles for, all components by default
+
+    objectType : {'point', 'transect', 'region'}, optional
+        An object type to build bundles for, all types by default
+
+    quiet : bool, optional
+        Whether to suppress printing of the bundles being built
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    for groupDir in sorted(glob.glob(os.path.join(cacheLocation, '*', '*'))):
+        if not os.path.isdir(groupDir):
+            continue
+        groupComponent = os.path.basename(os.path.dirname(groupDir))
+        groupObject = os.path.basename(groupDir)
+        if componentName is not None and groupComponent != componentName:
+            continue
+        if objectType is not None and groupObject != objectType:
+            continue
+        fileNames = sorted(
+            fileName
+            for fileName in glob.glob(
+                os.path.join(groupDir, '*', f'{groupObject}.geojson*')
+            )
+            if fileName.endswith(tuple(geojsonExtensions))
+        )
+        if len(fileNames) == 0:
+            continue
+        bundleFileName = _get_bundle_file_name(
+            cacheLocation, groupComponent, groupObject
+        )
+        if not quiet:
+            print(
+                f'Bundling {len(fileNames)} {groupComponent} {groupObject} '
+                f'features into {bundleFileName}'
+            )
+        _write_bundle(cacheLocation, bundleFileName, fileNames)
+
+
+class FeatureBundle(object):
+    """
+    A single-file bundle of the geometric features of one component and
+    object type, built with :py:func:`geometric_features.build_bundles()` or
+    :py:meth:`geometric_features.GeometricFeatures.build_bundles()`
+
+    Attributes
+    ----------
+    fileName : str
+        The bundle file
+
+    index : dict
+        The offset and length in bytes of the ``geojson`` contents of each
+        feature and the file it was bundled from (relative to
+        ``cacheLocation``), by feature name
+
+    files : dict
+        The size, modification time and hash of each file when it was
+        bundled
+
+    cacheLocation : str
+        The location of the local geometric features cache
+    """
+
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    def __init__(self, fileName, index, files, cacheLocation):
+        """
+        Construct a bundle from its file name and index.  Typically,
+        :py:meth:`~geometric_features.bundle.FeatureBundle.open()` should be
+        used instead.
+
+        Parameters
+        ----------
+        fileName : str
+            The bundle file
+
+        index : dict
+            The offset, length and file of each feature by feature name
+
+        files : dict
+            The size, modification time and hash of each file
+
+        cacheLocation : str
+            The location of the local geometric features cache
+        """
+        self.fileName = fileName
+        self.index = index
+        self.files = files
+        self.cacheLocation = cacheLocation
+
+    @classmethod
+    def open(cls, cacheLocation, componentName, objectType):
+        """
+        Read the index of the bundle for a component and object type
+
+        Parameters
+        ----------
+        cacheLocation : str
+            The location of the local geometric features cache
+
+        componentName : str
+            The component of the bundle
+
+        objectType : {'point', 'transect', 'region'}
+            The object type of the bundle
+
+        Returns
+        -------
+        bundle : geometric_features.bundle.FeatureBundle or None
+            The bundle, or ``None`` if no compatible bundle has been built
+        """
+        fileName = _get_bundle_file_name(
+            cacheLocation, componentName, objectType
+        )
+        try:
+            with open(fileName, 'rb') as f:
+                f.seek(-_trailer.size, os.SEEK_END)
+                indexOffset, magic = _trailer.unpack(f.read(_trailer.size))
+                if magic != _magic:
+                    return None
+                f.seek(indexOffset)
+                header = json.loads(f.read()[: -_trailer.size].decode('utf-8'))
+        except (OSError, ValueError, struct.error):
+            return None
+        if header.get('version') != _bundleVersion:
+            return None
+        return cls(
+            fileName, header['features'], header['files'], cacheLocation
+        )
+
+    def __contains__(self, featureName):
+        return featureName in self.index
+
+    def is_current(self, featureName):
+        """
+        Check whether a feature was bundled from a ``geojson`` file that is
+        unchanged since the bundle was built, first by the file's size and
+        modification time and, if only the modification time differs, by its
+        hash
+
+        Parameters
+        ----------
+        featureName : str
+            The name of the feature
+
+        Returns
+        -------
+        isCurrent : bool
+            Whether the feature is in the bundle and its file is unchanged
+        """
+        entry = self.index.get(featureName)
+        if entry is None:
+            return False
+        relativePath = entry[2]
+        fileName = os.path.join(self.cacheLocation, relativePath)
+        return _is_current(fileName, self.files[relativePath])
+
+    def read(self, featureNames, columnar=False):
+        """
+        Read features from the bundle, opening the bundle only once and
+        seeking to each feature
+
+        Parameters
+        ----------
+        featureNames : list of str
+            The names of features in the bundle to read
+
+        columnar : bool, optional
+            Whether to store the coordinates of each geometry in NumPy arrays
+            (see :class:`geometric_features.ColumnarGeometry`) rather than
+            nested lists
+
+        Returns
+        -------
+        fcs : list of geometric_features.FeatureCollection
+            The contents of the ``geojson`` file for each feature
+        """
+        fcs = []
+        with open(self.fileName, 'rb') as f:
+            for featureName in featureNames:
+                offset, length, _ = self.index[featureName]
+                f.seek(offset)
+                featureCollection = loads(f.read(length).decode('utf-8'))
+                fcs.append(_to_feature_collection(featureCollection, columnar))
+        return fcs
+
+
+def _get_bundle_file_name(cacheLocation, componentName, objectType):
+    """
+    Get the bundle file for a component and object type
+    """
+    return os.path.join(cacheLocation, componentName, f'{objectType}.bundle')
+
+
+def _write_bundle(cacheLocation, bundleFileName, fileNames):
+    """
+    Write the contents of ``geojson`` files into a bundle with an index
+    """
+    index = dict()
+    files = dict()
+    tempFileName = f'{bundleFileName}.tmp'
+    with open(tempFileName, 'wb') as outFile:
+        for fileName in fileNames:
+            stat = os.stat(fileName)
+            with open(fileName, 'rb') as f:
+                data = f.read()
+            relativePath = os.path.relpath(fileName, cacheLocation)
+            files[relativePath] = {
+                'mtime': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'sha256': hashlib.sha256(data).hexdigest(),
+            }
+            if get_compression(fileName) is not None:
+                # compressed files are stored decompressed in the bundle
+                with open_feature_file(fileName) as f:
+                    data = f.read().encode('utf-8')
+            offset = outFile.tell()
+            outFile.write(data)
+            featureCollection = loads(data.decode('utf-8'))
+            for feature in featureCollection['features']:
+                index[feature['properties']['name']] = [
+                    offset,
+                    len(data),
+                    relativePath,
+                ]
+        indexOffset = outFile.tell()
+        header = {'version': _bundleVersion, 'files': files, 'features': index}
+        outFile.write(json.dumps(header).encode('utf-8'))
+        outFile.write(_trailer.pack(indexOffset, _magic))
+    os.replace(tempFileName, bundleFileName)
+
+
+def _to_feature_collection(featureCollection, columnar):
+    """
+    Convert a decoded geojson feature collection to a FeatureCollection in
+    the same way as ``read_feature_collection()``
+    """
+    otherProperties = dict()
+    for key in sorted(featureCollection):
+        if key not in ['features', 'type']:
+            otherProperties[key] = featureCollection[key]
+    features = featureCollection['features']
+    if columnar:
+        for feature in features:
+            feature['geometry'] = ColumnarGeometry.from_geojson(
+                feature['geometry']
+            )
+    # bundles are built from files that were validated when they were written
+    return FeatureCollection.from_iter(
+        features, otherProperties, validate='none'
+    )
@@ -0,0 +1,331 @@
+import copy
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from geometric_features.columnar import ColumnarGeometry, _split, concatenate
+from geometric_features.feature import Feature
+from geometric_features.feature_collection import FeatureCollection
+from geometric_features.json_backend import loads
+from geometric_features.utils import (
+    geojsonExtensions,
+    get_compression,
+    open_feature_file,
+)
+
+# the version of the cache layout, incremented if it changes so that
+# incompatible caches are ignored
+_cacheVersion = 1
+
+# the directory within the local cache of geometric data
+_cacheDirectory = '.catalog_cache'
+
+_arrayNames = ['coords', 'ringOffsets', 'partOffsets', 'geometryOffsets']
+
+
+def build_catalog_cache(
+    cacheLocation, componentName=None, objectType=None, quiet=True
+):
+    """
+    Build binary caches of the geometric features in a local cache of
+    geometric data, one for each component and object type.  The
+    coordinates of all geometries are stored in flat NumPy arrays that are
+    memory-mapped when features are read, and the properties of each feature
+    are stored in a json table along with the modification time, size and
+    hash of its ``geojson`` file.  Features whose files have changed since
+    the cache was built are read from the ``geojson`` files instead.
+
+    Parameters
+    ----------
+    cacheLocation : str
+        The location of the local geometric features cache
+
+    componentName : str, optional
+        A component to build the cache for, all components by default
+
+    objectType : {'point', 'transect', 'region'}, optional
+        An object type to build the cache for, all types by default
+
+    quiet : bool, optional
+        Whether to suppress printing of the caches being built
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    for groupDir in sorted(glob.glob(os.path.join(cacheLocation, '*', '*'))):
+        groupComponent = os.path.basename(os.path.dirname(groupDir))
+        groupObject = os.path.basename(groupDir)
+        if componentName is not None and groupComponent != componentName:
+            continue
+        if objectType is not None and groupObject != objectType:
+            continue
+        fileNames = sorted(
+            fileName
+            for fileName in glob.glob(
+                os.path.join(groupDir, '*', f'{groupObject}.geojson*')
+            )
+            if fileName.endswith(tuple(geojsonExtensions))
+        )
+        if len(fileNames) == 0:
+            continue
+        if not quiet:
+            print(
+                f'Building cache of {len(fileNames)} {groupComponent} '
+                f'{groupObject} features'
+            )
+        _build_group(cacheLocation, groupComponent, groupObject, fileNames)
+
+
+class CatalogCache(object):
+    """
+    A binary cache of the geometric features of one component and object
+    type, built with :py:func:`geometric_features.build_catalog_cache()`
+    or :py:meth:`geometric_features.GeometricFeatures.build_cache()`
+
+    Attributes
+    ----------
+    cacheLocation : str
+        The location of the local geometric features cache
+
+    files : dict
+        The properties and other contents of each ``geojson`` file, along
+        with the modification time, size and hash used to check if the file
+        has changed
+
+    coords : numpy.memmap
+        The coordinates of all cached geometries
+
+    ringOffsets : numpy.memmap
+        The offsets of each ring into ``coords``
+
+    partOffsets : numpy.memmap
+        The offsets of each part into the rings
+
+    geometryOffsets : numpy.memmap
+        The offsets of each geometry into the parts
+    """
+
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    def __init__(self, cacheLocation, files, arrays):
+        """
+        Construct a cache from its file table and arrays.  Typically,
+        :py:meth:`~geometric_features.catalog_cache.CatalogCache.open()`
+        should be used instead.
+
+        Parameters
+        ----------
+        cacheLocation : str
+            The location of the local geometric features cache
+
+        files : dict
+            The contents of each ``geojson`` file
+
+        arrays : dict of numpy.ndarray
+            The coordinates and offsets of all cached geometries
+        """
+        self.cacheLocation = cacheLocation
+        self.files = files
+        self.coords = arrays['coords']
+        self.ringOffsets = arrays['ringOffsets']
+        self.partOffsets = arrays['partOffsets']
+        self.geometryOffsets = arrays['geometryOffsets']
+
+    @classmethod
+    def open(cls, cacheLocation, componentName, objectType):
+        """
+        Open the cache for a component and object type, memory-mapping its
+        arrays
+
+        Parameters
+        ----------
+        cacheLocation : str
+            The location of the local geometric features cache
+
+        componentName : str
+            The component of the cache
+
+        objectType : {'point', 'transect', 'region'}
+            The object type of the cache
+
+        Returns
+        -------
+        cache : geometric_features.catalog_cache.CatalogCache or None
+            The cache, or ``None`` if no compatible cache has been built
+        """
+        directory = _get_group_directory(
+            cacheLocation, componentName, objectType
+        )
+        try:
+            with open(os.path.join(directory, 'index.json')) as f:
+                index = json.load(f)
+            if index['version'] != _cacheVersion:
+                return None
+            arrays = {
+                name: np.load(
+                    os.path.join(directory, f'{name}.npy'), mmap_mode='r'
+                )
+                for name in _arrayNames
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+        return cls(cacheLocation, index['files'], arrays)
+
+    def read(self, fileName, columnar=False):
+        """
+        Read the features in a ``geojson`` file from the cache
+
+        Parameters
+        ----------
+        fileName : str
+            The ``geojson`` file in the local cache of geometric data
+
+        columnar : bool, optional
+            Whether to return geometries as
+            :py:class:`geometric_features.ColumnarGeometry` objects with
+            coordinates that are memory-mapped (read-only) views into the
+            cache rather than nested lists
+
+        Returns
+        -------
+        fc : geometric_features.FeatureCollection or None
+            The features in the file, or ``None`` if the file is not in the
+            cache or has changed since the cache was built
+        """
+        relativePath = os.path.relpath(fileName, self.cacheLocation)
+        entry = self.files.get(relativePath)
+        if entry is None or not _is_current(fileName, entry):
+            return None
+
+        fc = FeatureCollection()
+        for key in sorted(entry['otherProperties']):
+            fc.otherProperties[key] = copy.deepcopy(
+                entry['otherProperties'][key]
+            )
+
+        for item in entry['features']:
+            feature = copy.deepcopy(item['feature'])
+            index = item['geometryIndex']
+            if index is not None:
+                geometry = feature['geometry']
+                columnarGeometry = _split(
+                    geometry['type'],
+                    self.coords,
+                    self.ringOffsets,
+                    self.partOffsets,
+                    self.geometryOffsets[index : index + 2],
+                )[0]
+                if columnar:
+                    columnarGeometry.other = {
+                        key: value
+                        for key, value in geometry.items()
+                        if key not in ['type', 'coordinates']
+                    }
+                    feature['geometry'] = columnarGeometry
+                else:
+                    geometry['coordinates'] = (
+                        columnarGeometry.get_coordinates()
+                    )
+            fc.features.append(Feature.from_geojson(feature))
+        return fc
+
+
+def _build_group(cacheLocation, componentName, objectType, fileNames):
+    """
+    Build the cache for a component and object type
+    """
+    directory = _get_group_directory(cacheLocation, componentName, objectType)
+    os.makedirs(directory, exist_ok=True)
+
+    files = dict()
+    geometries = []
+    for fileName in fileNames:
+        stat = os.stat(fileName)
+        with open(fileName, 'rb') as f:
+            data = f.read()
+        if get_compression(fileName) is None:
+            featureCollection = loads(data.decode('utf-8'))
+        else:
+            with open_feature_file(fileName) as f:
+                featureCollection = loads(f.read())
+
+        features = []
+        for feature in featureCollection['features']:
+            geometry = feature['geometry']
+            try:
+                columnarGeometry = ColumnarGeometry.from_geojson(geometry)
+            except (KeyError, TypeError, ValueError):
+                # the full feature goes in the table if its geometry can't
+                # be stored in arrays (e.g. a GeometryCollection)
+                features.append({'feature': feature, 'geometryIndex': None})
+                continue
+            feature = dict(feature)
+            feature['geometry'] = dict(geometry)
+            feature['geometry']['coordinates'] = None
+            features.append(
+                {'feature': feature, 'geometryIndex': len(geometries)}
+            )
+            geometries.append(columnarGeometry)
+
+        otherProperties = {
+            key: value
+            for key, value in featureCollection.items()
+            if key not in ['features', 'type']
+        }
+        files[os.path.relpath(fileName, cacheLocation)] = {
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': hashlib.sha256(data).hexdigest(),
+            'otherProperties': otherProperties,
+            'features': features,
+        }
+
+    arrays = dict(zip(_arrayNames, concatenate(geometries), strict=True))
+
+    # remove the index first so a partially written cache is never used
+    indexFileName = os.path.join(directory, 'index.json')
+    if os.path.exists(indexFileName):
+        os.remove(indexFileName)
+    for name, array in arrays.items():
+        # replace rather than overwrite the arrays, which may still be
+        # memory-mapped by features read from the old cache
+        arrayFileName = os.path.join(directory, f'{name}.npy')
+        with open(f'{arrayFileName}.tmp', 'wb') as f:
+            np.save(f, array)
+        os.replace(f'{arrayFileName}.tmp', arrayFileName)
+    with open(f'{indexFileName}.tmp', 'w') as f:
+        json.dump({'version': _cacheVersion, 'files': files}, f)
+    os.replace(f'{indexFileName}.tmp', indexFileName)
+
+
+def _get_group_directory(cacheLocation, componentName, objectType):
+    """
+    Get the directory of the cache for a component and object type
+    """
+    return os.path.join(
+        cacheLocation, _cacheDirectory, componentName, objectType
+    )
+
+
+def _is_current(fileName, entry):
+    """
+    Check whether a ``geojson`` file is unchanged since the cache was built,
+    first by its size and modification time and, if only the modification
+    time differs, by its hash
+    """
+    try:
+        stat = os.stat(fileName)
+    except OSError:
+        return False
+    if stat.st_size != entry['size']:
+        return False
+    if stat.st_mtime_ns == entry['mtime']:
+        return True
+    with open(fileName, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest() == entry['sha256']
@@ -0,0 +1,565 @@
+from collections import defaultdict
+from collections.abc import MutableMapping
+from itertools import chain
+
+import numpy as np
+import shapely
+import shapely.geometry
+
+from geometric_features.utils import paused_garbage_collection
+
+
+class ColumnarGeometry(MutableMapping):
+    """
+    A geojson geometry with its coordinates stored in flat NumPy arrays
+    rather than in nested lists.
+
+    The layout follows the GeoArrow convention for all geometry types: the
+    geometry is made up of parts (a single part for ``Point``,
+    ``LineString`` and ``Polygon``), each part is made up of rings (a single
+    ring for points and lines) and each ring is a range of coordinates.
+
+    The object behaves like the geojson dictionary it replaces, so that
+    ``geometry['type']`` and ``geometry['coordinates']`` can still be used.
+    Note that the latter builds new nested lists on each access, so it should
+    be avoided in performance-critical code.
+
+    Attributes
+    ----------
+    geomType : str
+        The geojson geometry type (e.g. ``'Polygon'``)
+
+    coords : numpy.ndarray
+        A ``float64`` array of size ``nCoords x 2`` with the longitude and
+        latitude of each point
+
+    ringOffsets : numpy.ndarray
+        The index into ``coords`` of the start of each ring, with the total
+        number of coordinates at the end
+
+    partOffsets : numpy.ndarray
+        The index into the rings of the start of each part, with the total
+        number of rings at the end
+
+    other : dict
+        Any other members of the geojson geometry (e.g. ``bbox``)
+    """
+
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    __slots__ = ('geomType', 'coords', 'ringOffsets', 'partOffsets', 'other')
+
+    def __init__(self, geomType, coords, ringOffsets, partOffsets, other=None):
+        """
+        Construct a columnar geometry from its arrays
+
+        Parameters
+        ----------
+        geomType : str
+            The geojson geometry type
+
+        coords : numpy.ndarray
+            The coordinates of all points in the geometry
+
+        ringOffsets : numpy.ndarray
+            The offsets of each ring into ``coords``
+
+        partOffsets : numpy.ndarray
+            The offsets of each part into the rings
+
+        other : dict, optional
+            Any other members of the geojson geometry
+        """
+        if geomType not in _geomTypes:
+            raise ValueError(f'Unsupported geometry type {geomType}')
+        self.geomType = geomType
+        self.coords = coords
+        self.ringOffsets = ringOffsets
+        self.partOffsets = partOffsets
+        if other is None:
+            other = dict()
+        self.other = other
+
+    @classmethod
+    def from_geojson(cls, geometry):
+        """
+        Convert a geojson geometry with nested lists of coordinates into a
+        columnar geometry
+
+        Parameters
+        ----------
+        geometry : dict
+            A geojson geometry with ``type`` and ``coordinates``
+
+        Returns
+        -------
+        columnarGeometry : geometric_features.ColumnarGeometry
+            The same geometry with its coordinates in NumPy arrays
+        """
+        geomType = geometry['type']
+        if geomType not in _geomTypes:
+            raise ValueError(f'Unsupported geometry type {geomType}')
+        parts = _get_parts(geomType, geometry['coordinates'])
+
+        partOffsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        partOffsets[1:] = np.cumsum([len(part) for part in parts])
+        rings = list(chain.from_iterable(parts))
+        ringOffsets = np.zeros(len(rings) + 1, dtype=np.int64)
+        ringOffsets[1:] = np.cumsum([len(ring) for ring in rings])
+        coords = np.fromiter(
+            chain.from_iterable(chain.from_iterable(rings)), dtype=np.float64
+        )
+        if len(coords) != 2 * ringOffsets[-1]:
+            raise ValueError('Only 2D coordinates are supported')
+        coords = coords.reshape((ringOffsets[-1], 2))
+
+        other = {
+            key: value
+            for key, value in geometry.items()
+            if key not in ['type', 'coordinates']
+        }
+        return cls(geomType, coords, ringOffsets, partOffsets, other)
+
+    def to_geojson(self, digits=None):
+        """
+        Convert to a geojson geometry with nested lists of coordinates
+
+        Parameters
+        ----------
+        digits : int, optional
+            The number of decimal places to round coordinates to
+
+        Returns
+        -------
+        geometry : dict
+            A geojson geometry with ``type`` and ``coordinates``
+        """
+        geometry = {
+            'type': self.geomType,
+            'coordinates': self.get_coordinates(digits),
+        }
+        for key in sorted(self.other):
+            geometry[key] = self.other[key]
+        return geometry
+
+    def get_coordinates(self, digits=None):
+        """
+        Get the coordinates as nested lists, following the geojson convention
+
+        Parameters
+        ----------
+        digits : int, optional
+            The number of decimal places to round coordinates to
+
+        Returns
+        -------
+        coordinates : list
+            The coordinates of the geometry
+        """
+        coords = self.coords
+        if digits is not None:
+            coords = round_coords(coords, digits)
+        with paused_garbage_collection():
+            return _build_coordinates(
+                self.geomType,
+                coords.tolist(),
+                self.ringOffsets.tolist(),
+                self.partOffsets.tolist(),
+            )
+
+    @property
+    def __geo_interface__(self):
+        return {'type': self.geomType, 'coordinates': self.get_coordinates()}
+
+    def __getitem__(self, key):
+        if key == 'type':
+            return self.geomType
+        if key == 'coordinates':
+            return self.get_coordinates()
+        return self.other[key]
+
+    def __setitem__(self, key, value):
+        if key == 'type':
+            if value not in _geomTypes:
+                raise ValueError(f'Unsupported geometry type {value}')
+            self.geomType = value
+        elif key == 'coordinates':
+            geometry = ColumnarGeometry.from_geojson(
+                {'type': self.geomType, 'coordinates': value}
+            )
+            self.coords = geometry.coords
+            self.ringOffsets = geometry.ringOffsets
+            self.partOffsets = geometry.partOffsets
+        else:
+            self.other[key] = value
+
+    def __delitem__(self, key):
+        if key in ['type', 'coordinates']:
+            raise KeyError(f'{key} cannot be removed from a geometry')
+        del self.other[key]
+
+    def __contains__(self, key):
+        # avoid building the nested lists of coordinates just to check
+        return key in ['type', 'coordinates'] or key in self.other
+
+    def __iter__(self):
+        yield 'type'
+        yield 'coordinates'
+        yield from self.other
+
+    def __len__(self):
+        return 2 + len(self.other)
+
+    def __deepcopy__(self, memo):
+        return ColumnarGeometry(
+            self.geomType,
+            self.coords.copy(),
+            self.ringOffsets.copy(),
+            self.partOffsets.copy(),
+            dict(self.other),
+        )
+
+    def __repr__(self):
+        return (
+            f'ColumnarGeometry({self.geomType}, '
+            f'{len(self.partOffsets) - 1} parts, '
+            f'{len(self.ringOffsets) - 1} rings, '
+            f'{len(self.coords)} points)'
+        )
+
+
+def to_shapely(geometries):
+    """
+    Convert columnar geometries to ``shapely`` geometries, constructing all
+    geometries of the same type with a single vectorized call
+
+    Parameters
+    ----------
+    geometries : list of geometric_features.ColumnarGeometry
+        The geometries to convert
+
+    Returns
+    -------
+    shapes : numpy.ndarray
+        An array of ``shapely`` geometries
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    shapes = np.empty(len(geometries), dtype=object)
+    indicesByType = defaultdict(list)
+    for index, geometry in enumerate(geometries):
+        indicesByType[geometry.geomType].append(index)
+
+    for geomType, indices in indicesByType.items():
+        coords, ringOffsets, partOffsets, geometryOffsets = concatenate(
+            [geometries[index] for index in indices]
+        )
+        shapes[indices] = _from_ragged_array(
+            geomType, coords, ringOffsets, partOffsets, geometryOffsets
+        )
+    return shapes
+
+
+def from_shapely(shapes):
+    """
+    Convert ``shapely`` geometries to columnar geometries, extracting the
+    coordinates of all geometries of the same type with a single vectorized
+    call.  The coordinates of the resulting geometries are views into a
+    shared array for each geometry type.
+
+    Parameters
+    ----------
+    shapes : list of shapely.geometry.base.BaseGeometry
+        The geometries to convert
+
+    Returns
+    -------
+    geometries : list
+        A ``ColumnarGeometry`` for each shape, except that geometries of
+        types with no geojson ``coordinates`` (e.g. ``GeometryCollection``)
+        are returned as geojson dictionaries
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    shapes = np.asarray(shapes, dtype=object)
+    geometries = [None] * len(shapes)
+    indicesByType = defaultdict(list)
+    for index, shape in enumerate(shapes):
+        indicesByType[shape.geom_type].append(index)
+
+    for geomType, indices in indicesByType.items():
+        if geomType not in _geomTypes:
+            for index in indices:
+                geometries[index] = shapely.geometry.mapping(shapes[index])
+            continue
+        coords, ringOffsets, partOffsets, geometryOffsets = _to_ragged_array(
+            geomType, shapes[indices]
+        )
+        split = _split(
+            geomType, coords, ringOffsets, partOffsets, geometryOffsets
+        )
+        for index, geometry in zip(indices, split, strict=True):
+            geometries[index] = geometry
+    return geometries
+
+
+def concatenate(geometries):
+    """
+    Concatenate the arrays of several columnar geometries into single flat
+    arrays, following the GeoArrow layout
+
+    Parameters
+    ----------
+    geometries : list of geometric_features.ColumnarGeometry
+        The geometries to concatenate
+
+    Returns
+    -------
+    coords : numpy.ndarray
+        The coordinates of all geometries
+
+    ringOffsets : numpy.ndarray
+        The offsets of each ring into ``coords``
+
+    partOffsets : numpy.ndarray
+        The offsets of each part into the rings
+
+    geometryOffsets : numpy.ndarray
+        The offsets of each geometry into the parts
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    coordCounts = [len(geometry.coords) for geometry in geometries]
+    ringCounts = [len(geometry.ringOffsets) - 1 for geometry in geometries]
+    partCounts = [len(geometry.partOffsets) - 1 for geometry in geometries]
+
+    coords = np.concatenate(
+        [np.zeros((0, 2))] + [geometry.coords for geometry in geometries]
+    )
+
+    ringOffsets = _concatenate_offsets(
+        [geometry.ringOffsets for geometry in geometries],
+        coordCounts,
+        ringCounts,
+    )
+    partOffsets = _concatenate_offsets(
+        [geometry.partOffsets for geometry in geometries],
+        ringCounts,
+        partCounts,
+    )
+
+    geometryOffsets = np.zeros(len(geometries) + 1, dtype=np.int64)
+    geometryOffsets[1:] = np.cumsum(partCounts)
+
+    return coords, ringOffsets, partOffsets, geometryOffsets
+
+
+def round_coords(values, digits=6):
+    """
+    Round an array of coordinates to a given number of decimal places,
+    producing exactly the same values as python's ``round()``
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        The values to round
+
+    digits : int, optional
+        The number of decimal places
+
+    Returns
+    -------
+    rounded : numpy.ndarray
+        The rounded values
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0**digits
+    scaled = values * scale
+    rounded = np.rint(scaled) / scale
+    # round() rounds the exact decimal value, whereas the scaled value has
+    # been rounded to the nearest double, which can only matter for values
+    # that are within round-off of being half way between two integers
+    fraction = np.abs(scaled - np.floor(scaled) - 0.5)
+    ambiguous = np.nonzero(fraction <= 8.0 * np.spacing(np.abs(scaled)))
+    rounded[ambiguous] = [
+        round(value, digits) for value in values[ambiguous].tolist()
+    ]
+    return rounded
+
+
+_geomTypes = [
+    'Point',
+    'MultiPoint',
+    'LineString',
+    'MultiLineString',
+    'Polygon',
+    'MultiPolygon',
+]
+
+
+def _get_parts(geomType, coordinates):
+    """
+    Get the nested lists of coordinates as a list of parts, each a list of
+    rings, each a list of points
+    """
+    if len(coordinates) == 0:
+        return []
+    if geomType == 'Point':
+        return [[[coordinates]]]
+    if geomType == 'MultiPoint':
+        return [[[point]] for point in coordinates]
+    if geomType == 'LineString':
+        return [[coordinates]]
+    if geomType == 'MultiLineString':
+        return [[line] for line in coordinates]
+    if geomType == 'Polygon':
+        return [coordinates]
+    # MultiPolygon
+    return coordinates
+
+
+def _build_coordinates(geomType, coords, ringOffsets, partOffsets):
+    """
+    Build the nested lists of geojson coordinates from lists of points and
+    offsets
+    """
+    rings = [
+        coords[start:end]
+        for start, end in zip(ringOffsets[:-1], ringOffsets[1:], strict=True)
+    ]
+    parts = [
+        rings[start:end]
+        for start, end in zip(partOffsets[:-1], partOffsets[1:], strict=True)
+    ]
+    if len(parts) == 0:
+        return []
+    if geomType == 'Point':
+        return parts[0][0][0]
+    if geomType == 'MultiPoint':
+        return [part[0][0] for part in parts]
+    if geomType == 'LineString':
+        return parts[0][0]
+    if geomType == 'MultiLineString':
+        return [part[0] for part in parts]
+    if geomType == 'Polygon':
+        return parts[0]
+    # MultiPolygon
+    return parts
+
+
+def _concatenate_offsets(offsetsList, counts, innerCounts):
+    """
+    Concatenate the offsets of several geometries, shifting each by the
+    number of entries in the preceding geometries
+    """
+    starts = np.zeros(len(counts), dtype=np.int64)
+    starts[1:] = np.cumsum(counts)[:-1]
+    offsets = np.concatenate(
+        [np.zeros(0, dtype=np.int64)]
+        + [offsets[:-1] for offsets in offsetsList]
+    )
+    offsets = offsets + np.repeat(starts, innerCounts)
+    return np.append(offsets, np.sum(counts, dtype=np.int64))
+
+
+def _from_ragged_array(
+    geomType, coords, ringOffsets, partOffsets, geometryOffsets
+):
+    """
+    Create ``shapely`` geometries of a single type from flat arrays
+    """
+    # the offset into the rings and the coordinates of each geometry, which
+    # are the only offsets needed for single-part geometries
+    geometryRings = partOffsets[geometryOffsets]
+    geometryCoords = ringOffsets[geometryRings]
+
+    if geomType == 'Point':
+        shapes = np.empty(len(geometryOffsets) - 1, dtype=object)
+        nonEmpty = np.diff(geometryOffsets) > 0
+        shapes[nonEmpty] = shapely.points(
+            coords[geometryCoords[:-1][nonEmpty]]
+        )
+        shapes[~nonEmpty] = shapely.Point()
+        return shapes
+
+    if geomType in ['MultiPoint', 'LineString']:
+        offsets = (geometryCoords,)
+    elif geomType in ['MultiLineString', 'Polygon']:
+        offsets = (ringOffsets, geometryRings)
+    else:
+        offsets = (ringOffsets, partOffsets, geometryOffsets)
+    return shapely.from_ragged_array(
+        shapely.GeometryType[geomType.upper()], coords, offsets
+    )
+
+
+def _to_ragged_array(geomType, shapes):
+    """
+    Extract the flat arrays of ``shapely`` geometries of a single type in
+    the common layout with parts, rings and coordinates
+    """
+    count = len(shapes)
+    if geomType == 'Point':
+        # empty points would otherwise come back as NaNs
+        nonEmpty = ~shapely.is_empty(shapes)
+        coords = shapely.get_coordinates(shapes[nonEmpty])
+        offsets = np.arange(len(coords) + 1, dtype=np.int64)
+        geometryOffsets = np.zeros(count + 1, dtype=np.int64)
+        geometryOffsets[1:] = np.cumsum(nonEmpty)
+        return coords, offsets, offsets, geometryOffsets
+
+    _, coords, offsets = shapely.to_ragged_array(shapes, include_z=False)
+    offsets = [np.asarray(offset, dtype=np.int64) for offset in offsets]
+
+    if geomType == 'MultiPoint':
+        ringOffsets = np.arange(len(coords) + 1, dtype=np.int64)
+        return coords, ringOffsets, ringOffsets, offsets[0]
+    if geomType == 'LineString':
+        geometryOffsets = np.arange(count + 1, dtype=np.int64)
+        return coords, offsets[0], geometryOffsets, geometryOffsets
+    if geomType == 'MultiLineString':
+        partOffsets = np.arange(len(offsets[0]), dtype=np.int64)
+        return coords, offsets[0], partOffsets, offsets[1]
+    if geomType == 'Polygon':
+        geometryOffsets = np.arange(count + 1, dtype=np.int64)
+        return coords, offsets[0], offsets[1], geometryOffsets
+    # MultiPolygon
+    return coords, offsets[0], offsets[1], offsets[2]
+
+
+def _split(geomType, coords, ringOffsets, partOffsets, geometryOffsets):
+    """
+    Split flat arrays into columnar geometries whose coordinates are views
+    into ``coords``
+    """
+    geometries = []
+    for partStart, partEnd in zip(
+        geometryOffsets[:-1].tolist(),
+        geometryOffsets[1:].tolist(),
+        strict=True,
+    ):
+        ringStart = partOffsets[partStart]
+        ringEnd = partOffsets[partEnd]
+        coordStart = ringOffsets[ringStart]
+        coordEnd = ringOffsets[ringEnd]
+        geometries.append(
+            ColumnarGeometry(
+                geomType,
+                coords[coordStart:coordEnd],
+                ringOffsets[ringStart : ringEnd + 1] - coordStart,
+                partOffsets[partStart : partEnd + 1] - ringStart,
+            )
+        )
+    return geometries
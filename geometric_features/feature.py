@@ -0,0 +1,397 @@
+import copy
+import functools
+import sys
+from collections.abc import MutableMapping
+
+# the properties every feature has, in the order they are written
+_coreProperties = ('name', 'tags', 'object', 'component', 'author')
+_corePropertySet = frozenset(_coreProperties)
+
+# the members of a geojson feature that aren't stored in ``other``
+_featureKeySet = frozenset(['type', 'properties', 'geometry'])
+
+
+class Feature(MutableMapping):
+    """
+    A compact geojson feature that stores the properties every feature has
+    as attributes rather than in nested dictionaries.  Strings that are
+    typically shared by many features (the object type, component, author
+    and tags) are interned so only one copy is kept in memory.
+
+    A feature behaves like the geojson dictionary it replaces: ``type``,
+    ``properties`` and ``geometry`` (along with any other members) can be
+    accessed and modified as items, e.g. ``feature['properties']['name']``.
+    The ``tags`` property is the tags joined with semicolons, as in
+    ``geojson`` files.
+
+    Attributes
+    ----------
+    name : str
+        The name of the feature
+
+    tags : tuple of str
+        The tags of the feature, an ordered set without duplicates
+
+    objectType : {'point', 'transect', 'region'}
+        The type of object
+
+    component : str
+        The component the feature belongs to
+
+    author : str
+        The author(s) of the feature
+
+    extraProperties : dict or None
+        Any other properties of the feature (e.g. ``history``), or ``None``
+        if there are none
+
+    geometry : dict or geometric_features.ColumnarGeometry
+        The geojson geometry of the feature
+
+    other : dict or None
+        Any other members of the geojson feature (e.g. ``bbox``), or ``None``
+        if there are none
+    """
+
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    __slots__ = (
+        'name',
+        'tags',
+        'objectType',
+        'component',
+        'author',
+        'extraProperties',
+        'geometry',
+        'other',
+    )
+
+    def __init__(
+        self,
+        name,
+        objectType,
+        component,
+        geometry,
+        tags=(),
+        author='',
+        extraProperties=None,
+        other=None,
+    ):
+        """
+        Construct a feature
+
+        Parameters
+        ----------
+        name : str
+            The name of the feature
+
+        objectType : {'point', 'transect', 'region'}
+            The type of object
+
+        component : str
+            The component the feature belongs to
+
+        geometry : dict or geometric_features.ColumnarGeometry
+            The geojson geometry of the feature
+
+        tags : str or iterable of str, optional
+            The tags of the feature, either joined with semicolons or as
+            separate strings.  Duplicate and empty tags are dropped.
+
+        author : str, optional
+            The author(s) of the feature
+
+        extraProperties : dict, optional
+            Any other properties of the feature
+
+        other : dict, optional
+            Any other members of the geojson feature
+        """
+        self.name = name
+        self.tags = _get_tags(tags)
+        self.objectType = _intern(objectType)
+        self.component = _intern(component)
+        self.author = _intern(author)
+        # empty dictionaries take up space, so they are only created if
+        # needed
+        self.extraProperties = extraProperties or None
+        self.geometry = geometry
+        self.other = other or None
+
+    @classmethod
+    def from_geojson(cls, feature):
+        """
+        Convert a geojson feature to a compact feature, with any extra
+        properties and other members in sorted order
+
+        Parameters
+        ----------
+        feature : dict
+            A geojson feature with ``properties`` (including ``name``,
+            ``object`` and ``component``) and ``geometry``
+
+        Returns
+        -------
+        feature : geometric_features.Feature
+            The compact feature
+        """
+        properties = feature['properties']
+        extraProperties = None
+        if not properties.keys() <= _corePropertySet:
+            extraProperties = {
+                key: properties[key]
+                for key in sorted(properties)
+                if key not in _coreProperties
+            }
+        other = None
+        if not feature.keys() <= _featureKeySet:
+            other = {
+                key: feature[key]
+                for key in sorted(feature)
+                if key not in _featureKeySet
+            }
+        return cls(
+            name=properties['name'],
+            objectType=properties['object'],
+            component=properties['component'],
+            geometry=feature['geometry'],
+            tags=properties.get('tags', ''),
+            author=properties.get('author', ''),
+            extraProperties=extraProperties,
+            other=other,
+        )
+
+    def to_geojson(self):
+        """
+        Convert to a geojson feature made up of dictionaries
+
+        Returns
+        -------
+        feature : dict
+            A geojson feature with ``type``, ``properties`` and ``geometry``
+        """
+        feature = {'type': 'Feature', 'properties': dict(self['properties'])}
+        if self.other is not None:
+            feature.update(self.other)
+        feature['geometry'] = self.geometry
+        return feature
+
+    def copy(self):
+        """
+        Make a shallow copy of the feature that shares its geometry and the
+        values of its properties, but whose properties can be changed
+        without affecting this feature
+
+        Returns
+        -------
+        feature : geometric_features.Feature
+            The copy
+        """
+        extraProperties = self.extraProperties
+        if extraProperties is not None:
+            extraProperties = dict(extraProperties)
+        other = self.other
+        if other is not None:
+            other = dict(other)
+        return Feature(
+            self.name,
+            self.objectType,
+            self.component,
+            self.geometry,
+            self.tags,
+            self.author,
+            extraProperties,
+            other,
+        )
+
+    def __getitem__(self, key):
+        if key == 'properties':
+            return _FeatureProperties(self)
+        if key == 'geometry':
+            return self.geometry
+        if key == 'type':
+            return 'Feature'
+        if self.other is None:
+            raise KeyError(key)
+        return self.other[key]
+
+    def __setitem__(self, key, value):
+        if key == 'properties':
+            properties = dict(value)
+            for name in ['name', 'object', 'component']:
+                if name not in properties:
+                    raise KeyError(f'Feature properties missing {name}')
+            self.name = properties['name']
+            self.objectType = _intern(properties['object'])
+            self.component = _intern(properties['component'])
+            self.tags = _get_tags(properties.get('tags', ''))
+            self.author = _intern(properties.get('author', ''))
+            self.extraProperties = {
+                name: value
+                for name, value in properties.items()
+                if name not in _coreProperties
+            } or None
+        elif key == 'geometry':
+            self.geometry = value
+        elif key == 'type':
+            if value != 'Feature':
+                raise ValueError(f'Unexpected feature type {value}')
+        else:
+            if self.other is None:
+                self.other = dict()
+            self.other[key] = value
+
+    def __delitem__(self, key):
+        if key in ['type', 'properties', 'geometry'] or self.other is None:
+            raise KeyError(f'{key} cannot be removed from a feature')
+        del self.other[key]
+        if len(self.other) == 0:
+            self.other = None
+
+    def __contains__(self, key):
+        return key in ['type', 'properties', 'geometry'] or (
+            self.other is not None and key in self.other
+        )
+
+    def __iter__(self):
+        yield 'type'
+        yield 'properties'
+        if self.other is not None:
+            yield from self.other
+        yield 'geometry'
+
+    def __len__(self):
+        if self.other is None:
+            return 3
+        return 3 + len(self.other)
+
+    def __deepcopy__(self, memo):
+        return Feature(
+            self.name,
+            self.objectType,
+            self.component,
+            copy.deepcopy(self.geometry, memo),
+            self.tags,
+            self.author,
+            copy.deepcopy(self.extraProperties, memo),
+            copy.deepcopy(self.other, memo),
+        )
+
+    def __repr__(self):
+        return f'Feature({self.name!r}, {self.objectType}, {self.component})'
+
+
+class _FeatureProperties(MutableMapping):
+    """
+    A view of the properties of a feature as a dictionary
+    """
+
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    __slots__ = ('_feature',)
+
+    def __init__(self, feature):
+        self._feature = feature
+
+    def __getitem__(self, key):
+        feature = self._feature
+        if key == 'name':
+            return feature.name
+        if key == 'tags':
+            return ';'.join(feature.tags)
+        if key == 'object':
+            return feature.objectType
+        if key == 'component':
+            return feature.component
+        if key == 'author':
+            return feature.author
+        if feature.extraProperties is None:
+            raise KeyError(key)
+        return feature.extraProperties[key]
+
+    def __setitem__(self, key, value):
+        feature = self._feature
+        if key == 'name':
+            feature.name = value
+        elif key == 'tags':
+            feature.tags = _get_tags(value)
+        elif key == 'object':
+            feature.objectType = _intern(value)
+        elif key == 'component':
+            feature.component = _intern(value)
+        elif key == 'author':
+            feature.author = _intern(value)
+        else:
+            if feature.extraProperties is None:
+                feature.extraProperties = dict()
+            feature.extraProperties[key] = value
+
+    def __delitem__(self, key):
+        feature = self._feature
+        if key in _coreProperties:
+            raise KeyError(
+                f'{key} cannot be removed from the properties of a feature'
+            )
+        if feature.extraProperties is None:
+            raise KeyError(key)
+        del feature.extraProperties[key]
+        if len(feature.extraProperties) == 0:
+            feature.extraProperties = None
+
+    def __contains__(self, key):
+        extraProperties = self._feature.extraProperties
+        return key in _coreProperties or (
+            extraProperties is not None and key in extraProperties
+        )
+
+    def __iter__(self):
+        yield from _coreProperties
+        if self._feature.extraProperties is not None:
+            yield from self._feature.extraProperties
+
+    def __len__(self):
+        extraProperties = self._feature.extraProperties
+        if extraProperties is None:
+            return len(_coreProperties)
+        return len(_coreProperties) + len(extraProperties)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def _get_tags(tags):
+    """
+    Get an ordered set of (interned) tags as a tuple, without duplicates or
+    empty tags, from tags joined by semicolons or an iterable of tags
+    """
+    if isinstance(tags, str):
+        return _split_tags(tags)
+    tags = dict.fromkeys(_intern(tag) for tag in tags)
+    tags.pop('', None)
+    return tuple(tags)
+
+
+@functools.lru_cache(maxsize=4096)
+def _split_tags(tags):
+    """
+    Split tags joined by semicolons into an ordered set of (interned) tags,
+    remembering the result because many features share the same tags
+    """
+    if tags == '':
+        return ()
+    tags = dict.fromkeys(map(sys.intern, tags.split(';')))
+    tags.pop('', None)
+    return tuple(tags)
+
+
+def _intern(value):
+    """
+    Intern a string so only one copy is kept, leaving other values alone
+    """
+    if type(value) is str:
+        return sys.intern(value)
+    return value
@@ -1,4 +1,18 @@
+import contextlib
+import copy
+import functools
 import json
+import operator
+import os
+import re
+from collections.abc import Mapping
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from itertools import accumulate, chain, groupby
 
 try:
     import matplotlib.pyplot as plt
@@ -8,27 +22,62 @@ except ImportError:
     mpl.use('Agg', force=True)
     import matplotlib.pyplot as plt
 
-import copy
-
 import cartopy
 import numpy as np
 import progressbar
 import shapely.geometry
 import shapely.ops
 
+from geometric_features.columnar import (ColumnarGeometry, from_shapely,
+                                         round_coords, to_shapely)
+from geometric_features.feature import Feature, _get_tags
+from geometric_features.json_backend import dumps, loads
 from geometric_features.plot import (build_projections, plot_base,
                                      subdivide_geom)
-from geometric_features.utils import provenance_command
+from geometric_features.utils import open_feature_file, provenance_command
+
+# the keys every feature and its properties and geometry must have
+_requiredKeys = {
+    'properties': ['name', 'object', 'component'],
+    'geometry': ['type', 'coordinates']}
+
+# the object type for each geometry type
+_geomObjectTypes = {'Polygon': 'region',
+                    'MultiPolygon': 'region',
+                    'LineString': 'transect',
+                    'MultiLineString': 'transect',
+                    'Point': 'point',
+                    'MultiPoint': 'point'}
+
+# the ways features can be validated when they are added to a collection
+_validateOptions = ['full', 'fast', 'none']
+
+# the half width in radians of the wedge along the antimeridian (in polar
+# coordinates) that features crossing the antimeridian are split with
+_antimeridianEpsilon = 1e-14
+
+# shapes with no jumps in longitude of this many degrees or more and no
+# points this close to the poles can't intersect the wedge, with a generous
+# margin
+_antimeridianMaxJump = 179.
+_antimeridianMaxLat = 89.
 
 
-def read_feature_collection(fileName):
+def read_feature_collection(fileName, columnar=False):
     """
     Read a feature collection from a geojson file.
 
     Parameters
     ----------
     fileName : str
-        The path to the geojson file
+        The path to the geojson file, which is decompressed as it is read if
+        it ends with ``.gz`` or ``.zst``
+
+    columnar : bool, optional
+        Whether to store the coordinates of each geometry in NumPy arrays
+        (see :class:`geometric_features.ColumnarGeometry`) rather than nested
+        lists, which uses much less memory and speeds up operations that
+        need ``shapely`` geometries
 
     Returns
     -------
@@ -39,16 +88,47 @@ def read_feature_collection(fileName):
     # -------
     # Xylar Asay-Davis
     fc = FeatureCollection()
-    with open(fileName) as f:
-        featuresDict = json.load(f)
-        for feature in featuresDict['features']:
-            fc.add_feature(feature)
-        for key in sorted(list(featuresDict.keys())):
-            if key not in ['features', 'type']:
-                fc.otherProperties[key] = featuresDict[key]
+    otherProperties = dict()
+    features = iter_features(fileName, otherProperties)
+    if columnar:
+        features = _to_columnar(features)
+    fc.add_features(features)
+    for key in sorted(list(otherProperties.keys())):
+        fc.otherProperties[key] = otherProperties[key]
     return fc
 
 
+def iter_features(fileName, otherProperties=None):
+    """
+    Iterate over the features in a geojson file, parsing them one at a time
+    so that only a single feature needs to be held in memory
+
+    Parameters
+    ----------
+    fileName : str
+        The path to the geojson file, which is decompressed as it is read if
+        it ends with ``.gz`` or ``.zst``
+
+    otherProperties : dict, optional
+        A dictionary to which other properties of the feature collection
+        (e.g. ``groupName``) are added as they are encountered in the file.
+        Properties that follow the features in the file are only available
+        once iteration is complete.
+
+    Yields
+    ------
+    feature : dict
+        A python dictionary describing each feature, following the geojson
+        convention
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+    with open_feature_file(fileName) as f:
+        stream = _FeatureStream(f)
+        yield from stream.iter_features(otherProperties)
+
+
 class FeatureCollection(object):
     """
     An object for representing and manipulating a collection of geoscientific
@@ -63,6 +143,12 @@ class FeatureCollection(object):
     otherProperties : dict
         Other properties of the feature collection such as ``type`` and
         ``groupName``
+
+    Features can be looked up by name with ``fc[name]`` and ``name in fc``,
+    using an index of feature names that is kept up to date as features are
+    added (including by appending to ``features`` directly).  Subsets of
+    features can be selected by name, tags, component, object type and
+    bounding box with ``select()``.
     """
     # Authors
     # -------
@@ -94,6 +180,83 @@ class FeatureCollection(object):
         self.otherProperties['groupName'] = 'enterGroupName'
         if otherProperties is not None:
             self.otherProperties.update(otherProperties)
+        self._nameIndex = dict()
+        self._indexedFeatures = None
+        self._indexedCount = 0
+        self._propertyIndex = None
+        self._propertyIndexedFeatures = None
+        self._propertyIndexedCount = 0
+        self._shapeCache = dict()
+        self._sindex = None
+        self._bounds = np.empty((0, 4))
+        self._boundsGeometries = []
+        self._boundsIndexedFeatures = None
+
+    def __getitem__(self, featureName):
+        """
+        Get a feature by name
+
+        Parameters
+        ----------
+        featureName : str
+            The name of the feature
+
+        Returns
+        -------
+        feature : dict
+            The feature
+
+        Raises
+        ------
+        KeyError
+            If there is no feature with this name in the collection
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        index = self._find(featureName)
+        if index is None:
+            raise KeyError(featureName)
+        return self.features[index]
+
+    def __contains__(self, featureName):
+        return self._find(featureName) is not None
+
+    @classmethod
+    def from_iter(cls, features, otherProperties=None, validate='full'):
+        """
+        Construct a new feature collection from an iterable of features such
+        as the generator returned by
+        :func:`geometric_features.iter_features()`
+
+        Parameters
+        ----------
+        features : iterable of dict
+            Python dictionaries describing each feature, following the geojson
+            convention.  Features are validated and converted to compact
+            features one at a time, so the iterable is never held in memory
+            as a whole.
+
+        otherProperties : dict, optional
+            Other properties of the feature collection such as ``type`` and
+            ``groupName``
+
+        validate : {'full', 'fast', 'none'}, optional
+            How to validate the features (see ``add_features()``)
+
+        Returns
+        -------
+        fc : geometric_features.FeatureCollection
+            The new feature collection
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        fc = cls(otherProperties=otherProperties)
+        fc.add_features(features, validate=validate)
+        return fc
 
     def add_feature(self, feature):
         """
@@ -109,10 +272,82 @@ class FeatureCollection(object):
         # Xylar Asay-Davis
 
         feature = _validate_feature(feature)
-        if not self.feature_in_collection(feature):
+        if self._find(feature.name) is None:
+            # the index is up to date, so the new feature can be added to it
+            self._nameIndex[feature.name] = len(self.features)
+            self._indexedCount += 1
             self.features.append(feature)
 
-    def merge(self, other):
+    def add_features(self, features, validate='full'):
+        """
+        Add features to the feature collection, skipping any that are already
+        present (or that appear earlier in ``features``).  The features are
+        validated in a single pass and either all valid features are added or,
+        if any are invalid, none are.
+
+        Parameters
+        ----------
+        features : iterable of dict
+            The features to add
+
+        validate : {'full', 'fast', 'none'}, optional
+            How to validate the features:
+
+            * ``'full'``: check that each feature has the required keys and a
+              geometry type that matches its object type, and put the members
+              of each geometry in the standard order (as ``add_feature()``
+              does)
+            * ``'fast'``: check the features but keep their geometries as
+              they are
+            * ``'none'``: add the features without checking them, for
+              features from a trusted source such as another feature
+              collection or files that were validated when they were written
+
+        Raises
+        ------
+        ValueError
+            If any features are invalid, with the errors for all of them
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        if validate not in _validateOptions:
+            raise ValueError(f'Unexpected validate option {validate}, should '
+                             f'be one of {", ".join(_validateOptions)}')
+
+        nameIndex = self._get_name_index()
+        newFeatures = dict()
+        errors = []
+        for feature in features:
+            if validate != 'none':
+                error = _check_feature(feature)
+                if error is not None:
+                    errors.append(error.args[0])
+                    continue
+            featureName = _get_name(feature)
+            if featureName in newFeatures:
+                continue
+            if featureName in nameIndex and \
+                    self._find(featureName) is not None:
+                continue
+            newFeatures[featureName] = _compact_feature(
+                feature, orderGeometry=(validate == 'full'))
+
+        if len(errors) > 0:
+            raise ValueError('{} invalid feature(s):\n    {}'.format(
+                len(errors), '\n    '.join(errors)))
+
+        # the index is up to date, so the new features can be added to it
+        # all at once
+        start = len(self.features)
+        self._nameIndex.update(zip(newFeatures,
+                                   range(start, start + len(newFeatures)),
+                                   strict=True))
+        self._indexedCount += len(newFeatures)
+        self.features.extend(newFeatures.values())
+
+    def merge(self, other, validate='full'):
         """
         Merge another feature collection into this one
 
@@ -120,13 +355,16 @@ class FeatureCollection(object):
         ----------
         other : geometric_features.FeatureCollection
             The other feature collection
+
+        validate : {'full', 'fast', 'none'}, optional
+            How to validate the features of the other collection (see
+            ``add_features()``)
         """
         # Authors
         # -------
         # Xylar Asay-Davis
 
-        for feature in other.features:
-            self.add_feature(feature)
+        self.add_features(other.features, validate=validate)
 
         for key in sorted(list(other.otherProperties.keys())):
             if key not in ['features', 'type'] and key not in \
@@ -149,14 +387,247 @@ class FeatureCollection(object):
         # -------
         # Xylar Asay-Davis
 
+        if remove:
+            self.retag(remove=tags)
+        else:
+            self.retag(add=tags)
+
+    def retag(self, add=None, remove=None, where=None):
+        """
+        Add and remove tags of many features in a single pass.  Tags in
+        ``remove`` are removed and then tags in ``add`` that a feature
+        doesn't already have are appended.
+
+        Parameters
+        ----------
+        add : str or list of str, optional
+            Tags to add, either a list or joined with semicolons
+
+        remove : str or list of str, optional
+            Tags to remove, either a list or joined with semicolons
+
+        where : callable, str or list of str, optional
+            Which features to retag, either a function that takes a feature
+            and returns whether to retag it or the name(s) of the features.
+            By default, all features are retagged.
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        addTags = _get_tags(add if add is not None else ())
+        removeTags = frozenset(_get_tags(remove if remove is not None else ()))
+        if isinstance(where, str):
+            where = [where]
+        if where is not None and not callable(where):
+            names = frozenset(where)
+
+            def where(feature):
+                return _get_name(feature) in names
+
+        # many features have the same tags, so each new set of tags is only
+        # computed once (and shared between features)
+        newTagsByOld = dict()
         for feature in self.features:
-            featureTags = feature['properties']['tags'].split(';')
-            for tag in tags:
-                if remove and tag in featureTags:
-                    featureTags.remove(tag)
-                elif not remove and tag not in featureTags:
-                    featureTags.append(tag)
-            feature['properties']['tags'] = ';'.join(featureTags)
+            if where is not None and not where(feature):
+                continue
+            compact = type(feature) is Feature
+            if compact:
+                tags = feature.tags
+            else:
+                tags = _get_tags(feature['properties']['tags'])
+            newTags = newTagsByOld.get(tags)
+            if newTags is None:
+                newTags = tuple(tag for tag in tags if tag not in removeTags)
+                newTags = newTags + tuple(tag for tag in addTags
+                                          if tag not in newTags)
+                newTagsByOld[tags] = newTags
+            if compact:
+                feature.tags = newTags
+            else:
+                feature['properties']['tags'] = ';'.join(newTags)
+
+        # the features need to be indexed by their new tags
+        self._propertyIndexedFeatures = None
+
+    def select(self, featureNames=None, tags=None, allTags=False,
+               componentName=None, objectType=None, bbox=None):
+        """
+        Select the features matching all the given criteria.  Features are
+        found with indices of their names, tags, components and object types
+        that are kept up to date as features are added, so a large feature
+        collection can be read once and then sliced many times.
+
+        Parameters
+        ----------
+        featureNames : list of str, optional
+            The names of the features to select
+
+        tags : str or list of str, optional
+            Tags to check for, either a list or joined with semicolons.  When
+            ``allTags=True``, a feature is only selected if it has all tags.
+            Otherwise, features with any of the tags are selected.
+
+        allTags : bool, optional
+            Whether a feature must have all tags (instead of any of the tags)
+
+        componentName : str, optional
+            The component of the features to select
+
+        objectType : {'point', 'transect', 'region'}, optional
+            The type of the features to select
+
+        bbox : tuple of float, optional
+            The bounds ``(minLon, minLat, maxLon, maxLat)`` of a box that the
+            bounds of a feature's geometry must overlap.  The bounds of each
+            geometry are kept in an index that is extended as features are
+            added, so the spatial index ``sindex`` is not needed.
+
+        Returns
+        -------
+        fc : geometric_features.FeatureCollection
+            A new feature collection with copies of the selected features,
+            which share their geometries (and cached ``shapely``
+            geometries) with the features in this collection.  Features come
+            in the order of ``featureNames``, if it is given, and otherwise
+            in the order they are in this collection.
+
+        Raises
+        ------
+        KeyError
+            If any of ``featureNames`` are not in the collection
+
+        Notes
+        -----
+        Tags, components or object types of features modified in place
+        (other than with ``tag()`` and ``retag()``) are not detected unless
+        ``features`` is replaced (e.g. ``fc.features = list(fc.features)``).
+        As for ``get_shapes()``, ``clear_shapes()`` must be called after
+        modifying coordinates in place.
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        if tags is not None:
+            tags = _get_tags(tags)
+        criteria = (featureNames, tags, allTags, componentName, objectType)
+        indices = self._select_indices(*criteria)
+        if indices is None:
+            # features were modified in place, so the index must be rebuilt
+            self._propertyIndexedFeatures = None
+            indices = self._select_indices(*criteria)
+
+        if bbox is not None and len(indices) > 0:
+            minX, minY, maxX, maxY = bbox
+            bounds = self._get_bounds(indices)
+            inBox = ((bounds[:, 0] <= maxX) & (bounds[:, 2] >= minX) &
+                     (bounds[:, 1] <= maxY) & (bounds[:, 3] >= minY))
+            indices = [indices[index] for index in np.flatnonzero(inBox)]
+
+        return self._subset(indices)
+
+    @property
+    def sindex(self):
+        """
+        A ``shapely.STRtree`` spatial index of the ``shapely`` geometries of
+        the features (see ``get_shapes()``), whose indices are the indices
+        of features in ``features``.  The tree is built when it is first
+        needed and rebuilt whenever features or their geometries change.
+        A tree can't be extended, so the whole tree is rebuilt the first time
+        it is needed after features are added.  When adding features and
+        querying them are interleaved, it is faster to add the features in
+        batches (or to use ``select()`` with ``bbox``).
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        shapes = self.get_shapes()
+        tree = self._sindex
+        if tree is None or len(tree) != len(shapes) or \
+                not all(map(operator.is_, tree.geometries, shapes)):
+            tree = shapely.STRtree(shapes)
+            self._sindex = tree
+        return tree
+
+    def query(self, geometry, predicate=None, distance=None):
+        """
+        Find the features whose geometries satisfy a predicate with a
+        geometry (or any of several geometries), using the spatial index
+        ``sindex`` (which is rebuilt after features are added)
+
+        Parameters
+        ----------
+        geometry : shapely.Geometry or array-like or FeatureCollection
+            One or more ``shapely`` geometries, or a feature collection whose
+            geometries to use
+
+        predicate : str, optional
+            The predicate, e.g. ``'intersects'``, ``'touches'``,
+            ``'contains'`` or ``'dwithin'`` (see
+            ``shapely.STRtree.query()``).  By default, features whose bounding
+            boxes intersect that of the geometry are found.
+
+        distance : float, optional
+            The distance (in degrees) for the ``'dwithin'`` predicate
+
+        Returns
+        -------
+        fc : geometric_features.FeatureCollection
+            A new feature collection with copies of the features that were
+            found (in the order they are in this collection), which share
+            their geometries with the features in this collection
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        if isinstance(geometry, FeatureCollection):
+            geometry = geometry.get_shapes()
+        indices = self.sindex.query(geometry, predicate=predicate,
+                                    distance=distance)
+        if indices.ndim == 2:
+            # the second row has the indices of features in the tree
+            indices = indices[1]
+        return self._subset(np.unique(indices).tolist())
+
+    def nearest(self, geometry, maxDistance=None):
+        """
+        Find the features nearest to a geometry (or to each of several
+        geometries), using the spatial index ``sindex``.  Distances are
+        computed in degrees of longitude and latitude, as if they were
+        Cartesian coordinates.
+
+        Parameters
+        ----------
+        geometry : shapely.Geometry or array-like or FeatureCollection
+            One or more ``shapely`` geometries, or a feature collection whose
+            geometries to use
+
+        maxDistance : float, optional
+            The largest distance (in degrees) at which to look for features
+
+        Returns
+        -------
+        fc : geometric_features.FeatureCollection
+            A new feature collection with copies of the nearest features (all
+            of them if several are equally near, in the order they are in
+            this collection), which share their geometries with the features
+            in this collection
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        if isinstance(geometry, FeatureCollection):
+            geometry = geometry.get_shapes()
+        indices = self.sindex.query_nearest(geometry, max_distance=maxDistance,
+                                            all_matches=True)
+        if indices.ndim == 2:
+            # the second row has the indices of features in the tree
+            indices = indices[1]
+        return self._subset(np.unique(indices).tolist())
 
     def set_group_name(self, groupName):
         """
@@ -173,7 +644,88 @@ class FeatureCollection(object):
 
         self.otherProperties['groupName'] = groupName
 
-    def combine(self, featureName):
+    def get_shapes(self, prepare=False):
+        """
+        Get ``shapely`` geometries for the features in the collection.  The
+        geometries are cached, so each is only constructed once unless the
+        feature's geometry is replaced (e.g. ``feature['geometry'] = ...``).
+        Feature collections returned by ``combine()``, ``difference()``,
+        ``simplify()`` and ``fix_antimeridian()`` start with the geometries
+        they computed already in the cache.
+
+        Parameters
+        ----------
+        prepare : bool, optional
+            Whether to prepare the geometries with ``shapely.prepare()``,
+            which speeds up repeated predicates like ``intersects()``
+
+        Returns
+        -------
+        shapes : numpy.ndarray of shapely.Geometry
+            A ``shapely`` geometry for each feature
+
+        Notes
+        -----
+        Coordinates modified in place are not detected, so
+        ``clear_shapes()`` must be called after doing so.
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        features = self.features
+        shapeCache = self._shapeCache
+        cachedShapes = []
+        missingIndices = []
+        for index, feature in enumerate(features):
+            entry = shapeCache.get(id(feature))
+            if entry is not None and entry[0] is feature and \
+                    entry[1] is _get_geometry(feature):
+                cachedShapes.append(entry[2])
+            else:
+                cachedShapes.append(None)
+                missingIndices.append(index)
+        shapes = np.fromiter(cachedShapes, dtype=object,
+                             count=len(cachedShapes))
+
+        # unless the cache holds exactly the geometries of these features,
+        # compute any that are missing and only keep the geometries of
+        # features still in the collection
+        if len(missingIndices) > 0 or len(shapeCache) != len(features):
+            cache = {id(features[index]): shapeCache[id(features[index])]
+                     for index, shape in enumerate(cachedShapes)
+                     if shape is not None}
+            if len(missingIndices) > 0:
+                missingFeatures = [features[index]
+                                   for index in missingIndices]
+                missingShapes = _get_shapes(missingFeatures)
+                shapes[missingIndices] = missingShapes
+                for feature, shape in zip(missingFeatures, missingShapes,
+                                          strict=True):
+                    cache[id(feature)] = \
+                        (feature, _get_geometry(feature), shape)
+            self._shapeCache = cache
+
+        if prepare:
+            shapely.prepare(shapes)
+        return shapes
+
+    def clear_shapes(self):
+        """
+        Clear the cache of ``shapely`` geometries used by ``get_shapes()``
+        and the spatial index ``sindex``, e.g. after modifying coordinates in
+        place
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        self._shapeCache = dict()
+        self._sindex = None
+        self._boundsIndexedFeatures = None
+
+    def combine(self, featureName, coverage=False, gridSize=None,
+                maxWorkers=None, executor='process'):
         """
         Combines the geometry of the feature collection into a single feature
 
@@ -182,6 +734,32 @@ class FeatureCollection(object):
         featureName : str
             The name of the new, combined feature
 
+        coverage : bool, optional
+            Whether the features are likely to be regions that don't overlap
+            and share boundaries with matching vertices (a coverage), in
+            which case their union is found much faster with
+            ``shapely.coverage_union_all()``.  If the union turns out not to
+            be valid, the features are combined as if this were ``False``.
+
+        gridSize : float, optional
+            The size of a grid in degrees lon/lat to snap the coordinates to
+            while combining features, which makes combining features with
+            nearly matching boundaries faster and more robust.  By default,
+            coordinates are not snapped.  Not used for coverages.
+
+        maxWorkers : int, optional
+            The number of processes or threads to use to combine features
+            concurrently.  The features are split into chunks that are
+            combined separately, and then the results are combined, always in
+            the same order so that the result doesn't depend on which
+            workers finish first.  By default, all features are combined in a
+            single call to ``shapely``.
+
+        executor : {'process', 'thread'} or Executor, optional
+            Whether to combine features in a pool of processes or of
+            threads, or an existing ``concurrent.futures.Executor`` to use
+            (see ``difference()``)
+
         Returns
         -------
         fc : geometric_features.FeatureCollection
@@ -198,17 +776,23 @@ class FeatureCollection(object):
         # -------
         # Xylar Asay-Davis
 
-        featureShapes = []
+        featureShapes = self.get_shapes()
         authors = []
         featureNames = []
         for feature in self.features:
-            featureShapes.append(shapely.geometry.shape(feature['geometry']))
             authors.append(feature['properties']['author'])
             featureNames.append(feature['properties']['name'])
 
-        combinedShape = shapely.ops.unary_union(featureShapes)
+        combinedShape = None
+        if coverage:
+            combinedShape = _coverage_union(featureShapes)
+        if combinedShape is None:
+            combinedShape = _tree_union(featureShapes, gridSize, maxWorkers,
+                                        executor)
 
-        geometry = shapely.geometry.mapping(combinedShape)
+        columnar = all(isinstance(feature['geometry'], ColumnarGeometry)
+                       for feature in self.features)
+        geometry = _get_geometries([combinedShape], [columnar])[0]
 
         try:
             objectType = _get_geom_object_type(geometry['type'])
@@ -233,13 +817,19 @@ class FeatureCollection(object):
         feature['geometry'] = geometry
 
         fc = FeatureCollection([feature])
+        fc._cache_shapes([combinedShape])
         return fc
 
-    def difference(self, maskingFC, show_progress=False):
+    def difference(self, maskingFC, show_progress=False, maxWorkers=None,
+                   executor='process'):
         """
         Use features from a masking collection to mask out (remove part of
         the geometry from) this collection.
 
+        The masks that intersect each feature are found with the spatial
+        index of the masking collection, and the feature is masked by their
+        union.  Features covered by a mask are dropped.
+
         Parameters
         ----------
         maskingFC : geometric_features.FeatureCollection
@@ -248,6 +838,19 @@ class FeatureCollection(object):
         show_progress : bool
             Show a progress bar
 
+        maxWorkers : int, optional
+            The number of processes or threads to use to mask features
+            concurrently.  By default, features are masked one at a time
+            (unless ``executor`` is an existing executor).  Either way, the
+            features are in the same order as in this collection.
+
+        executor : {'process', 'thread'} or Executor, optional
+            Whether to mask features in a pool of processes (to which the
+            geometries are sent as well-known binary) or of threads (which
+            share the geometries but only run concurrently while ``shapely``
+            releases python's global interpreter lock), or an existing
+            ``concurrent.futures.Executor`` to use
+
         Returns
         -------
         fc : geometric_features.FeatureCollection
@@ -259,50 +862,69 @@ class FeatureCollection(object):
         # Xylar Asay-Davis
 
         featureCount = len(self.features)
-        maskCount = len(maskingFC.features)
-
-        totalCount = featureCount * maskCount
+        featureShapes = self.get_shapes()
+        maskShapes = maskingFC.get_shapes()
+
+        # find the masks that intersect each feature with the spatial index
+        # of the masks, rather than testing every feature against every mask
+        featureIndices, maskIndices = maskingFC.sindex.query(
+            featureShapes, predicate='intersects')
+        featureMasks = dict()
+        for featureIndex, maskIndex in zip(featureIndices.tolist(),
+                                           maskIndices.tolist(), strict=True):
+            featureMasks.setdefault(featureIndex, []).append(maskIndex)
+        # features covered by any one mask are dropped without making the
+        # (possibly expensive) union of their masks
+        coveredIndices = set(maskingFC.sindex.query(
+            featureShapes, predicate='covered_by')[0].tolist())
+
+        # the features to mask and their masks, sorted so features with the
+        # same masks are masked together and share the union of the masks
+        tasks = sorted((tuple(sorted(indices)), featureIndex)
+                       for featureIndex, indices in featureMasks.items()
+                       if featureIndex not in coveredIndices)
 
         if show_progress:
             print('Masking features...')
-            widgets = ['', progressbar.Percentage(), ' ', progressbar.Bar(),
-                       ' ', progressbar.ETA()]
+            widgets = [progressbar.Percentage(), ' ', progressbar.Bar(), ' ',
+                       progressbar.ETA()]
             bar = progressbar.ProgressBar(widgets=widgets,
-                                          maxval=totalCount).start()
+                                          maxval=len(tasks)).start()
         else:
-            widgets = None
             bar = None
 
+        differences = _get_differences(featureShapes, maskShapes, tasks,
+                                       maxWorkers, executor, bar)
+
         maskedFeatures = []
+        maskedIndices = []
+        maskedShapes = []
+        outShapes = []
         maskedCount = 0
         droppedCount = 0
         for featureIndex, feature in enumerate(self.features):
-            name = feature['properties']['name']
-            if show_progress:
-                widgets[0] = f'{name}: '
-            featureShape = shapely.geometry.shape(feature['geometry'])
-            add = True
-            masked = False
-            for maskIndex, maskFeature in enumerate(maskingFC.features):
-                if show_progress:
-                    bar.update(maskIndex + featureIndex * maskCount)
-                maskShape = shapely.geometry.shape(maskFeature['geometry'])
-                if featureShape.intersects(maskShape):
-                    masked = True
-                    featureShape = featureShape.difference(maskShape)
-                    if featureShape.is_empty:
-                        add = False
-                        break
-
-            if add:
-                newFeature = copy.deepcopy(feature)
-                if masked:
-                    maskedCount += 1
-                    newFeature['geometry'] = \
-                        shapely.geometry.mapping(featureShape)
-                maskedFeatures.append(newFeature)
-            else:
+            featureShape = differences.get(featureIndex)
+            masked = featureShape is not None
+            if featureIndex in coveredIndices or \
+                    (masked and featureShape.is_empty):
                 droppedCount += 1
+                continue
+            if not masked:
+                featureShape = featureShapes[featureIndex]
+
+            newFeature = _copy_feature(feature)
+            if masked:
+                maskedCount += 1
+                maskedIndices.append(len(maskedFeatures))
+                maskedShapes.append(featureShape)
+            maskedFeatures.append(newFeature)
+            outShapes.append(featureShape)
+
+        columnar = [isinstance(maskedFeatures[index]['geometry'],
+                               ColumnarGeometry) for index in maskedIndices]
+        geometries = _get_geometries(maskedShapes, columnar)
+        for index, geometry in zip(maskedIndices, geometries, strict=True):
+            maskedFeatures[index]['geometry'] = geometry
 
         if show_progress:
             bar.finish()
@@ -312,6 +934,7 @@ class FeatureCollection(object):
                 droppedCount))
 
         fc = FeatureCollection(maskedFeatures, self.otherProperties)
+        fc._cache_shapes(outShapes)
         return fc
 
     def fix_antimeridian(self):
@@ -328,30 +951,61 @@ class FeatureCollection(object):
         # -------
         # Xylar Asay-Davis
 
-        fc = FeatureCollection(features=None,
-                               otherProperties=self.otherProperties)
-        for feature in self.features:
-            geometry = _split_geometry_crossing_antimeridian(
-                feature['geometry'])
-            if geometry is None:
-                # no change
-                newFeature = dict(feature)
-            else:
-                newFeature = dict()
-                newFeature['properties'] = dict(feature['properties'])
-                newFeature['geometry'] = geometry
-            fc.add_feature(newFeature)
+        featureShapes = self.get_shapes()
+        splitShapes = _split_shapes_crossing_antimeridian(featureShapes)
+        indices = np.flatnonzero(shapely.is_geometry(splitShapes))
+
+        # features that don't cross the antimeridian share their geometry
+        newFeatures = [_copy_feature(feature) for feature in self.features]
+        columnar = [isinstance(self.features[index]['geometry'],
+                               ColumnarGeometry) for index in indices]
+        geometries = _get_geometries(splitShapes[indices], columnar)
+        for index, geometry in zip(indices, geometries, strict=True):
+            newFeatures[index]['geometry'] = geometry
 
+        outShapes = featureShapes.copy()
+        outShapes[indices] = splitShapes[indices]
+        fc = FeatureCollection(newFeatures, self.otherProperties)
+        fc._cache_shapes(outShapes)
         return fc
 
-    def simplify(self, tolerance=0.0):
+    def simplify(self, tolerance=0.0, maxWorkers=None, executor='process',
+                 preserveTopology=True):
         """
         Features in the collection are simplified using ``shapely``
 
         Parameters
         ----------
-        tolerance : float, optional
-            The tolerance in degrees lon/lat allowed when simplifying shapes
+        tolerance : float or dict, optional
+            The tolerance in degrees lon/lat allowed when simplifying shapes,
+            either for all features or as a dictionary of tolerances by
+            feature name.  Features that are not in the dictionary are not
+            simplified.
+
+        maxWorkers : int, optional
+            The number of processes or threads to use to simplify features
+            concurrently, which is worthwhile for very large geometries.  By
+            default, all features are simplified together in a single
+            vectorized call to ``shapely``.
+
+        executor : {'process', 'thread'} or Executor, optional
+            Whether to simplify features in a pool of processes or of
+            threads, or an existing ``concurrent.futures.Executor`` to use
+            (see ``difference()``)
+
+        preserveTopology : {True, False, 'coverage'}, optional
+            Whether to preserve the topology of each shape (so it stays
+            valid), to use the faster Douglas-Peucker algorithm (which may
+            produce invalid shapes), or to simplify all the regions together
+            as a coverage, so that regions that share boundaries still share
+            them after they are simplified, without gaps or overlaps.  The
+            ``tolerance`` for a coverage must be a single value and is
+            roughly the square root of the area of the triangles that are
+            removed, see ``shapely.coverage_simplify()``.  The regions must
+            not overlap and the vertices along shared boundaries must match,
+            and other features are simplified with their topology preserved.
+            Coverage simplification requires ``shapely`` 2.1 or newer and
+            can't be done in a pool.
 
         Returns
         -------
@@ -362,16 +1016,63 @@ class FeatureCollection(object):
         # -------
         # Xylar Asay-Davis
 
-        newFeatures = []
-        for feature in self.features:
-            featureShape = shapely.geometry.shape(feature['geometry'])
-            simplifiedFeature = featureShape.simplify(tolerance)
-            newFeature = copy.deepcopy(feature)
-            newFeature['geometry'] = \
-                shapely.geometry.mapping(simplifiedFeature)
-            newFeatures.append(newFeature)
+        if preserveTopology not in [True, False, 'coverage']:
+            raise ValueError(f'Unexpected preserveTopology '
+                             f'{preserveTopology}')
+        coverage = preserveTopology == 'coverage'
+        if coverage:
+            if isinstance(tolerance, Mapping):
+                raise ValueError('Coverage simplification requires a single '
+                                 'tolerance')
+            if not hasattr(shapely, 'coverage_simplify'):
+                raise ImportError('Coverage simplification requires shapely '
+                                  '2.1 or newer')
+            preserveTopology = True
+
+        featureShapes = self.get_shapes()
+        if isinstance(tolerance, Mapping):
+            indices = [index for index, feature in enumerate(self.features)
+                       if _get_name(feature) in tolerance]
+            tolerances = np.array(
+                [tolerance[_get_name(self.features[index])]
+                 for index in indices], dtype=float)
+        else:
+            indices = list(range(len(self.features)))
+            tolerances = np.full(len(indices), tolerance, dtype=float)
+        simplifiedShapes = featureShapes.copy()
+        if coverage:
+            # the regions are simplified together, and only the other
+            # features are simplified separately below
+            isRegion = np.isin(shapely.get_type_id(featureShapes),
+                               [shapely.GeometryType.POLYGON,
+                                shapely.GeometryType.MULTIPOLYGON])
+            regionIndices = np.flatnonzero(isRegion)
+            if len(regionIndices) > 0:
+                simplifiedShapes[regionIndices] = shapely.coverage_simplify(
+                    featureShapes[regionIndices], tolerance)
+            tolerances = tolerances[~isRegion]
+            otherIndices = np.flatnonzero(~isRegion)
+        else:
+            otherIndices = indices
+        shapes = featureShapes[otherIndices]
+
+        chunks = [((shapes[chunk],), (tolerances[chunk], preserveTopology))
+                  for chunk in _split_by_points(
+                      shapes, _get_chunk_count(maxWorkers, executor))]
+        results = _map_shapes(_simplify_shapes, chunks, maxWorkers,
+                              executor)
+        if len(otherIndices) > 0:
+            simplifiedShapes[otherIndices] = np.concatenate(results)
+
+        newFeatures = [_copy_feature(feature) for feature in self.features]
+        columnar = [isinstance(self.features[index]['geometry'],
+                               ColumnarGeometry) for index in indices]
+        geometries = _get_geometries(simplifiedShapes[indices], columnar)
+        for index, geometry in zip(indices, geometries, strict=True):
+            newFeatures[index]['geometry'] = geometry
 
         fc = FeatureCollection(newFeatures, self.otherProperties)
+        fc._cache_shapes(simplifiedShapes)
         return fc
 
     def feature_in_collection(self, feature):
@@ -392,10 +1093,193 @@ class FeatureCollection(object):
         # -------
         # Xylar Asay-Davis
 
-        featureNames = [f['properties']['name'] for f in self.features]
-        return feature['properties']['name'] in featureNames
+        return self._find(feature['properties']['name']) is not None
 
-    def to_geojson(self, fileName, stripHistory=False, indent=4):
+    def _find(self, featureName):
+        """
+        Find the index of the first feature with the given name, or ``None``
+        if there is no such feature
+        """
+        index = self._get_name_index().get(featureName)
+        if index is not None and \
+                _get_name(self.features[index]) != featureName:
+            # features were modified in place, so the index must be rebuilt
+            self._indexedFeatures = None
+            index = self._get_name_index().get(featureName)
+        return index
+
+    def _get_name_index(self):
+        """
+        Get the index of feature names, adding any features that have been
+        appended since it was last updated and rebuilding it if ``features``
+        has been replaced or shortened
+        """
+        features = self.features
+        if features is not self._indexedFeatures or \
+                len(features) < self._indexedCount:
+            self._nameIndex = dict()
+            self._indexedFeatures = features
+            self._indexedCount = 0
+        for index in range(self._indexedCount, len(features)):
+            self._nameIndex.setdefault(_get_name(features[index]), index)
+        self._indexedCount = len(features)
+        return self._nameIndex
+
+    def _select_indices(self, featureNames, tags, allTags, componentName,
+                        objectType):
+        """
+        Find the indices of features matching the criteria of ``select()``,
+        or ``None`` if the property index is out of date
+        """
+        indices = None
+        if featureNames is not None:
+            indices = []
+            for featureName in featureNames:
+                index = self._find(featureName)
+                if index is None:
+                    raise KeyError(f'Feature {featureName} not in collection')
+                indices.append(index)
+            indices = list(dict.fromkeys(indices))
+
+        tagIndex, componentIndex, objectIndex = self._get_property_index()
+        matches = []
+        if tags is not None:
+            tagMatches = [tagIndex.get(tag, ()) for tag in tags]
+            if allTags:
+                matches.extend(tagMatches)
+            else:
+                matches.append(set().union(*tagMatches))
+        if componentName is not None:
+            matches.append(componentIndex.get(componentName, ()))
+        if objectType is not None:
+            matches.append(objectIndex.get(objectType, ()))
+
+        if len(matches) > 0:
+            matching = set(min(matches, key=len)).intersection(*matches)
+            if indices is None:
+                indices = sorted(matching)
+            else:
+                indices = [index for index in indices if index in matching]
+        elif indices is None:
+            indices = list(range(len(self.features)))
+
+        if len(matches) > 0:
+            for index in indices:
+                featureTags, component, featureObject = \
+                    _get_indexed_properties(self.features[index])
+                if (componentName is not None and
+                        component != componentName) or \
+                        (objectType is not None and
+                         featureObject != objectType) or \
+                        (tags is not None and not _has_tags(
+                            featureTags, tags, allTags)):
+                    return None
+        return indices
+
+    def _get_property_index(self):
+        """
+        Get the indices of features by tag, component and object type,
+        adding any features that have been appended since they were last
+        updated and rebuilding them if ``features`` has been replaced or
+        shortened
+        """
+        features = self.features
+        if features is not self._propertyIndexedFeatures or \
+                len(features) < self._propertyIndexedCount:
+            self._propertyIndex = (dict(), dict(), dict())
+            self._propertyIndexedFeatures = features
+            self._propertyIndexedCount = 0
+        tagIndex, componentIndex, objectIndex = self._propertyIndex
+        for index in range(self._propertyIndexedCount, len(features)):
+            featureTags, component, featureObject = \
+                _get_indexed_properties(features[index])
+            for tag in featureTags:
+                tagIndex.setdefault(tag, []).append(index)
+            componentIndex.setdefault(component, []).append(index)
+            objectIndex.setdefault(featureObject, []).append(index)
+        self._propertyIndexedCount = len(features)
+        return self._propertyIndex
+
+    def _get_bounds(self, indices):
+        """
+        Get the bounds of the geometries of the features at the given
+        indices, adding the bounds of any features that have been appended
+        since they were last updated, rebuilding them if ``features`` has
+        been replaced or shortened and updating those of features whose
+        geometries have been replaced
+        """
+        features = self.features
+        geometries = self._boundsGeometries
+        if features is not self._boundsIndexedFeatures or \
+                len(features) < len(geometries):
+            geometries = []
+            self._boundsGeometries = geometries
+            self._boundsIndexedFeatures = features
+
+        # the array of bounds grows geometrically, so adding features one at
+        # a time takes linear time overall
+        start = len(geometries)
+        if len(features) > len(self._bounds):
+            bounds = np.empty((max(len(features), 2 * len(self._bounds)), 4))
+            bounds[:start] = self._bounds[:start]
+            self._bounds = bounds
+        if len(features) > start:
+            newFeatures = features[start:]
+            self._bounds[start:len(features)] = \
+                shapely.bounds(_get_shapes(newFeatures))
+            geometries.extend(_get_geometry(feature)
+                              for feature in newFeatures)
+
+        # _get_geometry() is inlined because this is checked for every
+        # feature on every selection
+        replaced = []
+        for index in indices:
+            feature = features[index]
+            if type(feature) is Feature:
+                geometry = feature.geometry
+            else:
+                geometry = feature['geometry']
+            if geometry is not geometries[index]:
+                replaced.append(index)
+        if len(replaced) > 0:
+            replacedFeatures = [features[index] for index in replaced]
+            self._bounds[replaced] = \
+                shapely.bounds(_get_shapes(replacedFeatures))
+            for index, feature in zip(replaced, replacedFeatures,
+                                      strict=True):
+                geometries[index] = _get_geometry(feature)
+        return self._bounds[np.fromiter(indices, dtype=np.intp,
+                                        count=len(indices))]
+
+    def _subset(self, indices):
+        """
+        Make a new feature collection with copies of the features at the
+        given indices, passing on their cached ``shapely`` geometries
+        """
+        features = [_copy_feature(self.features[index]) for index in indices]
+        fc = FeatureCollection(features, self.otherProperties)
+
+        # pass on the shapely geometries that have already been computed
+        for index, feature in zip(indices, features, strict=True):
+            original = self.features[index]
+            entry = self._shapeCache.get(id(original))
+            if entry is not None and entry[0] is original and \
+                    entry[1] is feature.geometry:
+                fc._shapeCache[id(feature)] = \
+                    (feature, feature.geometry, entry[2])
+        return fc
+
+    def _cache_shapes(self, shapes):
+        """
+        Cache ``shapely`` geometries that have already been computed for
+        the features in the collection
+        """
+        self._shapeCache = {
+            id(feature): (feature, feature['geometry'], shape)
+            for feature, shape in zip(self.features, shapes, strict=True)}
+
+    def to_geojson(self, fileName, stripHistory=False, indent=4,
+                   compact=False, compressionLevel=None):
         """
         Write the feature collection to a geojson file
 
@@ -411,76 +1295,399 @@ class FeatureCollection(object):
         indent : int, optional
             The number of spaces to use for indentation when formatting the
             geojson file
+
+        compact : bool, optional
+            Whether to write the file without any optional whitespace (so
+            ``indent`` is ignored), which is much smaller and faster to write
+            and read but is not easy to read
+
+        compressionLevel : int, optional
+            The compression level if ``fileName`` ends with ``.gz`` (gzip,
+            6 by default) or ``.zst`` (zstandard, 3 by default), in which
+            case the file is compressed as it is written
         """
         # Authors
         # -------
         # Douglas Jacobsen, Xylar Asay-Davis, Phillip J. Wolfram
 
-        outFeatures = dict(self.otherProperties)
-        # features go last for readability
-        outFeatures['features'] = copy.deepcopy(self.features)
-
         if stripHistory:
-            # remove provenance from the output
-            for feature in outFeatures['features']:
-                # pop (with default so no exception is raised if no history)
-                feature['properties'].pop('history', None)
+            command = None
         else:
-            # provenance the output
             command = provenance_command()
-            for feature in outFeatures['features']:
-                if 'history' in feature['properties']:
-                    history = feature['properties']['history'] + ' ' + command
-                    feature['properties']['history'] = history
-                else:
-                    feature['properties']['history'] = command
 
-        outFile = open(fileName, 'w')
+        outFeatures = dict(self.otherProperties)
+        # features go last for readability
+        outFeatures.pop('features', None)
+        outFeatures['features'] = []
+
+        if compact:
+            indent = None
+        if indent is None:
+            featureSeparator = ',' if compact else ', '
+            newline = ''
+        else:
+            if not isinstance(indent, str):
+                indent = ' ' * indent
+            featureSeparator = ','
+            newline = '\n' + 2 * indent
+
+        # write everything up to the (empty) list of features, then each
+        # feature separately so that no copy of the full collection is made
+        text = dumps(outFeatures, indent=indent, compact=compact)
+        index = text.rindex('[]')
+        with open_feature_file(fileName, 'w', compressionLevel) as outFile:
+            outFile.write(text[:index + 1])
+            for featureIndex, feature in enumerate(self.features):
+                if featureIndex > 0:
+                    outFile.write(featureSeparator)
+                outFeature = _get_out_feature(feature, command)
+                # json strings can't contain newlines, so this only indents
+                featureText = dumps(outFeature, indent=indent,
+                                    compact=compact).replace('\n', newline)
+                outFile.write(newline + featureText)
+            if len(self.features) > 0 and indent is not None:
+                outFile.write('\n' + indent)
+            outFile.write(text[index + 1:])
+
+    def to_bytes(self):
+        """
+        Pack the feature collection into bytes, with the coordinates of all
+        geometries in flat arrays and the properties of the features in a
+        compact json table, so the properties must be json-compatible.
+        This is much smaller and faster to send to another process than
+        nested lists of coordinates.  Pickling a feature collection packs
+        the coordinates in the same way but pickles the properties as usual,
+        so they can be any python objects.
+
+        Returns
+        -------
+        data : bytes
+            The packed feature collection
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
 
-        for feature in outFeatures['features']:
-            feature['geometry']['coordinates'] = \
-                _round_coords(feature['geometry']['coordinates'])
+        from geometric_features.serialization import to_bytes
 
-        json.dump(outFeatures, outFile, indent=indent)
+        return to_bytes(self)
 
-    def plot(self, projection, maxLength=4.0, figsize=None, colors=None,
-             dpi=200):
+    @classmethod
+    def from_bytes(cls, data, columnar=None):
         """
-        Plot the features on a map using cartopy.
+        Unpack a feature collection packed with ``to_bytes()``
 
         Parameters
         ----------
-        projection : str or ``cartopy.crs.Projection``
-            A cartopy projection object or one of the internally defined
-            map names:
-
-                'cyl', 'merc', 'mill', 'mill2', 'moll', 'moll2', 'robin',
-                'robin2', 'ortho', 'northpole', 'southpole', 'atlantic',
-                'pacific', 'americas', 'asia'
-
-        maxLength : float, optional
-            Maximum allowed segment length after subdivision for smoother
-            plotting (0.0 indicates skip subdivision)
-
-        figsize : tuple of float
-            Size of the figure in inches
-
-        colors : list of str
-            Colors to cycle through for the shapes
+        data : bytes-like
+            The packed feature collection
 
-        dpi : int
-            Dots per inch for the figure
+        columnar : bool, optional
+            Whether to store the coordinates of each geometry in NumPy arrays
+            (see :class:`geometric_features.ColumnarGeometry`) rather than
+            nested lists.  Unpacking columnar geometries is much faster.  By
+            default, each geometry is unpacked the way it was stored when it
+            was packed.
 
         Returns
         -------
-        fig : ``matplotlib.figure.Figure``
-            The figure
+        fc : geometric_features.FeatureCollection
+            The feature collection
         """
         # Authors
         # -------
-        # Xylar Asay-Davis, `Phillip J. Wolfram
+        # Xylar Asay-Davis
 
-        projectionName = 'custom'
+        from geometric_features.serialization import from_bytes
+
+        return from_bytes(data, columnar)
+
+    def to_shared_memory(self, name=None):
+        """
+        Pack the feature collection (see ``to_bytes()``) into a new block of
+        shared memory, so that worker processes can attach to it with
+        ``from_shared_memory()`` rather than each holding its own copy
+
+        Parameters
+        ----------
+        name : str, optional
+            The name of the shared memory block, a unique name by default
+
+        Returns
+        -------
+        sharedMemory : multiprocessing.shared_memory.SharedMemory
+            The shared memory block, which can be passed to workers (or its
+            ``name`` can).  The caller must ``close()`` and ``unlink()`` it
+            once the workers are done with it.
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        from geometric_features.serialization import to_shared_memory
+
+        return to_shared_memory(self, name)
+
+    @classmethod
+    def from_shared_memory(cls, sharedMemory):
+        """
+        Attach to a feature collection in shared memory made with
+        ``to_shared_memory()`` without copying the coordinates
+
+        The geometries are columnar (see
+        :class:`geometric_features.ColumnarGeometry`) and their coordinates
+        are read-only views of the shared memory, which stays attached as
+        long as any of them are in use.  The properties of the features are
+        separate for each process and can be modified.  The process that
+        called ``to_shared_memory()`` owns the block and must close and
+        unlink it; attaching never unlinks the block, even when the attaching
+        process exits.
+
+        Parameters
+        ----------
+        sharedMemory : multiprocessing.shared_memory.SharedMemory or str
+            The shared memory block or its name
+
+        Returns
+        -------
+        fc : geometric_features.FeatureCollection
+            The feature collection
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        from geometric_features.serialization import from_shared_memory
+
+        return from_shared_memory(sharedMemory)
+
+    def __reduce__(self):
+        from geometric_features.serialization import _reduce
+
+        return _reduce(self)
+
+    def __copy__(self):
+        # a shallow copy shares the list of features, rather than packing
+        # their coordinates as ``__reduce__()`` does
+        return FeatureCollection(self.features, self.otherProperties)
+
+    def __deepcopy__(self, memo):
+        return FeatureCollection(copy.deepcopy(self.features, memo),
+                                 copy.deepcopy(self.otherProperties, memo))
+
+    def to_arrow(self, geometryEncoding=None):
+        """
+        Convert the feature collection to an Arrow table following the
+        GeoParquet convention, with one column for each property and a
+        ``geometry`` column.  Requires ``pyarrow``.
+
+        Properties missing from a feature are null.  Properties with values
+        of a single type of scalar (``str``, ``int``, ``float`` or ``bool``)
+        are stored natively, while others are stored as json strings.
+
+        Parameters
+        ----------
+        geometryEncoding : {'WKB', 'geoarrow'}, optional
+            Whether to encode geometries as well-known binary or with the
+            GeoArrow-native encoding for their geometry type, which is faster
+            to read but is only possible if all geometries have the same type.
+            By default, the GeoArrow-native encoding is used whenever
+            possible.
+
+        Returns
+        -------
+        table : pyarrow.Table
+            The table
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        from geometric_features.arrow import to_arrow_table
+
+        return to_arrow_table(self, geometryEncoding)
+
+    @classmethod
+    def from_arrow(cls, table, columnar=False):
+        """
+        Construct a feature collection from an Arrow table following the
+        GeoParquet convention, such as one produced by ``to_arrow()``.
+        Requires ``pyarrow``.
+
+        Parameters
+        ----------
+        table : pyarrow.Table
+            The table, with a geometry column and a column for each property
+
+        columnar : bool, optional
+            Whether to store the coordinates of each geometry in NumPy arrays
+            (see :class:`geometric_features.ColumnarGeometry`) rather than
+            nested lists
+
+        Returns
+        -------
+        fc : geometric_features.FeatureCollection
+            The new feature collection
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        from geometric_features.arrow import from_arrow_table
+
+        return from_arrow_table(table, columnar)
+
+    def to_parquet(self, fileName, geometryEncoding=None):
+        """
+        Write the feature collection to a GeoParquet file (see
+        ``to_arrow()``).  Requires ``pyarrow``.
+
+        Parameters
+        ----------
+        fileName : str
+            A parquet file to write to
+
+        geometryEncoding : {'WKB', 'geoarrow'}, optional
+            Whether to encode geometries as well-known binary or with the
+            GeoArrow-native encoding for their geometry type, by default the
+            latter if all geometries have the same type
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        from geometric_features.arrow import write_parquet
+
+        write_parquet(self, fileName, geometryEncoding)
+
+    @classmethod
+    def from_parquet(cls, fileName, columns=None, columnar=False):
+        """
+        Read a feature collection from a GeoParquet file.  Requires
+        ``pyarrow``.
+
+        Parameters
+        ----------
+        fileName : str
+            The parquet file to read
+
+        columns : list of str, optional
+            The properties to read, all by default.  The ``name``, ``object``
+            and ``component`` properties and the geometry are always read.
+
+        columnar : bool, optional
+            Whether to store the coordinates of each geometry in NumPy arrays
+            (see :class:`geometric_features.ColumnarGeometry`) rather than
+            nested lists
+
+        Returns
+        -------
+        fc : geometric_features.FeatureCollection
+            The new feature collection
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        from geometric_features.arrow import read_parquet
+
+        return read_parquet(fileName, columns, columnar)
+
+    def to_arrow_ipc(self, fileName, geometryEncoding=None):
+        """
+        Write the feature collection to an uncompressed Arrow IPC (Feather)
+        file (see ``to_arrow()``), which can be memory-mapped when it is
+        read.  Requires ``pyarrow``.
+
+        Parameters
+        ----------
+        fileName : str
+            An Arrow IPC file to write to
+
+        geometryEncoding : {'WKB', 'geoarrow'}, optional
+            Whether to encode geometries as well-known binary or with the
+            GeoArrow-native encoding for their geometry type, by default the
+            latter if all geometries have the same type
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        from geometric_features.arrow import write_arrow_ipc
+
+        write_arrow_ipc(self, fileName, geometryEncoding)
+
+    @classmethod
+    def from_arrow_ipc(cls, fileName, columns=None, columnar=False):
+        """
+        Read a feature collection from an Arrow IPC (Feather) file.  Requires
+        ``pyarrow``.
+
+        Parameters
+        ----------
+        fileName : str
+            The Arrow IPC file to read
+
+        columns : list of str, optional
+            The properties to read, all by default.  The ``name``, ``object``
+            and ``component`` properties and the geometry are always read.
+
+        columnar : bool, optional
+            Whether to store the coordinates of each geometry in NumPy arrays
+            (see :class:`geometric_features.ColumnarGeometry`) rather than
+            nested lists
+
+        Returns
+        -------
+        fc : geometric_features.FeatureCollection
+            The new feature collection
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        from geometric_features.arrow import read_arrow_ipc
+
+        return read_arrow_ipc(fileName, columns, columnar)
+
+    def plot(self, projection, maxLength=4.0, figsize=None, colors=None,
+             dpi=200):
+        """
+        Plot the features on a map using cartopy.
+
+        Parameters
+        ----------
+        projection : str or ``cartopy.crs.Projection``
+            A cartopy projection object or one of the internally defined
+            map names:
+
+                'cyl', 'merc', 'mill', 'mill2', 'moll', 'moll2', 'robin',
+                'robin2', 'ortho', 'northpole', 'southpole', 'atlantic',
+                'pacific', 'americas', 'asia'
+
+        maxLength : float, optional
+            Maximum allowed segment length after subdivision for smoother
+            plotting (0.0 indicates skip subdivision)
+
+        figsize : tuple of float
+            Size of the figure in inches
+
+        colors : list of str
+            Colors to cycle through for the shapes
+
+        dpi : int
+            Dots per inch for the figure
+
+        Returns
+        -------
+        fig : ``matplotlib.figure.Figure``
+            The figure
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis, `Phillip J. Wolfram
+
+        projectionName = 'custom'
 
         if isinstance(projection, str):
             projections = build_projections()
@@ -505,9 +1712,10 @@ class FeatureCollection(object):
 
         bounds = None
 
+        featureShapes = self.get_shapes()
         for featureIndex, feature in enumerate(self.features):
             geomType = feature['geometry']['type']
-            shape = shapely.geometry.shape(feature['geometry'])
+            shape = featureShapes[featureIndex]
             if maxLength > 0.0:
                 shape = subdivide_geom(shape, geomType, maxLength)
 
@@ -561,13 +1769,7 @@ def _get_geom_object_type(geomType):
     """
     Get the object type for a given geometry type
     """
-    geomObjectTypes = {'Polygon': 'region',
-                       'MultiPolygon': 'region',
-                       'LineString': 'transect',
-                       'MultiLineString': 'transect',
-                       'Point': 'point',
-                       'MultiPoint': 'point'}
-    return geomObjectTypes[geomType]
+    return _geomObjectTypes[geomType]
 
 
 def _validate_feature(feature):
@@ -585,9 +1787,15 @@ def _validate_feature(feature):
 
     Parameters
     ----------
-    feature : dict
+    feature : dict or geometric_features.Feature
         The feature to check
 
+    Returns
+    -------
+    feature : geometric_features.Feature
+        A compact copy of the feature with its properties in the standard
+        order
+
     Raises
     ------
     KeyError
@@ -600,116 +1808,421 @@ def _validate_feature(feature):
     # -------
     # Xylar Asay-Davis, Phillip J. Wolfram
 
-    required = {
-        'properties': ['name', 'object', 'component'],
-        'geometry': ['type', 'coordinates']}
+    error = _check_feature(feature)
+    if error is not None:
+        raise error
+    return _compact_feature(feature, orderGeometry=True)
 
-    try:
-        name = feature['properties']['name']
-    except KeyError:
-        name = 'unknown'
-    for outerKey in required:
-        if outerKey not in feature:
-            raise KeyError(f'Feature {name} missing [{outerKey}] key')
-        for innerKey in required[outerKey]:
-            if innerKey not in feature[outerKey]:
-                raise KeyError(
-                    f'Feature {name} missing [{outerKey}][{innerKey}] key')
-
-    geomType = feature['geometry']['type']
-    objectType = feature['properties']['object']
-    if _get_geom_object_type(geomType) != objectType:
-        raise ValueError('Object type {} and geometry type {} '
-                         'are incompatible'.format(objectType, geomType))
-
-    if 'author' in feature['properties']:
-        author = feature['properties']['author']
+
+def _check_feature(feature):
+    """
+    Check that a feature has all required keys and that its geometry type
+    matches its object type, returning the exception to raise if not (or
+    ``None`` if the feature is valid)
+    """
+    if type(feature) is Feature:
+        # the properties are attributes so only the geometry can be missing
+        # keys
+        name = feature.name
+        objectType = feature.objectType
     else:
-        author = ''
+        try:
+            name = feature['properties']['name']
+        except (KeyError, TypeError):
+            name = 'unknown'
+        for outerKey in _requiredKeys:
+            if outerKey not in feature:
+                return KeyError(f'Feature {name} missing [{outerKey}] key')
+            for innerKey in _requiredKeys[outerKey]:
+                if innerKey not in feature[outerKey]:
+                    return KeyError(
+                        f'Feature {name} missing [{outerKey}][{innerKey}] '
+                        f'key')
+        objectType = feature['properties']['object']
+
+    geometry = feature['geometry']
+    for innerKey in _requiredKeys['geometry']:
+        if innerKey not in geometry:
+            return KeyError(
+                f'Feature {name} missing [geometry][{innerKey}] key')
+
+    geomType = geometry['type']
+    if _geomObjectTypes.get(geomType) != objectType:
+        return ValueError('Object type {} and geometry type {} '
+                          'are incompatible'.format(objectType, geomType))
+    return None
+
+
+def _compact_feature(feature, orderGeometry):
+    """
+    Make a compact copy of a feature, optionally with its geometry in a new
+    dictionary with ``type`` and ``coordinates`` first and other keys sorted
+    """
+    if type(feature) is Feature:
+        # the properties are already in the desired order
+        outFeature = feature.copy()
+    else:
+        # Properties come in the order name, tags, object, component, author
+        # and then the rest sorted, with the geometry last (easier to read)
+        outFeature = Feature.from_geojson(feature)
+
+    geometry = outFeature.geometry
+    if orderGeometry and type(geometry) is not ColumnarGeometry:
+        # Make the geometry an ordered dictionary so they can keep it in the
+        # desired order (the coordinates of columnar geometries are already
+        # in arrays, not lists we need to order)
+        outGeometry = {'type': geometry['type'],
+                       'coordinates': geometry['coordinates']}
+        for key in sorted(geometry):
+            if key not in outGeometry.keys():
+                outGeometry[key] = geometry[key]
+        outFeature.geometry = outGeometry
+    return outFeature
+
+
+def _to_columnar(features):
+    """
+    Convert the geometry of each feature to a columnar geometry as it is
+    iterated over
+    """
+    for feature in features:
+        feature['geometry'] = \
+            ColumnarGeometry.from_geojson(feature['geometry'])
+        yield feature
+
+
+def _copy_feature(feature):
+    """
+    Copy a feature so its properties can be changed independently, sharing
+    its geometry (which should be replaced, not modified in place)
+    """
+    if isinstance(feature, Feature):
+        return feature.copy()
+    return Feature.from_geojson(feature)
+
+
+def _get_name(feature):
+    """
+    Get the name of a feature, quickly if it is a compact feature
+    """
+    if type(feature) is Feature:
+        return feature.name
+    return feature['properties']['name']
+
+
+def _get_geometry(feature):
+    """
+    Get the geometry of a feature, quickly if it is a compact feature
+    """
+    if type(feature) is Feature:
+        return feature.geometry
+    return feature['geometry']
+
+
+def _get_indexed_properties(feature):
+    """
+    Get the tags, component and object type of a feature, quickly if it is a
+    compact feature
+    """
+    if type(feature) is Feature:
+        return feature.tags, feature.component, feature.objectType
+    properties = feature['properties']
+    return (_get_tags(properties.get('tags', '')), properties['component'],
+            properties['object'])
+
+
+def _has_tags(featureTags, tags, allTags):
+    """
+    Does a feature have all (or any) of the given tags?
+    """
+    if allTags:
+        return all(tag in featureTags for tag in tags)
+    return any(tag in featureTags for tag in tags)
+
+
+def _get_shapes(features):
+    """
+    Get ``shapely`` geometries for a list of features, constructing those
+    with columnar geometries together with vectorized calls
+    """
+    shapes = np.empty(len(features), dtype=object)
+    columnarIndices = []
+    for index, feature in enumerate(features):
+        geometry = feature['geometry']
+        if isinstance(geometry, ColumnarGeometry):
+            columnarIndices.append(index)
+        else:
+            shapes[index] = shapely.geometry.shape(geometry)
+    if len(columnarIndices) > 0:
+        shapes[columnarIndices] = to_shapely(
+            [features[index]['geometry'] for index in columnarIndices])
+    return shapes
+
+
+def _get_geometries(shapes, columnar):
+    """
+    Get geojson geometries for a list of ``shapely`` geometries, as columnar
+    geometries where ``columnar`` is ``True`` and dictionaries otherwise
+    """
+    geometries = [None] * len(shapes)
+    columnarIndices = []
+    for index, shape in enumerate(shapes):
+        if columnar[index]:
+            columnarIndices.append(index)
+        else:
+            geometries[index] = shapely.geometry.mapping(shape)
+    columnarGeometries = from_shapely(
+        [shapes[index] for index in columnarIndices])
+    for index, geometry in zip(columnarIndices, columnarGeometries,
+                               strict=True):
+        geometries[index] = geometry
+    return geometries
+
+
+def _get_differences(featureShapes, maskShapes, tasks, maxWorkers,
+                     executor, bar):
+    """
+    Mask features with the union of their masks for each task (a tuple of
+    mask indices and a feature index), in a pool of processes or threads if
+    requested, returning the masked shapes by feature index
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
 
-    if 'tags' in feature['properties']:
-        tags = feature['properties']['tags']
+    # features with the same masks are kept in the same chunk, since the
+    # union of the masks is often much more expensive than masking each
+    # feature
+    chunkCount = _get_chunk_count(maxWorkers, executor)
+    if chunkCount == 1:
+        # one chunk for each set of masks, so the progress bar is updated
+        chunkSize = 1
     else:
-        tags = ''
-
-    # Make the properties an ordered dictionary so they can be sorted
-    outProperties = {'name': feature['properties']['name'],
-                     'tags': tags,
-                     'object': feature['properties']['object'],
-                     'component': feature['properties']['component'],
-                     'author': author}
-    for key in sorted(feature['properties']):
-        if key not in outProperties.keys():
-            outProperties[key] = feature['properties'][key]
-
-    # Make the geometry an ordered dictionary so they can keep it in the
-    # desired order
-    outGeometry = {'type': feature['geometry']['type'],
-                   'coordinates': feature['geometry']['coordinates']}
-    for key in sorted(feature['geometry']):
-        if key not in outGeometry.keys():
-            outGeometry[key] = feature['geometry'][key]
-
-    # Make the feature an ordered dictionary so properties come before geometry
-    # (easier to read)
-    outFeature = {'type': 'Feature',
-                  'properties': outProperties}
-    # Add the rest
-    for key in sorted(feature):
-        if key not in ['geometry', 'type', 'properties']:
-            outFeature[key] = feature[key]
-
-    # geometry goes last for readability
-    outFeature['geometry'] = outGeometry
+        chunkSize = max(1, -(-len(tasks) // chunkCount))
+    taskChunks = []
+    taskChunk = []
+    for _, group in groupby(tasks, key=operator.itemgetter(0)):
+        taskChunk.extend(group)
+        if len(taskChunk) >= chunkSize:
+            taskChunks.append(taskChunk)
+            taskChunk = []
+    if len(taskChunk) > 0:
+        taskChunks.append(taskChunk)
+
+    chunks = []
+    for taskChunk in taskChunks:
+        # only the masks of the features in the chunk are included
+        maskIndices = sorted(set(chain.from_iterable(
+            key for key, _ in taskChunk)))
+        localIndices = {maskIndex: localIndex for localIndex, maskIndex in
+                        enumerate(maskIndices)}
+        keys = [tuple(localIndices[maskIndex] for maskIndex in key)
+                for key, _ in taskChunk]
+        featureIndices = [featureIndex for _, featureIndex in taskChunk]
+        chunks.append(((featureShapes[featureIndices],
+                        maskShapes[maskIndices]), (keys,)))
+
+    results = _map_shapes(_mask_shapes, chunks, maxWorkers, executor, bar)
+
+    differences = dict()
+    for taskChunk, shapes in zip(taskChunks, results, strict=True):
+        differences.update(zip([featureIndex for _, featureIndex in taskChunk],
+                               shapes, strict=True))
+    return differences
+
+
+def _mask_shapes(featureShapes, maskShapes, keys):
+    """
+    Mask each feature with the union of the masks with the indices in the
+    corresponding key
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
 
-    return outFeature
+    unions = dict()
+    shapes = []
+    for featureShape, key in zip(featureShapes, keys, strict=True):
+        union = unions.get(key)
+        if union is None:
+            if len(key) == 1:
+                union = maskShapes[key[0]]
+            else:
+                union = shapely.union_all(maskShapes[list(key)])
+            unions[key] = union
+        shapes.append(featureShape.difference(union))
+    return shapes
+
+
+def _simplify_shapes(shapes, tolerances, preserveTopology):
+    """
+    Simplify shapes, each with its own tolerance
+    """
+    return shapely.simplify(shapes, tolerances,
+                            preserve_topology=preserveTopology)
+
+
+def _coverage_union(shapes):
+    """
+    Get the union of shapes that are expected to form a coverage, or
+    ``None`` if they turn out not to
+    """
+    try:
+        union = shapely.coverage_union_all(shapes)
+    except shapely.errors.GEOSException:
+        return None
+    if not union.is_valid:
+        return None
+    return union
+
+
+def _tree_union(shapes, gridSize, maxWorkers, executor):
+    """
+    Get the union of shapes, combining chunks of them in a pool of processes
+    or threads (if requested) and then combining the results in order
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    chunkIndices = _split_by_points(shapes,
+                                    _get_chunk_count(maxWorkers, executor))
+    if len(chunkIndices) <= 1:
+        return shapely.union_all(shapes, grid_size=gridSize)
+    chunks = [((shapes[chunk],), (gridSize,)) for chunk in chunkIndices]
+    results = _map_shapes(_union_shapes, chunks, maxWorkers, executor)
+    return shapely.union_all(np.concatenate(results), grid_size=gridSize)
+
+
+def _union_shapes(shapes, gridSize):
+    """
+    Get the union of shapes as a list with a single shape
+    """
+    return [shapely.union_all(shapes, grid_size=gridSize)]
+
+
+def _split_by_points(shapes, chunkCount):
+    """
+    Split the indices of shapes into at most ``chunkCount`` contiguous
+    chunks with similar numbers of points
+    """
+    chunkCount = min(chunkCount, len(shapes))
+    if chunkCount <= 1:
+        return [np.arange(len(shapes))]
+    pointCounts = np.cumsum(shapely.get_num_coordinates(shapes))
+    splits = np.searchsorted(
+        pointCounts, pointCounts[-1] * np.arange(1, chunkCount) / chunkCount)
+    return [chunk for chunk in np.split(np.arange(len(shapes)), splits)
+            if len(chunk) > 0]
 
 
-def _split_geometry_crossing_antimeridian(geometry):
-    def _to_polar(lon, lat):
-        phi = np.pi / 180. * (np.mod(lon + 180., 360.) - 180.)
-        radius = np.pi / 180. * (90. - sign * lat)
-
-        # nudge points at +/- 180 out of the way so they don't intersect the
-        # testing wedge
-        phi = np.sign(phi) * \
-            np.where(np.abs(phi) > np.pi - 1.5 * epsilon,
-                     np.pi - 1.5 * epsilon, np.abs(phi))
-        # radius = np.where(radius < 1.5*epsilon, 1.5*epsilon, radius)
-
-        x = radius * np.sin(phi)
-        y = radius * np.cos(phi)
-        if isinstance(lon, list):
-            x = x.tolist()
-            y = y.tolist()
-        elif isinstance(lon, tuple):
-            x = tuple(x)
-            y = tuple(y)
-
-        return x, y
-
-    def _from_polar(x, y):
-        radius = np.sqrt(np.array(x)**2 + np.array(y)**2)
-        phi = np.arctan2(x, y)
-
-        # close up the tiny gap
-        radius = np.where(radius < 2 * epsilon, 0., radius)
-        phi = np.sign(phi) * \
-            np.where(np.abs(phi) > np.pi - 2 * epsilon,
-                     np.pi, np.abs(phi))
-
-        lon = 180. / np.pi * phi
-        lat = sign * (90. - 180. / np.pi * radius)
-
-        if isinstance(x, list):
-            lon = lon.tolist()
-            lat = lat.tolist()
-        elif isinstance(x, tuple):
-            lon = tuple(lon)
-            lat = tuple(lat)
-        return lon, lat
-
-    epsilon = 1e-14
+def _get_chunk_count(maxWorkers, executor):
+    """
+    Get the number of chunks to split work on ``shapely`` geometries into:
+    one unless it will be done in a pool, and several for each worker
+    otherwise, so that chunks that take much longer than others don't hold
+    up the rest
+    """
+    if executor not in ['process', 'thread'] and \
+            not isinstance(executor, Executor):
+        raise ValueError(f'Unexpected executor {executor}')
+    if not isinstance(executor, Executor):
+        if maxWorkers is None or maxWorkers <= 1:
+            return 1
+    elif maxWorkers is None:
+        maxWorkers = os.cpu_count() or 1
+    return 4 * maxWorkers
+
+
+def _map_shapes(function, chunks, maxWorkers, executor, bar=None):
+    """
+    Call a function on each chunk, a tuple of arrays of ``shapely``
+    geometries and of other arguments, in a pool of processes or threads if
+    requested.  The function returns a list of geometries, and the lists for
+    all chunks are returned in order.  Geometries are sent to and from other
+    processes as well-known binary, which is much faster than pickling them.
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    def count(chunk):
+        shapeArrays, _ = chunk
+        return len(shapeArrays[0])
+
+    results = [None] * len(chunks)
+    doneCount = 0
+    if not isinstance(executor, Executor) and \
+            (maxWorkers is None or maxWorkers <= 1 or len(chunks) <= 1):
+        for chunkIndex, chunk in enumerate(chunks):
+            shapeArrays, args = chunk
+            results[chunkIndex] = function(*shapeArrays, *args)
+            doneCount += count(chunk)
+            if bar is not None:
+                bar.update(doneCount)
+        return results
+
+    if isinstance(executor, Executor):
+        context = contextlib.nullcontext(executor)
+        inProcess = isinstance(executor, ThreadPoolExecutor)
+    elif executor == 'thread':
+        context = ThreadPoolExecutor(max_workers=maxWorkers)
+        inProcess = True
+    else:
+        context = ProcessPoolExecutor(
+            max_workers=min(maxWorkers, len(chunks)))
+        inProcess = False
+
+    with context as pool:
+        futures = dict()
+        for chunkIndex, chunk in enumerate(chunks):
+            shapeArrays, args = chunk
+            if inProcess:
+                future = pool.submit(function, *shapeArrays, *args)
+            else:
+                future = pool.submit(
+                    _call_with_wkb, function,
+                    [shapely.to_wkb(shapes) for shapes in shapeArrays], args)
+            futures[future] = chunkIndex
+        for future in as_completed(futures):
+            chunkIndex = futures[future]
+            shapes = future.result()
+            if not inProcess:
+                shapes = shapely.from_wkb(shapes)
+            results[chunkIndex] = shapes
+            doneCount += count(chunks[chunkIndex])
+            if bar is not None:
+                bar.update(doneCount)
+    return results
+
+
+def _call_with_wkb(function, wkbArrays, args):
+    """
+    Call a function as in ``_map_shapes()`` in another process, with the
+    geometries it takes and returns as well-known binary
+    """
+    shapes = function(*[shapely.from_wkb(wkbs) for wkbs in wkbArrays], *args)
+    return shapely.to_wkb(shapes)
+
+
+def _split_shapes_crossing_antimeridian(shapes):
+    """
+    Split shapes that cross the antimeridian, returning an array of the split
+    shapes with ``None`` for shapes that don't cross it.  Shapes that can't
+    cross it are screened out with cheap tests, and the rest are split in
+    polar coordinates about the nearest pole in two batches, one for each
+    hemisphere.
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    outShapes = np.full(len(shapes), None, dtype=object)
+    indices = np.flatnonzero(_may_cross_antimeridian(shapes))
+    if len(indices) == 0:
+        return outShapes
+
+    epsilon = _antimeridianEpsilon
     antimeridianWedge = shapely.geometry.Polygon([(epsilon, -np.pi),
                                                   (epsilon**2, -epsilon),
                                                   (0, epsilon),
@@ -717,20 +2230,201 @@ def _split_geometry_crossing_antimeridian(geometry):
                                                   (-epsilon, -np.pi),
                                                   (epsilon, -np.pi)])
 
-    featureShape = shapely.geometry.shape(geometry)
-    sign_mask = featureShape.bounds[1] + featureShape.bounds[3] >= 0.
-    sign = 2. * sign_mask - 1.
-    polarShape = shapely.ops.transform(_to_polar, featureShape)
+    bounds = shapely.bounds(shapes[indices])
+    signs = np.where(bounds[:, 1] + bounds[:, 3] >= 0., 1., -1.)
+    for sign in [1., -1.]:
+        hemisphereIndices = indices[signs == sign]
+        if len(hemisphereIndices) == 0:
+            continue
+        polarShapes = shapely.transform(
+            shapes[hemisphereIndices],
+            functools.partial(_antimeridian_to_polar, sign=sign))
+        crossing = shapely.intersects(polarShapes, antimeridianWedge)
+        differences = shapely.difference(polarShapes[crossing],
+                                         antimeridianWedge)
+        outShapes[hemisphereIndices[crossing]] = shapely.transform(
+            differences,
+            functools.partial(_antimeridian_from_polar, sign=sign))
+    return outShapes
+
+
+def _may_cross_antimeridian(shapes):
+    """
+    Find the shapes that may cross the antimeridian: those with a segment
+    that jumps by about 180 degrees or more in longitude (taken between -180
+    and 180 degrees) or that come close to a pole
+    """
+    shapes = np.asarray(shapes, dtype=object)
+    mayCross = np.zeros(len(shapes), dtype=bool)
+
+    # shapes with longitudes well within -180 to 180 degrees that span less
+    # than the largest allowed jump and don't come close to the poles can't
+    # cross
+    bounds = shapely.bounds(shapes)
+    lonMin, latMin, lonMax, latMax = bounds.T
+    candidates = np.flatnonzero(
+        (lonMin <= -180.) | (lonMax >= 180.) |
+        (lonMax - lonMin >= _antimeridianMaxJump) |
+        (latMin <= -_antimeridianMaxLat) | (latMax >= _antimeridianMaxLat))
+    if len(candidates) == 0:
+        return mayCross
+
+    # check the jumps in longitude along each line and polygon ring
+    parts, partIndices = shapely.get_parts(shapes[candidates],
+                                           return_index=True)
+    polygonal = shapely.get_type_id(parts) == shapely.GeometryType.POLYGON
+    rings, ringIndices = shapely.get_rings(parts[polygonal],
+                                           return_index=True)
+    lines = np.concatenate([rings, parts[~polygonal]])
+    lineIndices = np.concatenate([partIndices[polygonal][ringIndices],
+                                  partIndices[~polygonal]])
+    coords, coordIndices = shapely.get_coordinates(lines, return_index=True)
+    coordIndices = lineIndices[coordIndices]
+    lon = np.mod(coords[:, 0] + 180., 360.) - 180.
+    jumps = np.abs(np.diff(lon)) >= _antimeridianMaxJump
+    jumps &= coordIndices[1:] == coordIndices[:-1]
+    nearPoles = np.abs(coords[:, 1]) >= _antimeridianMaxLat
+    mayCross[candidates[coordIndices[1:][jumps]]] = True
+    mayCross[candidates[coordIndices[nearPoles]]] = True
+    return mayCross
+
+
+def _antimeridian_to_polar(coords, sign):
+    """
+    Convert longitude and latitude in degrees to Cartesian coordinates in
+    polar coordinates about the north (``sign = 1``) or south
+    (``sign = -1``) pole, with the antimeridian along the negative y axis
+    """
+    epsilon = _antimeridianEpsilon
+    lon = coords[:, 0]
+    lat = coords[:, 1]
+    phi = np.pi / 180. * (np.mod(lon + 180., 360.) - 180.)
+    radius = np.pi / 180. * (90. - sign * lat)
+
+    # nudge points at +/- 180 out of the way so they don't intersect the
+    # testing wedge
+    phi = np.sign(phi) * \
+        np.where(np.abs(phi) > np.pi - 1.5 * epsilon,
+                 np.pi - 1.5 * epsilon, np.abs(phi))
+
+    x = radius * np.sin(phi)
+    y = radius * np.cos(phi)
+    return np.column_stack([x, y])
+
+
+def _antimeridian_from_polar(coords, sign):
+    """
+    Convert polar coordinates from ``_antimeridian_to_polar()`` back to
+    longitude and latitude in degrees
+    """
+    epsilon = _antimeridianEpsilon
+    x = coords[:, 0]
+    y = coords[:, 1]
+    radius = np.sqrt(x**2 + y**2)
+    phi = np.arctan2(x, y)
+
+    # close up the tiny gap
+    radius = np.where(radius < 2 * epsilon, 0., radius)
+    phi = np.sign(phi) * \
+        np.where(np.abs(phi) > np.pi - 2 * epsilon,
+                 np.pi, np.abs(phi))
+
+    lon = 180. / np.pi * phi
+    lat = sign * (90. - 180. / np.pi * radius)
+    return np.column_stack([lon, lat])
 
-    if not polarShape.intersects(antimeridianWedge):
-        # this feature doesn't cross the antimeridian
-        return
 
-    difference = polarShape.difference(antimeridianWedge)
+def _get_out_feature(feature, command):
+    """
+    Get a shallow copy of a feature for writing, with provenance (or no
+    history if ``command`` is ``None``) and rounded coordinates, without
+    modifying the original feature
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    properties = feature['properties']
+    if command is None:
+        if 'history' in properties:
+            properties = {key: value for key, value in properties.items()
+                          if key != 'history'}
+        elif not isinstance(properties, dict):
+            properties = dict(properties)
+    else:
+        properties = dict(properties)
+        if 'history' in properties:
+            properties['history'] = properties['history'] + ' ' + command
+        else:
+            properties['history'] = command
+
+    outFeature = dict(feature)
+    outFeature['properties'] = properties
+    outFeature['geometry'] = _round_geometry(feature['geometry'])
+    return outFeature
+
 
-    outShape = shapely.ops.transform(_from_polar, difference)
+def _round_geometry(geometry, digits=6):
+    """
+    Get a shallow copy of a geojson geometry with rounded coordinates
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    if isinstance(geometry, ColumnarGeometry):
+        return geometry.to_geojson(digits=digits)
 
-    return shapely.geometry.mapping(outShape)
+    outGeometry = dict(geometry)
+    if 'coordinates' in geometry:
+        outGeometry['coordinates'] = \
+            _round_nested_coords(geometry['coordinates'], digits)
+    if 'geometries' in geometry:
+        outGeometry['geometries'] = [_round_geometry(subGeometry, digits)
+                                     for subGeometry in geometry['geometries']]
+    return outGeometry
+
+
+def _round_nested_coords(coordinates, digits=6):
+    """
+    Round the nested lists of coordinates of a geojson geometry as a single
+    NumPy array, falling back on ``_round_coords()`` if the coordinates are
+    not nested regularly
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    depth = 0
+    first = coordinates
+    while isinstance(first, (list, tuple)) and len(first) > 0:
+        first = first[0]
+        depth += 1
+    if depth == 0 or not isinstance(first, (float, int)):
+        return _round_coords(coordinates, digits)
+
+    try:
+        # flatten to a list of positions, keeping track of the length of
+        # each list at each level of nesting
+        counts = []
+        positions = [coordinates]
+        for _ in range(depth - 1):
+            counts.append(list(map(len, positions)))
+            positions = list(chain.from_iterable(positions))
+        dims = len(positions[0])
+        if set(map(len, positions)) != {dims}:
+            raise ValueError('Positions have different dimensions')
+        values = np.fromiter(chain.from_iterable(positions), dtype=np.float64,
+                             count=dims * len(positions))
+    except (TypeError, ValueError):
+        return _round_coords(coordinates, digits)
+
+    rounded = round_coords(values, digits).reshape(-1, dims).tolist()
+    for lengths in reversed(counts):
+        offsets = [0] + list(accumulate(lengths))
+        rounded = [rounded[start:end] for start, end in
+                   zip(offsets[:-1], offsets[1:], strict=True)]
+    return rounded[0]
 
 
 def _round_coords(coordinates, digits=6):
@@ -747,3 +2441,145 @@ def _round_coords(coordinates, digits=6):
         return tuple([_round_coords(c, digits) for c in coordinates])
     else:
         raise TypeError(f'Unexpected type for coordinates {coordinates}')
+
+
+class _FeatureStream(object):
+    """
+    An incremental decoder for the top-level members of a geojson feature
+    collection that decodes the entries of its ``features`` array one at a
+    time, reading the file in chunks as needed
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    _whitespace = re.compile(r'[ \t\n\r]*')
+
+    def __init__(self, f, chunkSize=4194304):
+        """
+        Construct a stream from an open (text) file
+
+        Parameters
+        ----------
+        f : file
+            A file object opened for reading
+
+        chunkSize : int, optional
+            The number of characters to read from the file at a time
+        """
+        self._file = f
+        self._chunkSize = chunkSize
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def iter_features(self, otherProperties=None):
+        """
+        Decode the feature collection, yielding each feature in turn
+
+        Parameters
+        ----------
+        otherProperties : dict, optional
+            A dictionary to which top-level members other than ``type`` and
+            ``features`` are added
+
+        Yields
+        ------
+        feature : dict
+            Each feature in the ``features`` array
+        """
+        # if the whole file fits in a couple of chunks, it is fastest to
+        # decode it all at once with the current json backend
+        self._read(self._chunkSize)
+        if not self._eof:
+            self._read(self._chunkSize)
+        if self._eof:
+            featureCollection = loads(self._buffer)
+            self._buffer = ''
+            for key, value in featureCollection.items():
+                if otherProperties is not None and \
+                        key not in ['features', 'type']:
+                    otherProperties[key] = value
+            yield from featureCollection.get('features', [])
+            return
+
+        self._expect('{')
+        while True:
+            char = self._peek()
+            if char == '}':
+                self._pos += 1
+                break
+            if char == ',':
+                self._pos += 1
+                continue
+            key = self._decode()
+            self._expect(':')
+            if key == 'features':
+                self._expect('[')
+                while True:
+                    char = self._peek()
+                    if char == ']':
+                        self._pos += 1
+                        break
+                    if char == ',':
+                        self._pos += 1
+                        continue
+                    yield self._decode()
+            else:
+                value = self._decode()
+                if otherProperties is not None and key != 'type':
+                    otherProperties[key] = value
+
+    def _read(self, size):
+        """
+        Append at least ``size`` more characters (if available) to the
+        buffer, discarding the part that has already been decoded
+        """
+        chunk = self._file.read(max(size, self._chunkSize))
+        if len(chunk) == 0:
+            self._eof = True
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+
+    def _peek(self):
+        """
+        Skip whitespace and return the next character (``None`` at the end of
+        the file)
+        """
+        while True:
+            self._pos = self._whitespace.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if self._eof:
+                return None
+            self._read(self._chunkSize)
+
+    def _expect(self, char):
+        """
+        Consume the given character, raising an error if it is not next
+        """
+        if self._peek() != char:
+            raise json.JSONDecodeError(f'Expecting {char!r}', self._buffer,
+                                       self._pos)
+        self._pos += 1
+
+    def _decode(self):
+        """
+        Decode the next json value, reading more of the file until the value
+        is complete.  The amount read is doubled each time so that the total
+        decoding work stays proportional to the size of the value.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            else:
+                # a number at the end of the buffer may be incomplete
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            self._read(len(self._buffer) - self._pos)
@@ -1,8 +1,19 @@
 import json
 import os
 import sys
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from functools import partial
 from importlib.resources import files as imp_res_files
 
+from geometric_features.bundle import FeatureBundle, build_bundles
+from geometric_features.catalog_cache import (
+    CatalogCache,
+    build_catalog_cache,
+)
 from geometric_features.download import download_files
 from geometric_features.feature_collection import (
     FeatureCollection,
@@ -72,6 +83,12 @@ class GeometricFeatures(object):
         featureNames=None,
         tags=None,
         allTags=True,
+        columnar=False,
+        useCache=True,
+        useBundle=True,
+        verifyBundle=False,
+        maxWorkers=None,
+        executor='process',
     ):
         """
         Read one or more features from the cached collection of geometric
@@ -101,6 +118,48 @@ class GeometricFeatures(object):
         allTags : bool, optional
             Whether a feature must have all tags (instead of any of the tags)
 
+        columnar : bool, optional
+            Whether to store the coordinates of each geometry in NumPy arrays
+            (see :class:`geometric_features.ColumnarGeometry`) rather than
+            nested lists
+
+        useCache : bool, optional
+            Whether to read features from the binary cache built with
+            :py:meth:`~geometric_features.GeometricFeatures.build_cache()`,
+            if there is one.  Features that are not in the cache or whose
+            files have changed since it was built are read from their
+            ``geojson`` files.
+
+        useBundle : bool, optional
+            Whether to read features from the single-file bundle built with
+            :py:meth:`~geometric_features.GeometricFeatures.build_bundles()`
+            for the component and object type, if there is one.  Features
+            in the bundle are read without checking for (or downloading)
+            their ``geojson`` files, so the bundle should be rebuilt after
+            features are modified.  Features that are not in the bundle are
+            read from their files.
+
+        verifyBundle : bool, optional
+            Whether to check the size and modification time (and, if the
+            modification time has changed, the hash) of the ``geojson`` file
+            of each feature in the bundle, reading features whose files have
+            changed since the bundle was built from the files instead.  This
+            costs a ``stat`` of each file, which the bundle otherwise avoids.
+
+        maxWorkers : int, optional
+            The number of threads or processes to use to parse ``geojson``
+            files concurrently.  By default, files are parsed one at a time
+            (unless ``executor`` is an existing executor).  Either way, the
+            features are merged in the order they were requested.
+
+        executor : {'process', 'thread'} or Executor, optional
+            Whether to parse files in a pool of processes (which must send
+            the features back to this process) or of threads (which only
+            help if reading the files, rather than parsing them, takes most
+            of the time, since parsing holds python's global interpreter
+            lock), or an existing ``concurrent.futures.Executor`` to use
+            (e.g. one shared across calls)
+
         Returns
         -------
         fc : geometric_features.FeatureCollection
@@ -113,17 +172,133 @@ class GeometricFeatures(object):
         featureNames = self._get_feature_names(
             componentName, objectType, featureNames, tags, allTags
         )
+
+        bundleFCs = dict()
+        if useBundle:
+            bundle = FeatureBundle.open(
+                self.cacheLocation, componentName, objectType
+            )
+            if bundle is not None:
+                bundleNames = [
+                    featureName
+                    for featureName in featureNames
+                    if featureName in bundle
+                    and (not verifyBundle or bundle.is_current(featureName))
+                ]
+                bundleFCs = dict(
+                    zip(
+                        bundleNames,
+                        bundle.read(bundleNames, columnar=columnar),
+                        strict=True,
+                    )
+                )
+
+        # only features that aren't in the bundle need their files
+        fileNames = [
+            featureName
+            for featureName in featureNames
+            if featureName not in bundleFCs
+        ]
         fileList = self._download_geometric_features(
-            componentName, objectType, featureNames
+            componentName, objectType, fileNames
         )
+        fileDict = dict(zip(fileNames, fileList, strict=True))
 
+        cache = None
+        if useCache and len(fileDict) > 0:
+            cache = CatalogCache.open(
+                self.cacheLocation, componentName, objectType
+            )
+
+        fileFCs = dict()
+        if cache is not None:
+            for featureName, fileName in fileDict.items():
+                fileFC = cache.read(fileName, columnar=columnar)
+                if fileFC is not None:
+                    fileFCs[featureName] = fileFC
+
+        # parse the remaining files, possibly concurrently
+        parseNames = [
+            featureName
+            for featureName in fileDict
+            if featureName not in fileFCs
+        ]
+        parsedFCs = _read_files(
+            [fileDict[featureName] for featureName in parseNames],
+            columnar,
+            maxWorkers,
+            executor,
+        )
+        fileFCs.update(zip(parseNames, parsedFCs, strict=True))
+
+        # the features have already been read into feature collections, so
+        # they don't need to be validated again
         fc = FeatureCollection()
-        for fileName in fileList:
-            fc.merge(read_feature_collection(fileName))
+        for featureName in featureNames:
+            if featureName in bundleFCs:
+                fc.merge(bundleFCs[featureName], validate='none')
+            else:
+                fc.merge(fileFCs[featureName], validate='none')
 
         return fc
 
-    def split(self, fc, destinationDir=None):
+    def build_cache(self, componentName=None, objectType=None, quiet=True):
+        """
+        Build a binary cache of the geometric features in the local cache
+        that ``read()`` uses to avoid parsing ``geojson`` files.  The cache
+        needs to be built only once, since features whose files have changed
+        are read from the ``geojson`` files, but it should be rebuilt after
+        features are added or modified to regain the speed-up.
+
+        Parameters
+        ----------
+        componentName : str, optional
+            A component to build the cache for, all components by default
+
+        objectType : {'point', 'transect', 'region'}, optional
+            An object type to build the cache for, all types by default
+
+        quiet : bool, optional
+            Whether to suppress printing of the caches being built
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        build_catalog_cache(
+            self.cacheLocation, componentName, objectType, quiet=quiet
+        )
+
+    def build_bundles(self, componentName=None, objectType=None, quiet=True):
+        """
+        Build single-file bundles of the geometric features in the local
+        cache, one for each component and object type, that ``read()`` uses
+        to avoid opening a file for each feature.  Each bundle holds the
+        contents of the ``geojson`` files of its features along with an
+        index, so that only the requested features are read and decoded.
+
+        Parameters
+        ----------
+        componentName : str, optional
+            A component to build bundles for, all components by default
+
+        objectType : {'point', 'transect', 'region'}, optional
+            An object type to build bundles for, all types by default
+
+        quiet : bool, optional
+            Whether to suppress printing of the bundles being built
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        build_bundles(
+            self.cacheLocation, componentName, objectType, quiet=quiet
+        )
+
+    def split(
+        self, fc, destinationDir=None, compression=None, compressionLevel=None
+    ):
         """
         Split a feature collection into individual files for each feature. This
         is how new geometry should be added to the ``geometric_features`` repo.
@@ -137,6 +312,14 @@ class GeometricFeatures(object):
             The root path where the split geometry will be stored,
             ``cacheLocation`` by default
 
+        compression : {'gz', 'zst'}, optional
+            Whether to compress each file with gzip or zstandard, adding the
+            extension to the file name.  Compressed files are read
+            transparently by ``read()``.
+
+        compressionLevel : int, optional
+            The compression level, 6 for gzip and 3 for zstandard by default
+
         Returns
         -------
         fc : geometric_features.FeatureCollection
@@ -158,6 +341,10 @@ class GeometricFeatures(object):
                 componentName, objectType, featureName
             )
             fullPath = os.path.join(destinationDir, relativePath)
+            if compression is not None:
+                if compression not in ['gz', 'zst']:
+                    raise ValueError(f'Unexpected compression {compression}')
+                fullPath = f'{fullPath}.{compression}'
 
             path, file = os.path.split(fullPath)
 
@@ -169,7 +356,9 @@ class GeometricFeatures(object):
             singleFC = FeatureCollection([feature])
             singleFC.otherProperties.pop('groupName', None)
 
-            singleFC.to_geojson(fullPath, stripHistory=True)
+            singleFC.to_geojson(
+                fullPath, stripHistory=True, compressionLevel=compressionLevel
+            )
 
     def _download_geometric_features(
         self, componentName, objectType, featureNames
@@ -194,7 +383,9 @@ class GeometricFeatures(object):
         Returns
         -------
         fileList : list of str
-            File names of the features
+            File names of the features, which may be compressed copies of
+            the ``geojson`` files (ending in ``.gz`` or ``.zst``) if the
+            uncompressed files are not in the cache
 
 
         """
@@ -213,9 +404,15 @@ class GeometricFeatures(object):
                 componentName, objectType, featureName
             )
             fullPath = os.path.join(self.cacheLocation, relativePath)
-            fileList.append(fullPath)
             if not os.path.exists(fullPath):
-                filesToDownload.append(relativePath)
+                # use a compressed copy of the file if there is one
+                for extension in ['.gz', '.zst']:
+                    if os.path.exists(f'{fullPath}{extension}'):
+                        fullPath = f'{fullPath}{extension}'
+                        break
+                else:
+                    filesToDownload.append(relativePath)
+            fileList.append(fullPath)
 
         if len(filesToDownload) > 0:
             baseURL = (
@@ -343,6 +540,35 @@ def _get_file_name(componentName, objectType, featureName):
     return fileName
 
 
+def _read_files(fileNames, columnar, maxWorkers, executor):
+    """
+    Read feature collections from geojson files, in a pool of threads or
+    processes if requested, returning them in the same order as the files
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    read = partial(read_feature_collection, columnar=columnar)
+    if isinstance(executor, Executor):
+        return list(executor.map(read, fileNames))
+
+    if maxWorkers is None or maxWorkers <= 1 or len(fileNames) <= 1:
+        return [read(fileName) for fileName in fileNames]
+
+    maxWorkers = min(maxWorkers, len(fileNames))
+    if executor == 'thread':
+        with ThreadPoolExecutor(max_workers=maxWorkers) as pool:
+            return list(pool.map(read, fileNames))
+    elif executor == 'process':
+        # send several files to each process at a time to reduce overhead
+        chunksize = max(1, len(fileNames) // (4 * maxWorkers))
+        with ProcessPoolExecutor(max_workers=maxWorkers) as pool:
+            return list(pool.map(read, fileNames, chunksize=chunksize))
+    else:
+        raise ValueError(f'Unexpected executor {executor}')
+
+
 def _get_default_cache_location():
     """
     Get the default location of the local geometric features cache.
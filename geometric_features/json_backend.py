@@ -0,0 +1,190 @@
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+try:
+    import rapidjson
+except ImportError:
+    rapidjson = None
+
+from geometric_features.utils import paused_garbage_collection
+
+
+def get_json_backends():
+    """
+    Get the json backends that are available, fastest first.  The standard
+    library's ``json`` module is always available.
+
+    Returns
+    -------
+    backends : list of str
+        The names of the available backends, some of ``'orjson'``,
+        ``'simdjson'`` and ``'rapidjson'``, followed by ``'json'``
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    backends = []
+    for name, module in [
+        ('orjson', orjson),
+        ('simdjson', simdjson),
+        ('rapidjson', rapidjson),
+    ]:
+        if module is not None:
+            backends.append(name)
+    backends.append('json')
+    return backends
+
+
+def get_json_backend():
+    """
+    Get the name of the json backend currently used for reading
+
+    Returns
+    -------
+    backend : str
+        The name of the backend
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    return _backend['name']
+
+
+def set_json_backend(backend=None):
+    """
+    Set the json backend used to read and write geojson files.
+
+    Any of the backends can be used for reading.  Writing always produces
+    output identical to the standard library's ``json`` module, so only
+    ``rapidjson`` is used for writing, since ``orjson`` formats some floats
+    differently and ``simdjson`` can only parse.  By default, the fastest
+    available backend is used for reading and ``rapidjson``, if available,
+    for writing.  The default can also be set with the environment variable
+    ``$GEOMETRIC_FEATURES_JSON_BACKEND``.
+
+    Parameters
+    ----------
+    backend : {'orjson', 'simdjson', 'rapidjson', 'json'}, optional
+        The name of the backend, or ``None`` to use the default
+
+    Raises
+    ------
+    ValueError
+        If the requested backend is not available
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    if backend is None:
+        backend = os.environ.get('GEOMETRIC_FEATURES_JSON_BACKEND')
+
+    available = get_json_backends()
+    if backend is None:
+        backend = available[0]
+        writer = 'rapidjson' if 'rapidjson' in available else 'json'
+    elif backend not in available:
+        raise ValueError(
+            f'json backend {backend} is not available.  Options '
+            f'are: {", ".join(available)}'
+        )
+    else:
+        writer = 'rapidjson' if backend == 'rapidjson' else 'json'
+
+    _backend['name'] = backend
+    _backend['writer'] = writer
+
+
+def loads(text):
+    """
+    Decode a json document with the current backend
+
+    Parameters
+    ----------
+    text : str
+        The json document
+
+    Returns
+    -------
+    obj : object
+        The decoded python object
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    backend = _backend['name']
+    if backend == 'orjson':
+        decode = orjson.loads
+    elif backend == 'simdjson':
+        decode = simdjson.loads
+    elif backend == 'rapidjson':
+        decode = rapidjson.loads
+    else:
+        decode = json.loads
+
+    with paused_garbage_collection():
+        return decode(text)
+
+
+def dumps(obj, indent=None, compact=False):
+    """
+    Encode a python object as json with the current backend, producing
+    exactly the same output as the standard library's ``json.dumps()``
+
+    Parameters
+    ----------
+    obj : object
+        The python object to encode
+
+    indent : int, optional
+        The number of spaces to use for indentation
+
+    compact : bool, optional
+        Whether to leave out all optional whitespace (ignoring ``indent``)
+
+    Returns
+    -------
+    text : str
+        The json document
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    if compact:
+        indent = None
+        separators = (',', ':')
+    else:
+        separators = None
+
+    if _backend['writer'] == 'rapidjson' and (compact or indent is not None):
+        try:
+            text = rapidjson.dumps(
+                obj, indent=indent, number_mode=rapidjson.NM_NAN
+            )
+        except (TypeError, ValueError):
+            # let the json module handle (or complain about) these objects
+            text = None
+        # rapidjson escapes non-ascii characters with upper-case hex digits
+        # and doesn't escape the delete character at all
+        if text is not None and '\\u' not in text and '\x7f' not in text:
+            return text
+
+    return json.dumps(obj, indent=indent, separators=separators)
+
+
+_backend = dict()
+set_json_backend()
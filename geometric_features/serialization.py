@@ -0,0 +1,635 @@
+import struct
+import sys
+import threading
+from itertools import chain
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from geometric_features.columnar import (
+    ColumnarGeometry,
+    _build_coordinates,
+    _geomTypes,
+    _get_parts,
+)
+from geometric_features.feature import Feature
+from geometric_features.feature_collection import FeatureCollection
+from geometric_features.json_backend import dumps, loads
+from geometric_features.utils import paused_garbage_collection
+
+# the start of each packed feature collection
+_magic = b'GFPACKED'
+
+# the version of the packed format, incremented if it changes
+_packedVersion = 1
+
+# the magic bytes, the version, the size of the property table and the
+# lengths of the coordinate and offset arrays (all little-endian, so the
+# arrays that follow are 8-byte aligned)
+_header = struct.Struct('<8s6Q')
+
+# held while making or attaching to shared memory, since on python < 3.13
+# registering blocks with the resource tracker is switched off while
+# attaching, which must not affect blocks being made in other threads
+_sharedMemoryLock = threading.Lock()
+
+# how the geometry of each feature is stored: coordinates packed into the
+# arrays from nested lists or from a columnar geometry, or the whole
+# geometry in the property table if it can't be packed (e.g. a
+# GeometryCollection)
+_listGeometry = 0
+_columnarGeometry = 1
+_tableGeometry = 2
+
+
+def to_bytes(fc):
+    """
+    Pack a feature collection into bytes, with the coordinates of all
+    geometries in flat arrays (following the layout of
+    :class:`geometric_features.ColumnarGeometry`) and the properties of the
+    features in a compact json table
+
+    Parameters
+    ----------
+    fc : geometric_features.FeatureCollection
+        The feature collection to pack
+
+    Returns
+    -------
+    data : bytes
+        The packed feature collection
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    table, arrays = _pack(fc, exact=False)
+    tableBytes = dumps(table, compact=True).encode('utf-8')
+    # pad the table so the arrays are aligned
+    tableBytes += b' ' * (-len(tableBytes) % 8)
+
+    header = _header.pack(
+        _magic,
+        _packedVersion,
+        len(tableBytes),
+        *[len(array) for array in arrays],
+    )
+    return b''.join(
+        [header, tableBytes] + [array.tobytes() for array in arrays]
+    )
+
+
+def from_bytes(data, columnar=None):
+    """
+    Unpack a feature collection packed with ``to_bytes()``
+
+    Parameters
+    ----------
+    data : bytes-like
+        The packed feature collection
+
+    columnar : bool, optional
+        Whether to store the coordinates of each geometry in NumPy arrays
+        (see :class:`geometric_features.ColumnarGeometry`) rather than
+        nested lists.  Unpacking columnar geometries is much faster.  By
+        default, each geometry is unpacked the way it was stored when it
+        was packed.
+
+    Returns
+    -------
+    fc : geometric_features.FeatureCollection
+        The feature collection
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    return _unpack(memoryview(data), columnar, copy=True)
+
+
+def to_shared_memory(fc, name=None):
+    """
+    Pack a feature collection into a new block of shared memory
+
+    Parameters
+    ----------
+    fc : geometric_features.FeatureCollection
+        The feature collection to pack
+
+    name : str, optional
+        The name of the shared memory block, a unique name by default
+
+    Returns
+    -------
+    sharedMemory : multiprocessing.shared_memory.SharedMemory
+        The shared memory block, which the caller owns and must ``close()``
+        and ``unlink()`` once no process needs it any more
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    data = to_bytes(fc)
+    with _sharedMemoryLock:
+        sharedMemory = shared_memory.SharedMemory(
+            name=name, create=True, size=len(data)
+        )
+    sharedMemory.buf[: len(data)] = data
+    return sharedMemory
+
+
+def from_shared_memory(sharedMemory):
+    """
+    Attach to a feature collection packed into shared memory with
+    ``to_shared_memory()``, without copying the coordinates
+
+    The process that called ``to_shared_memory()`` owns the block and is
+    responsible for closing and unlinking it.  Attaching never unlinks the
+    block: it isn't registered with the resource tracker of this process, so
+    the block isn't cleaned up when this process exits.  The block is closed
+    here once the features no longer need it.
+
+    This is thread-safe with respect to other calls to
+    ``to_shared_memory()`` and ``from_shared_memory()``.  On python < 3.13,
+    a block of shared memory made in another thread by other code at the
+    same moment may not be registered with the resource tracker.
+
+    Parameters
+    ----------
+    sharedMemory : multiprocessing.shared_memory.SharedMemory or str
+        The shared memory block or its name
+
+    Returns
+    -------
+    fc : geometric_features.FeatureCollection
+        The feature collection, with columnar geometries whose coordinates
+        are read-only views of the shared memory
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    if not isinstance(sharedMemory, str):
+        sharedMemory = sharedMemory.name
+    # attach with a separate handle that stays open as long as the features
+    # need it, even if the caller closes its own handle
+    data = np.asarray(_SharedBuffer(_attach_shared_memory(sharedMemory)))
+    return _unpack(memoryview(data), columnar=True, copy=False)
+
+
+def _attach_shared_memory(name):
+    """
+    Attach to an existing block of shared memory without registering it with
+    the resource tracker, which would unlink the block when this process
+    exits even though another process owns it
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    # older versions always register the block.  Unregistering it afterwards
+    # isn't safe because worker processes share the resource tracker of the
+    # owner, so its registration would be dropped as well.  Instead, skip
+    # registering the block while attaching, holding the lock so blocks made
+    # with to_shared_memory() in other threads are still registered.
+    def register(resourceName, rtype):
+        if rtype != 'shared_memory':
+            originalRegister(resourceName, rtype)
+
+    with _sharedMemoryLock:
+        originalRegister = resource_tracker.register
+        resource_tracker.register = register
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = originalRegister
+
+
+def _pack(fc, exact):
+    """
+    Pack the coordinates of the geometries of a feature collection into flat
+    arrays and everything else into a table.  If ``exact``, the table will be
+    pickled rather than stored as json, so it can hold any python objects,
+    and only geometries that will be unpacked exactly as they are have their
+    coordinates packed.
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    names = []
+    tags = _Codes()
+    objectTypes = _Codes()
+    components = _Codes()
+    authors = _Codes()
+    extraProperties = []
+    other = []
+    geomTypes = _Codes()
+    geometryKinds = []
+    geometryOther = []
+    tableGeometries = []
+    arrays = _Arrays()
+
+    for feature in fc.features:
+        if type(feature) is not Feature:
+            feature = Feature.from_geojson(feature)
+        names.append(feature.name)
+        tags.add(feature.tags)
+        objectTypes.add(feature.objectType)
+        components.add(feature.component)
+        authors.add(feature.author)
+        extraProperties.append(feature.extraProperties)
+        other.append(feature.other)
+
+        geometry = feature.geometry
+        if type(geometry) is ColumnarGeometry:
+            kind = _columnarGeometry
+            arrays.add_columnar(geometry)
+            geomType = geometry.geomType
+            otherMembers = geometry.other
+        elif arrays.add_lists(geometry, exact):
+            kind = _listGeometry
+            geomType = geometry['type']
+            otherMembers = {
+                key: value
+                for key, value in geometry.items()
+                if key not in ['type', 'coordinates']
+            }
+        else:
+            kind = _tableGeometry
+            tableGeometries.append([len(geometryKinds), geometry])
+            geomType = None
+            otherMembers = None
+        geometryKinds.append(kind)
+        geomTypes.add(geomType)
+        geometryOther.append(otherMembers or None)
+
+    table = {
+        'otherProperties': fc.otherProperties,
+        'names': names,
+        'tags': tags.to_list()
+        if exact
+        else [[';'.join(value) for value in tags.values], tags.codes],
+        'objectTypes': objectTypes.to_list(),
+        'components': components.to_list(),
+        'authors': authors.to_list(),
+        'extraProperties': _none_if_empty(extraProperties),
+        'other': _none_if_empty(other),
+        'geomTypes': geomTypes.to_list(),
+        'geometryKinds': geometryKinds,
+        'geometryOther': _none_if_empty(geometryOther),
+        'tableGeometries': tableGeometries,
+    }
+    return table, arrays.finish()
+
+
+def _unpack(data, columnar, copy):
+    """
+    Unpack a feature collection from a memoryview, either copying the
+    coordinate and offset arrays or keeping views of the buffer
+    """
+    if len(data) < _header.size:
+        raise ValueError('The data is not a packed feature collection')
+    (
+        magic,
+        version,
+        tableSize,
+        coordCount,
+        ringCount,
+        partCount,
+        geometryCount,
+    ) = _header.unpack_from(data)
+    if magic != _magic:
+        raise ValueError('The data is not a packed feature collection')
+    if version != _packedVersion:
+        raise ValueError(
+            f'Unsupported packed feature collection version {version}'
+        )
+    offset = _header.size
+    table = loads(bytes(data[offset : offset + tableSize]).decode('utf-8'))
+    offset += tableSize
+
+    arrays = []
+    for dtype, count in [
+        ('<f8', 2 * coordCount),
+        ('<i8', ringCount),
+        ('<i8', partCount),
+        ('<i8', geometryCount),
+    ]:
+        array = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+        offset += array.nbytes
+        if copy:
+            # copy the array so it doesn't depend on (or share) the buffer
+            array = array.astype(dtype[1:])
+        arrays.append(array)
+    arrays[0] = arrays[0].reshape((coordCount, 2))
+    return _build_collection(table, *arrays, columnar=columnar)
+
+
+def _reduce(fc):
+    """
+    Reduce a feature collection for pickling, with the coordinates of its
+    geometries packed into flat arrays and everything else pickled as
+    usual, so that properties of any type are restored exactly
+    """
+    try:
+        table, arrays = _pack(fc, exact=True)
+    except (KeyError, TypeError):
+        # e.g. features missing required properties or with unhashable
+        # object types, components or authors
+        return FeatureCollection, (fc.features, fc.otherProperties)
+    return _from_reduced, (table, *arrays)
+
+
+def _from_reduced(table, coords, ringOffsets, partOffsets, geometryOffsets):
+    """
+    Restore a feature collection reduced with ``_reduce()``
+    """
+    return _build_collection(
+        table, coords, ringOffsets, partOffsets, geometryOffsets, columnar=None
+    )
+
+
+def _build_collection(
+    table, coords, ringOffsets, partOffsets, geometryOffsets, columnar
+):
+    """
+    Build a feature collection from a table and the coordinate and offset
+    arrays of the packed geometries
+    """
+    geometryKinds = table['geometryKinds']
+    geomTypes = _from_list(table['geomTypes'])
+    geometryOther = _get_column(table, 'geometryOther', len(geometryKinds))
+    tableGeometries = {
+        index: geometry for index, geometry in table['tableGeometries']
+    }
+    names = table['names']
+    tags = _from_list(table['tags'])
+    objectTypes = _from_list(table['objectTypes'])
+    components = _from_list(table['components'])
+    authors = _from_list(table['authors'])
+    extraProperties = _get_column(table, 'extraProperties', len(names))
+    other = _get_column(table, 'other', len(names))
+
+    ringOffsetList = ringOffsets.tolist()
+    partOffsetList = partOffsets.tolist()
+    geometryOffsetList = geometryOffsets.tolist()
+    coordList = None
+
+    features = []
+    packedIndex = 0
+    with paused_garbage_collection():
+        for index, kind in enumerate(geometryKinds):
+            if kind == _tableGeometry:
+                geometry = tableGeometries[index]
+            else:
+                geomType = geomTypes[index]
+                partStart = geometryOffsetList[packedIndex]
+                partEnd = geometryOffsetList[packedIndex + 1]
+                packedIndex += 1
+                ringStart = partOffsetList[partStart]
+                ringEnd = partOffsetList[partEnd]
+                if columnar or (
+                    columnar is None and kind == _columnarGeometry
+                ):
+                    coordStart = ringOffsetList[ringStart]
+                    coordEnd = ringOffsetList[ringEnd]
+                    geometry = ColumnarGeometry(
+                        geomType,
+                        coords[coordStart:coordEnd],
+                        ringOffsets[ringStart : ringEnd + 1] - coordStart,
+                        partOffsets[partStart : partEnd + 1] - ringStart,
+                        geometryOther[index],
+                    )
+                else:
+                    if coordList is None:
+                        coordList = coords.tolist()
+                    coordinates = _build_coordinates(
+                        geomType,
+                        coordList,
+                        ringOffsetList[ringStart : ringEnd + 1],
+                        [
+                            partOffset - ringStart
+                            for partOffset in partOffsetList[
+                                partStart : partEnd + 1
+                            ]
+                        ],
+                    )
+                    geometry = {'type': geomType, 'coordinates': coordinates}
+                    if geometryOther[index] is not None:
+                        geometry.update(geometryOther[index])
+            features.append(
+                Feature(
+                    names[index],
+                    objectTypes[index],
+                    components[index],
+                    geometry,
+                    tags[index],
+                    authors[index],
+                    extraProperties[index],
+                    other[index],
+                )
+            )
+    return FeatureCollection(features, table['otherProperties'])
+
+
+class _SharedBuffer(object):
+    """
+    The bytes of a shared memory block as a read-only NumPy array interface,
+    so that arrays viewing the block keep it open and it is closed once the
+    last of them is gone
+    """
+
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    def __init__(self, sharedMemory):
+        self.sharedMemory = sharedMemory
+        # the address comes from a temporary array, which must not outlive
+        # this call because it would keep the block from being closed
+        address = np.frombuffer(sharedMemory.buf, dtype=np.uint8).ctypes.data
+        self.__array_interface__ = {
+            'shape': (sharedMemory.size,),
+            'typestr': '|u1',
+            'data': (address, True),
+            'version': 3,
+        }
+
+
+class _Codes(object):
+    """
+    A dictionary encoding of a column of values that are often repeated,
+    with each distinct value stored once and a code for each row
+    """
+
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    def __init__(self):
+        self._codesByValue = dict()
+        self.values = []
+        self.codes = []
+
+    def add(self, value):
+        code = self._codesByValue.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codesByValue[value] = code
+            self.values.append(value)
+        self.codes.append(code)
+
+    def to_list(self):
+        return [self.values, self.codes]
+
+
+class _Arrays(object):
+    """
+    The flat coordinate and offset arrays of packed geometries, built up
+    one geometry at a time without making a columnar geometry for each
+    """
+
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    def __init__(self):
+        self._coordChunks = []
+        # coordinates from nested lists that are not yet in a chunk
+        self._pending = []
+        self._ringCounts = []
+        self._partCounts = []
+        self._geometryCounts = []
+
+    def add_lists(self, geometry, exact=False):
+        """
+        Add a geometry with nested lists of 2D coordinates, returning
+        whether it could be added.  If ``exact``, the geometry is only added
+        if it will be unpacked exactly as it is.
+        """
+        try:
+            geomType = geometry['type']
+            parts = _get_parts(geomType, geometry['coordinates'])
+        except (KeyError, TypeError):
+            return False
+        if geomType not in _geomTypes:
+            return False
+        if exact and not _has_nested_lists(geometry, parts):
+            return False
+
+        pending = self._pending
+        ringCounts = self._ringCounts
+        partCounts = self._partCounts
+        coordStart = len(pending)
+        ringStart = len(ringCounts)
+        partStart = len(partCounts)
+        try:
+            for part in parts:
+                for ring in part:
+                    ringCounts.append(len(ring))
+                    pending.extend(chain.from_iterable(ring))
+                partCounts.append(len(part))
+            valid = len(pending) - coordStart == 2 * sum(
+                ringCounts[ringStart:]
+            )
+            if exact and valid:
+                # integers, for example, would be unpacked as floats
+                valid = set(map(type, pending[coordStart:])) <= {float}
+        except TypeError:
+            valid = False
+        if not valid:
+            del pending[coordStart:]
+            del ringCounts[ringStart:]
+            del partCounts[partStart:]
+            return False
+        self._geometryCounts.append(len(parts))
+        return True
+
+    def add_columnar(self, geometry):
+        """
+        Add a columnar geometry
+        """
+        self._flush()
+        self._coordChunks.append(geometry.coords)
+        self._ringCounts.extend(np.diff(geometry.ringOffsets).tolist())
+        self._partCounts.extend(np.diff(geometry.partOffsets).tolist())
+        self._geometryCounts.append(len(geometry.partOffsets) - 1)
+
+    def finish(self):
+        """
+        Get the coordinates and the offsets of each ring, part and geometry
+        """
+        self._flush()
+        coords = np.concatenate([np.zeros((0, 2))] + self._coordChunks)
+        arrays = [coords.astype('<f8')]
+        for counts in [
+            self._ringCounts,
+            self._partCounts,
+            self._geometryCounts,
+        ]:
+            offsets = np.zeros(len(counts) + 1, dtype='<i8')
+            offsets[1:] = np.cumsum(counts)
+            arrays.append(offsets)
+        return arrays
+
+    def _flush(self):
+        """
+        Put the pending coordinates from nested lists into a chunk
+        """
+        if len(self._pending) > 0:
+            self._coordChunks.append(
+                np.array(self._pending, dtype=np.float64).reshape((-1, 2))
+            )
+            self._pending = []
+
+
+def _has_nested_lists(geometry, parts):
+    """
+    Whether a geometry is a dictionary starting with ``type`` and
+    ``coordinates`` whose coordinates are nested lists (not tuples), as they
+    are when the geometry is unpacked
+    """
+    if (
+        type(geometry) is not dict
+        or list(geometry)[:2] != ['type', 'coordinates']
+        or type(geometry['coordinates']) is not list
+    ):
+        return False
+    for part in parts:
+        if type(part) is not list:
+            return False
+        for ring in part:
+            if type(ring) is not list or not set(map(type, ring)) <= {list}:
+                return False
+    return True
+
+
+def _from_list(encoded):
+    """
+    Decode a dictionary-encoded column
+    """
+    values, codes = encoded
+    return [values[code] for code in codes]
+
+
+def _none_if_empty(values):
+    """
+    Store a column that is all ``None`` as a single ``None``
+    """
+    if all(value is None for value in values):
+        return None
+    return values
+
+
+def _get_column(table, key, count):
+    """
+    Get a column that may have been stored as a single ``None``
+    """
+    values = table[key]
+    if values is None:
+        return [None] * count
+    return values
@@ -10,6 +10,7 @@ import shutil as shutil
 import warnings as warnings
 from contextlib import contextmanager as contextmanager
 
+import shapely as shapely
 from pytest import fixture as fixture
 
 try:
@@ -31,6 +32,29 @@ try:
 except ImportError:
     has_numpy = False
 
+try:
+    import pyarrow as pyarrow
+
+    has_pyarrow = True
+except ImportError:
+    has_pyarrow = False
+
+try:
+    # python >= 3.14
+    from compression import zstd as zstd
+
+    has_zstd = True
+except ImportError:
+    try:
+        import zstandard as zstandard
+
+        has_zstd = True
+    except ImportError:
+        has_zstd = False
+
+# coverage simplification requires shapely >= 2.1
+has_coverage_simplify = hasattr(shapely, 'coverage_simplify')
+
 
 def requires_lxml(test):
     return test if has_lxml else unittest.skip('requires lxml')(test)
@@ -40,6 +64,22 @@ def requires_numpy(test):
     return test if has_numpy else unittest.skip('requires numpy')(test)
 
 
+def requires_pyarrow(test):
+    return test if has_pyarrow else unittest.skip('requires pyarrow')(test)
+
+
+def requires_zstd(test):
+    return test if has_zstd else unittest.skip('requires zstandard')(test)
+
+
+def requires_coverage_simplify(test):
+    return (
+        test
+        if has_coverage_simplify
+        else unittest.skip('requires shapely >= 2.1')(test)
+    )
+
+
 # Adapted from
 # http://stackoverflow.com/questions/29627341/pytest-where-to-store-expected-data
 @fixture
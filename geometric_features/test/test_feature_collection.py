@@ -1,16 +1,39 @@
 import json
+import math
 import os
+import pickle
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import resource_tracker
+from unittest import mock
 
+import numpy as np
 import pytest
 import shapely
 import shapely.geometry
 
+import geometric_features
 from geometric_features import (
+    ColumnarGeometry,
+    Feature,
     FeatureCollection,
     GeometricFeatures,
+    get_json_backend,
+    get_json_backends,
+    iter_features,
+    open_feature_file,
     read_feature_collection,
+    set_json_backend,
+)
+from geometric_features.feature_collection import _round_coords
+from geometric_features.test import (  # noqa: F401
+    TestCase,
+    loaddatadir,
+    requires_coverage_simplify,
+    requires_pyarrow,
+    requires_zstd,
 )
-from geometric_features.test import TestCase, loaddatadir  # noqa: F401
 
 
 @pytest.mark.usefixtures('loaddatadir')
@@ -71,6 +94,406 @@ class TestFeatureCollection(TestCase):
         feature = fc.features[0]
         self.check_feature(feature)
 
+    def test_iter_features(self):
+        """
+        Test iterating over the features in a file one at a time
+        """
+        fc1 = self.read_feature()
+        fc2 = self.read_feature('Aegean_Sea')
+        fc1.merge(fc2)
+        fc1.set_group_name('testGroupName')
+        dest_filename = str(self.datadir.join('test.geojson'))
+        fc1.to_geojson(dest_filename)
+
+        otherProperties = {}
+        names = [
+            feature['properties']['name']
+            for feature in iter_features(dest_filename, otherProperties)
+        ]
+        assert names == ['Adriatic Sea', 'Aegean Sea']
+        assert otherProperties['groupName'] == 'testGroupName'
+        assert 'type' not in otherProperties
+
+    def test_from_iter(self):
+        """
+        Test constructing a feature collection from a filtered iterator
+        """
+        fc = self.read_feature()
+        fc.merge(self.read_feature('Aegean_Sea'))
+        dest_filename = str(self.datadir.join('test.geojson'))
+        fc.to_geojson(dest_filename)
+
+        features = (
+            feature
+            for feature in iter_features(dest_filename)
+            if feature['properties']['name'] == 'Adriatic Sea'
+        )
+        fc_check = FeatureCollection.from_iter(
+            features, otherProperties={'groupName': 'testGroupName'}
+        )
+        assert len(fc_check.features) == 1
+        self.check_feature(fc_check.features[0])
+        assert fc_check.otherProperties['groupName'] == 'testGroupName'
+
+    def test_read_columnar(self):
+        """
+        Test reading features into columnar geometries and writing them back
+        """
+        fc = self.read_feature()
+        filename = str(self.datadir.join('test.geojson'))
+        fc.to_geojson(filename, stripHistory=True)
+
+        fc_columnar = read_feature_collection(filename, columnar=True)
+        geometry = fc_columnar.features[0]['geometry']
+        assert isinstance(geometry, ColumnarGeometry)
+        self.check_feature(fc_columnar.features[0])
+        assert (
+            geometry['coordinates']
+            == fc.features[0]['geometry']['coordinates']
+        )
+
+        columnar_filename = str(self.datadir.join('test_columnar.geojson'))
+        fc_columnar.to_geojson(columnar_filename, stripHistory=True)
+        with open(filename) as f1, open(columnar_filename) as f2:
+            assert f1.read() == f2.read()
+
+    def test_columnar_operations(self):
+        """
+        Test that operations on columnar features produce columnar features
+        with the same geometry
+        """
+        fc = FeatureCollection()
+        fc_columnar = FeatureCollection()
+        for region in ['Global_Ocean', 'Aegean_Sea']:
+            filename = f'./geometric_data/ocean/region/{region}/region.geojson'
+            fc.merge(read_feature_collection(filename))
+            fc_columnar.merge(read_feature_collection(filename, columnar=True))
+        mask = self.read_feature()
+
+        results = [fc.difference(mask), fc_columnar.difference(mask)]
+        results.append(fc.simplify(0.1))
+        results.append(fc_columnar.simplify(0.1))
+        results.append(fc.combine('Combined'))
+        results.append(fc_columnar.combine('Combined'))
+        for index in range(0, len(results), 2):
+            for feature, columnar_feature in zip(
+                results[index].features,
+                results[index + 1].features,
+                strict=True,
+            ):
+                assert isinstance(
+                    columnar_feature['geometry'], ColumnarGeometry
+                )
+                shape = shapely.geometry.shape(feature['geometry'])
+                columnar_shape = shapely.geometry.shape(
+                    columnar_feature['geometry']
+                )
+                assert shape.equals_exact(columnar_shape, 0.0)
+
+    def test_to_bytes(self):
+        """
+        Test packing feature collections into bytes and pickling them
+        """
+        fc = self.read_feature()
+        fc.merge(
+            read_feature_collection(
+                './geometric_data/ocean/region/Aegean_Sea/region.geojson',
+                columnar=True,
+            )
+        )
+        fc.set_group_name('testGroupName')
+        fc.features[0]['bbox'] = [12.0, 40.0, 20.0, 46.0]
+        fc.features[1]['geometry'].other['bbox'] = [23.0, 35.0, 28.0, 41.0]
+        # a plain dictionary feature with a geometry that can't be packed
+        # into arrays
+        fc.features.append(
+            {
+                'type': 'Feature',
+                'properties': {
+                    'name': 'Collection',
+                    'tags': 'a;b',
+                    'object': 'point',
+                    'component': 'test',
+                    'author': 'Me',
+                    'history': 'made up',
+                },
+                'geometry': {
+                    'type': 'GeometryCollection',
+                    'geometries': [
+                        {'type': 'Point', 'coordinates': [1.0, 2.0]}
+                    ],
+                },
+            }
+        )
+
+        def as_json(fc):
+            return json.dumps(
+                [feature['properties'] for feature in fc.features]
+                + [fc.otherProperties],
+                default=dict,
+                sort_keys=True,
+            )
+
+        data = fc.to_bytes()
+        for fc_check in [
+            FeatureCollection.from_bytes(data),
+            pickle.loads(pickle.dumps(fc)),
+        ]:
+            assert as_json(fc_check) == as_json(fc)
+            assert fc_check.features[0]['bbox'] == [12.0, 40.0, 20.0, 46.0]
+            for feature, check in zip(
+                fc.features, fc_check.features, strict=True
+            ):
+                assert type(feature['geometry']) is type(check['geometry'])
+                assert shapely.geometry.shape(feature['geometry']).equals(
+                    shapely.geometry.shape(check['geometry'])
+                )
+            assert (
+                fc_check.features[0]['geometry'] == fc.features[0]['geometry']
+            )
+            assert fc_check.features[1]['geometry']['bbox'] == [
+                23.0,
+                35.0,
+                28.0,
+                41.0,
+            ]
+
+        fc_columnar = FeatureCollection.from_bytes(data, columnar=True)
+        assert isinstance(
+            fc_columnar.features[0]['geometry'], ColumnarGeometry
+        )
+        fc_lists = FeatureCollection.from_bytes(data, columnar=False)
+        assert isinstance(fc_lists.features[1]['geometry'], dict)
+        assert (
+            fc_lists.features[1]['geometry']['coordinates']
+            == fc.features[1]['geometry']['coordinates']
+        )
+
+        assert (
+            FeatureCollection.from_bytes(
+                FeatureCollection().to_bytes()
+            ).features
+            == []
+        )
+        with pytest.raises(ValueError):
+            FeatureCollection.from_bytes(b'not packed' * 10)
+
+    def test_pickle_properties(self):
+        """
+        Test that pickling restores properties and geometries that aren't
+        json-compatible exactly
+        """
+        fc = self.read_feature()
+        properties = fc.features[0]['properties']
+        properties['pair'] = (1, 2)
+        properties['lookup'] = {1: 'one', 2: 'two'}
+        properties['value'] = np.float32(1.5)
+        fc.otherProperties['levels'] = (3, 4)
+        fc.add_feature(
+            {
+                'type': 'Feature',
+                'properties': {
+                    'name': 'Tuple Point',
+                    'object': 'point',
+                    'component': 'ocean',
+                },
+                'geometry': {'type': 'Point', 'coordinates': (1.0, 2.0)},
+            }
+        )
+        fc.add_feature(
+            {
+                'type': 'Feature',
+                'properties': {
+                    'name': 'Integer Line',
+                    'object': 'transect',
+                    'component': 'ocean',
+                },
+                'geometry': {
+                    'type': 'LineString',
+                    'coordinates': [[1, 2], [3, 4]],
+                },
+            }
+        )
+
+        fc_check = pickle.loads(pickle.dumps(fc))
+        properties = fc_check.features[0]['properties']
+        assert properties['pair'] == (1, 2)
+        assert properties['lookup'] == {1: 'one', 2: 'two'}
+        assert type(properties['value']) is np.float32
+        assert properties['value'] == np.float32(1.5)
+        assert fc_check.otherProperties == fc.otherProperties
+        for feature, check in zip(fc.features, fc_check.features, strict=True):
+            assert check['properties'] == feature['properties']
+            assert check['geometry'] == feature['geometry']
+        coordinates = fc_check.features[1]['geometry']['coordinates']
+        assert type(coordinates) is tuple
+        coordinates = fc_check.features[2]['geometry']['coordinates']
+        assert type(coordinates[0][0]) is int
+
+        # packing into bytes stores the properties as json, so they must be
+        # json-compatible
+        with pytest.raises(TypeError):
+            fc.to_bytes()
+
+    def test_shared_memory(self):
+        """
+        Test attaching to a feature collection in shared memory, both in
+        this process and in worker processes
+        """
+        fc = read_feature_collection(
+            './geometric_data/ocean/region/Aegean_Sea/region.geojson'
+        )
+        fc.merge(self.read_feature())
+        areas = [shape.area for shape in fc.get_shapes()]
+
+        sharedMemory = fc.to_shared_memory()
+        try:
+            fc_shared = FeatureCollection.from_shared_memory(sharedMemory)
+            assert [feature['properties'] for feature in fc.features] == [
+                feature['properties'] for feature in fc_shared.features
+            ]
+            geometry = fc_shared.features[0]['geometry']
+            assert isinstance(geometry, ColumnarGeometry)
+            assert not geometry.coords.flags.writeable
+            assert [shape.area for shape in fc_shared.get_shapes()] == areas
+
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                for workerAreas in executor.map(
+                    _get_shared_areas, [sharedMemory.name] * 2
+                ):
+                    assert workerAreas == areas
+
+            # an unrelated process that attaches must not unlink the block
+            # when it exits
+            packageDir = os.path.dirname(
+                os.path.dirname(os.path.abspath(geometric_features.__file__))
+            )
+            env = dict(os.environ)
+            env['PYTHONPATH'] = os.pathsep.join(
+                [packageDir] + env.get('PYTHONPATH', '').split(os.pathsep)
+            )
+            code = (
+                'from geometric_features import FeatureCollection; '
+                f'FeatureCollection.from_shared_memory({sharedMemory.name!r})'
+            )
+            subprocess.run([sys.executable, '-c', code], env=env, check=True)
+            fc_attached = FeatureCollection.from_shared_memory(
+                sharedMemory.name
+            )
+            assert len(fc_attached.features) == len(fc.features)
+        finally:
+            sharedMemory.close()
+            sharedMemory.unlink()
+
+        # the attached features keep the shared memory open after the
+        # original block has been unlinked
+        assert [
+            shape.area
+            for shape in FeatureCollection(fc_shared.features).get_shapes()
+        ] == areas
+
+    def test_shared_memory_threads(self):
+        """
+        Test that making and attaching to shared memory in many threads at
+        once registers exactly the blocks that were made with the resource
+        tracker
+        """
+        fc = self.read_feature()
+        register = resource_tracker.register
+        registered = []
+
+        def record(name, rtype):
+            if rtype == 'shared_memory':
+                registered.append(name)
+            register(name, rtype)
+
+        def make_and_attach(index):
+            sharedMemory = fc.to_shared_memory()
+            fc_shared = FeatureCollection.from_shared_memory(sharedMemory)
+            assert len(fc_shared.features) == 1
+            return sharedMemory
+
+        with mock.patch.object(resource_tracker, 'register', record):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                blocks = list(executor.map(make_and_attach, range(64)))
+        try:
+            assert sorted(registered) == sorted(
+                block._name for block in blocks
+            )
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+        assert resource_tracker.register is register
+
+    def test_compact_feature(self):
+        """
+        Test that features are stored compactly but still behave like
+        geojson dictionaries
+        """
+        fc = self.read_feature()
+        feature = fc.features[0]
+        assert isinstance(feature, Feature)
+        assert feature.name == 'Adriatic Sea'
+        assert feature.tags == ('Adriatic_Sea', 'Mediterranean_Basin')
+        assert feature.objectType == 'region'
+
+        properties = feature['properties']
+        assert list(properties)[0:5] == [
+            'name',
+            'tags',
+            'object',
+            'component',
+            'author',
+        ]
+        assert properties['tags'] == 'Adriatic_Sea;Mediterranean_Basin'
+        assert feature['type'] == 'Feature'
+        assert list(feature) == ['type', 'properties', 'geometry']
+
+        geojson = feature.to_geojson()
+        assert isinstance(geojson['properties'], dict)
+        assert geojson == feature
+        assert Feature.from_geojson(geojson) == feature
+
+        properties['tags'] = 'Adriatic_Sea'
+        properties['extra'] = [1, 2]
+        feature['bbox'] = [0.0, 1.0, 2.0, 3.0]
+        assert feature.tags == ('Adriatic_Sea',)
+        assert feature.extraProperties['extra'] == [1, 2]
+        assert list(feature) == ['type', 'properties', 'bbox', 'geometry']
+        with pytest.raises(KeyError):
+            del properties['name']
+        with pytest.raises(KeyError):
+            del feature['geometry']
+        del properties['extra']
+        del feature['bbox']
+        assert 'extra' not in properties
+        assert 'bbox' not in feature
+
+        feature['properties'] = {
+            'name': 'Sea',
+            'object': 'region',
+            'component': 'ocean',
+        }
+        assert dict(feature['properties']) == {
+            'name': 'Sea',
+            'tags': '',
+            'object': 'region',
+            'component': 'ocean',
+            'author': '',
+        }
+
+        # other members are kept even if the feature has no type
+        geojson = {
+            'id': 1,
+            'properties': {'name': 'Sea', 'object': 'region', 'component': ''},
+            'geometry': feature['geometry'],
+        }
+        feature = Feature.from_geojson(geojson)
+        assert feature.other == {'id': 1}
+        assert list(feature) == ['type', 'properties', 'id', 'geometry']
+        assert Feature.from_geojson(feature.to_geojson()) == feature
+
     def test_copy_features(self):
         """
         Test copying the features in a feature collection
@@ -102,6 +525,62 @@ class TestFeatureCollection(TestCase):
         self.check_feature(fc1.features[0])
         self.check_feature(fc1.features[1], expected_name='Aegean Sea')
 
+    def test_add_features(self):
+        """
+        Test adding several features to a collection at once
+        """
+        fc1 = self.read_feature()
+        fc2 = self.read_feature('Aegean_Sea')
+
+        for validate in ['full', 'fast', 'none']:
+            fc = FeatureCollection()
+            # duplicates are only added once
+            fc.add_features(
+                [fc1.features[0], fc2.features[0], fc1.features[0]],
+                validate=validate,
+            )
+            assert [
+                feature['properties']['name'] for feature in fc.features
+            ] == ['Adriatic Sea', 'Aegean Sea']
+            assert 'Aegean Sea' in fc
+            self.check_feature(fc['Adriatic Sea'])
+            # the features are copies that can be changed independently
+            fc.tag(['new'])
+            assert 'new' not in fc1.features[0]['properties']['tags']
+
+        # the geometry is only put into the standard order with full
+        # validation
+        feature = fc1.features[0].to_geojson()
+        feature['geometry'] = {
+            'coordinates': feature['geometry']['coordinates'],
+            'type': 'Polygon',
+        }
+        fc = FeatureCollection()
+        fc.add_features([feature], validate='fast')
+        assert list(fc.features[0]['geometry']) == ['coordinates', 'type']
+        fc = FeatureCollection()
+        fc.add_features([feature])
+        assert list(fc.features[0]['geometry']) == ['type', 'coordinates']
+
+        # all errors are reported and no features are added
+        missing_object = fc2.features[0].to_geojson()
+        missing_object['properties'] = dict(missing_object['properties'])
+        del missing_object['properties']['object']
+        wrong_object = fc2.features[0].copy()
+        wrong_object['properties']['object'] = 'point'
+        fc = FeatureCollection()
+        with pytest.raises(ValueError) as excinfo:
+            fc.add_features([fc1.features[0], missing_object, wrong_object])
+        message = str(excinfo.value)
+        assert message.startswith('2 invalid feature(s)')
+        assert 'Feature Aegean Sea missing [properties][object] key' in message
+        assert 'Object type point and geometry type Polygon' in message
+        assert len(fc.features) == 0
+        assert 'Adriatic Sea' not in fc
+
+        with pytest.raises(ValueError):
+            fc.add_features(fc1.features, validate='some')
+
     def test_merge(self):
         """
         Test merging 2 feature collections
@@ -120,6 +599,217 @@ class TestFeatureCollection(TestCase):
         self.check_feature(fc1.features[0])
         self.check_feature(fc1.features[1], expected_name='Aegean Sea')
 
+    def test_get_by_name(self):
+        """
+        Test looking up features by name as features are added
+        """
+        fc1 = self.read_feature()
+        fc2 = self.read_feature('Aegean_Sea')
+
+        assert 'Adriatic Sea' in fc1
+        assert 'Aegean Sea' not in fc1
+        self.check_feature(fc1['Adriatic Sea'])
+        with pytest.raises(KeyError):
+            fc1['Aegean Sea']
+
+        fc1.merge(fc2)
+        self.check_feature(fc1['Aegean Sea'], expected_name='Aegean Sea')
+
+        # features passed to the constructor or appended directly
+        fc = FeatureCollection(list(fc2.features))
+        assert 'Aegean Sea' in fc
+        fc.features.append(fc1.features[0])
+        self.check_feature(fc['Adriatic Sea'])
+
+        # features replaced in place or all at once
+        fc.features[1] = fc2.features[0]
+        assert 'Adriatic Sea' not in fc
+        fc.features = list(fc1.features)
+        assert 'Adriatic Sea' in fc
+        assert 'Aegean Sea' in fc
+
+    def test_select(self):
+        """
+        Test selecting features by name, tags, component, object type and
+        bounding box
+        """
+        fc = self.read_feature()
+        fc.merge(self.read_feature('Aegean_Sea'))
+        fc.merge(self.read_feature('Baltic_Sea'))
+        fc.retag(
+            add=['Adriatic_and_Aegean'], where=['Adriatic Sea', 'Aegean Sea']
+        )
+
+        def names(fc_selected):
+            return [
+                feature['properties']['name']
+                for feature in fc_selected.features
+            ]
+
+        assert names(fc.select()) == [
+            'Adriatic Sea',
+            'Aegean Sea',
+            'Baltic Sea',
+        ]
+        assert names(
+            fc.select(featureNames=['Baltic Sea', 'Adriatic Sea'])
+        ) == ['Baltic Sea', 'Adriatic Sea']
+        assert names(fc.select(tags=['Adriatic_and_Aegean'])) == [
+            'Adriatic Sea',
+            'Aegean Sea',
+        ]
+        assert names(
+            fc.select(tags=['Adriatic_and_Aegean', 'Baltic_Sea'])
+        ) == ['Adriatic Sea', 'Aegean Sea', 'Baltic Sea']
+        assert names(
+            fc.select(tags='Adriatic_and_Aegean;Aegean_Sea', allTags=True)
+        ) == ['Aegean Sea']
+        assert names(
+            fc.select(
+                featureNames=['Baltic Sea', 'Aegean Sea'],
+                tags=['Adriatic_and_Aegean'],
+            )
+        ) == ['Aegean Sea']
+        assert names(
+            fc.select(componentName='ocean', objectType='region')
+        ) == ['Adriatic Sea', 'Aegean Sea', 'Baltic Sea']
+        assert names(fc.select(componentName='landice')) == []
+        assert names(fc.select(objectType='point')) == []
+        assert names(fc.select(bbox=(10.0, 50.0, 30.0, 70.0))) == [
+            'Baltic Sea'
+        ]
+        assert names(
+            fc.select(
+                tags=['Adriatic_and_Aegean'], bbox=(23.0, 35.0, 30.0, 45.0)
+            )
+        ) == ['Aegean Sea']
+        with pytest.raises(KeyError):
+            fc.select(featureNames=['Black Sea'])
+
+        # the selected features are copies sharing their geometries and
+        # cached shapely geometries
+        shapes = fc.get_shapes()
+        fc_selected = fc.select(featureNames=['Aegean Sea'])
+        feature = fc_selected.features[0]
+        assert feature is not fc['Aegean Sea']
+        assert feature['geometry'] is fc['Aegean Sea']['geometry']
+        assert fc_selected.get_shapes()[0] is shapes[1]
+        fc_selected.tag(['selected'])
+        assert 'selected' not in fc['Aegean Sea']['properties']['tags']
+
+        # the indices are kept up to date as features are added, retagged
+        # and replaced
+        fc.retag(remove=['Adriatic_and_Aegean'], where=['Adriatic Sea'])
+        assert names(fc.select(tags=['Adriatic_and_Aegean'])) == ['Aegean Sea']
+        fc.add_feature(self.read_feature('Black_Sea').features[0])
+        assert names(fc.select(tags=['Black_Sea'])) == ['Black Sea']
+        assert names(fc.select(bbox=(30.0, 42.0, 40.0, 45.0))) == ['Black Sea']
+        fc.features[0] = fc.features[3]
+        assert names(fc.select(tags=['Adriatic_Sea'])) == []
+        assert names(fc.select(bbox=(30.0, 42.0, 40.0, 45.0))) == [
+            'Black Sea',
+            'Black Sea',
+        ]
+        # the bounding box doesn't need the spatial index
+        assert fc._sindex is None
+
+    def test_spatial_index(self):
+        """
+        Test finding features with the spatial index
+        """
+        fc = self.read_feature()
+        fc.merge(self.read_feature('Aegean_Sea'))
+        fc.merge(self.read_feature('Baltic_Sea'))
+
+        def names(fc_found):
+            return [
+                feature['properties']['name'] for feature in fc_found.features
+            ]
+
+        tree = fc.sindex
+        assert isinstance(tree, shapely.STRtree)
+        assert fc.sindex is tree
+        # the Adriatic Sea and the Aegean Sea are both in the Mediterranean
+        # but don't touch
+        transect = shapely.geometry.LineString([(15.0, 42.0), (25.0, 38.0)])
+        assert names(fc.query(transect, predicate='intersects')) == [
+            'Adriatic Sea',
+            'Aegean Sea',
+        ]
+        assert (
+            names(
+                fc.query(
+                    fc.select(featureNames=['Adriatic Sea']),
+                    predicate='touches',
+                )
+            )
+            == []
+        )
+        points = [
+            shapely.geometry.Point(20.0, 60.0),
+            shapely.geometry.Point(25.0, 38.0),
+        ]
+        assert names(fc.query(points, predicate='within')) == [
+            'Aegean Sea',
+            'Baltic Sea',
+        ]
+        point = shapely.geometry.Point(0.0, 40.0)
+        assert names(fc.nearest(point)) == ['Adriatic Sea']
+        assert names(fc.nearest(points)) == ['Aegean Sea', 'Baltic Sea']
+        assert names(fc.nearest(point, maxDistance=1.0)) == []
+
+        # the spatial index is rebuilt when features change
+        fc.add_feature(self.read_feature('Black_Sea').features[0])
+        assert fc.sindex is not tree
+        assert len(fc.sindex) == 4
+        assert names(
+            fc.query(shapely.geometry.Point(35.0, 43.0), predicate='within')
+        ) == ['Black Sea']
+
+    def test_get_shapes(self):
+        """
+        Test that shapely geometries are cached until a feature's geometry
+        is replaced and are passed on to new feature collections
+        """
+        fc = self.read_feature()
+        fc.merge(self.read_feature('Aegean_Sea'))
+        shapes = fc.get_shapes()
+        assert len(shapes) == 2
+        for feature, shape in zip(fc.features, shapes, strict=True):
+            assert shape.equals(shapely.geometry.shape(feature['geometry']))
+
+        # the same geometries are returned, prepared if requested
+        prepared_shapes = fc.get_shapes(prepare=True)
+        assert all(
+            shape is prepared_shape
+            for shape, prepared_shape in zip(
+                shapes, prepared_shapes, strict=True
+            )
+        )
+        assert all(shapely.is_prepared(prepared_shapes))
+
+        # replacing a geometry invalidates its cached shape
+        feature = fc.features[1]
+        point = shapely.geometry.Point(0.0, 0.0)
+        feature['geometry'] = shapely.geometry.mapping(point.buffer(1.0))
+        new_shapes = fc.get_shapes()
+        assert new_shapes[0] is shapes[0]
+        assert new_shapes[1] is not shapes[1]
+        assert new_shapes[1].equals(point.buffer(1.0))
+
+        fc.clear_shapes()
+        assert fc.get_shapes()[0] is not shapes[0]
+
+        simplified_fc = fc.simplify(tolerance=0.1)
+        simplified_shapes = simplified_fc.get_shapes()
+        assert simplified_shapes[1].equals(
+            shapely.geometry.shape(simplified_fc.features[1]['geometry'])
+        )
+        combined_fc = simplified_fc.combine('combined')
+        assert combined_fc.get_shapes()[0].equals(
+            shapely.union_all(simplified_shapes)
+        )
+
     def test_add_tag(self):
         """
         Test adding a tag to the features in a collection
@@ -145,6 +835,55 @@ class TestFeatureCollection(TestCase):
 
         self.check_feature(fc.features[0])
 
+    def test_retag(self):
+        """
+        Test adding and removing tags from some features in a collection
+        """
+        fc = self.read_feature(region='Adriatic_Sea')
+        fc.merge(self.read_feature(region='Aegean_Sea'))
+        # a feature with plain dictionaries, rather than a compact feature
+        fc.features.append(
+            {
+                'type': 'Feature',
+                'properties': {
+                    'name': 'Point',
+                    'tags': 'Mediterranean_Basin',
+                    'object': 'point',
+                    'component': 'ocean',
+                    'author': '',
+                },
+                'geometry': {'type': 'Point', 'coordinates': [0.0, 0.0]},
+            }
+        )
+
+        fc.retag(add='tag1;tag2', remove=['Mediterranean_Basin'])
+        assert [feature['properties']['tags'] for feature in fc.features] == [
+            'Adriatic_Sea;tag1;tag2',
+            'Aegean_Sea;tag1;tag2',
+            'tag1;tag2',
+        ]
+
+        fc.retag(
+            add=['tag3', 'tag1'], remove='tag2', where=['Aegean Sea', 'Point']
+        )
+        assert [feature['properties']['tags'] for feature in fc.features] == [
+            'Adriatic_Sea;tag1;tag2',
+            'Aegean_Sea;tag1;tag3',
+            'tag1;tag3',
+        ]
+
+        fc.retag(
+            remove=['tag1'],
+            where=lambda feature: 'tag2' in feature['properties']['tags'],
+        )
+        assert fc.features[0].tags == ('Adriatic_Sea', 'tag2')
+        assert fc.features[1].tags == ('Aegean_Sea', 'tag1', 'tag3')
+
+        # a single feature name
+        fc.retag(add='tag4', where='Adriatic Sea')
+        assert fc.features[0].tags == ('Adriatic_Sea', 'tag2', 'tag4')
+        assert fc.features[1].tags == ('Aegean_Sea', 'tag1', 'tag3')
+
     def test_set_group_name(
         self,
         componentName='ocean',
@@ -213,6 +952,65 @@ class TestFeatureCollection(TestCase):
             expected_type='MultiPolygon',
         )
 
+    def test_combine_coverage(self):
+        """
+        Test combining regions that share boundaries as a coverage and in
+        pools of processes and threads
+        """
+        # a 4 x 4 grid of square regions that share their edges
+        fc = FeatureCollection()
+        for x in range(4):
+            for y in range(4):
+                fc.add_feature(
+                    {
+                        'type': 'Feature',
+                        'properties': {
+                            'name': f'Square {x} {y}',
+                            'object': 'region',
+                            'component': 'ocean',
+                        },
+                        'geometry': {
+                            'type': 'Polygon',
+                            'coordinates': [
+                                [
+                                    [x, y],
+                                    [x + 1, y],
+                                    [x + 1, y + 1],
+                                    [x, y + 1],
+                                    [x, y],
+                                ]
+                            ],
+                        },
+                    }
+                )
+        expected = fc.combine('Combined').get_shapes()[0]
+        assert isinstance(expected, shapely.geometry.Polygon)
+        assert expected.area == pytest.approx(16.0)
+
+        shape = fc.combine('Combined', coverage=True).get_shapes()[0]
+        assert shape.is_valid
+        assert shape.symmetric_difference(expected).area == 0.0
+
+        for executor in ['process', 'thread']:
+            shape = fc.combine(
+                'Combined', maxWorkers=2, executor=executor
+            ).get_shapes()[0]
+            assert shape.symmetric_difference(expected).area == 0.0
+        with pytest.raises(ValueError):
+            fc.combine('Combined', maxWorkers=2, executor='unknown')
+
+        shape = fc.combine('Combined', gridSize=0.5).get_shapes()[0]
+        assert shape.symmetric_difference(expected).area == 0.0
+
+        # overlapping regions are not a coverage, so they are combined with
+        # an overlay union instead
+        fc = self.read_feature('Global_Ocean')
+        fc.merge(self.read_feature())
+        expected = fc.combine('Combined').get_shapes()[0]
+        shape = fc.combine('Combined', coverage=True).get_shapes()[0]
+        assert shape.is_valid
+        assert shape.symmetric_difference(expected).area < 1e-10
+
     def test_difference(self):
         """
         Test removing a mask feature from another feature
@@ -239,6 +1037,81 @@ class TestFeatureCollection(TestCase):
         assert isinstance(shape, shapely.geometry.Polygon)
         assert len(shape.interiors) == 1
 
+    def test_difference_multiple_masks(self):
+        """
+        Test masking features with several masks, some of which cover
+        features entirely
+        """
+        fc = self.read_feature('Global_Ocean')
+        fc.merge(self.read_feature('Aegean_Sea'))
+        fc.merge(self.read_feature())
+        mask = self.read_feature()
+        mask.merge(self.read_feature('Aegean_Sea'))
+
+        difference = fc.difference(maskingFC=mask)
+        assert [
+            feature['properties']['name'] for feature in difference.features
+        ] == ['Global Ocean']
+        shape = difference.get_shapes()[0]
+        assert isinstance(shape, shapely.geometry.Polygon)
+        assert len(shape.interiors) == 2
+        expected = fc.get_shapes()[0]
+        for maskShape in mask.get_shapes():
+            expected = expected.difference(maskShape)
+        assert shape.symmetric_difference(expected).area < 1e-10
+
+        # masking in pools of processes and threads gives the same features
+        for executor in ['process', 'thread']:
+            difference = fc.difference(
+                maskingFC=mask, maxWorkers=2, executor=executor
+            )
+            assert [
+                feature['properties']['name']
+                for feature in difference.features
+            ] == ['Global Ocean']
+            assert difference.get_shapes()[0].equals_exact(shape, 0.0)
+        with pytest.raises(ValueError):
+            fc.difference(maskingFC=mask, maxWorkers=2, executor='unknown')
+
+        # masking with no masks leaves every feature unchanged
+        difference = fc.difference(maskingFC=FeatureCollection())
+        for feature, check in zip(
+            fc.features, difference.features, strict=True
+        ):
+            assert feature['geometry'] is check['geometry']
+
+    def test_copy_on_write(self):
+        """
+        Test that unchanged features share their geometry with the original
+        collection and that changing their properties doesn't affect it
+        """
+        fc = self.read_feature('Global_Ocean')
+        fc.merge(self.read_feature('Aegean_Sea'))
+        mask = self.read_feature()
+        difference = fc.difference(maskingFC=mask)
+        simplified = fc.simplify()
+        fixed = FeatureCollection(fc.features[1:]).fix_antimeridian()
+        for result in [difference, simplified, fixed]:
+            result.tag(['new_tag'])
+            assert 'new_tag' in result.features[-1].tags
+
+        # the global ocean is masked, but the Aegean Sea is unchanged
+        assert (
+            difference.features[0]['geometry']
+            is not fc.features[0]['geometry']
+        )
+        assert difference.features[1]['geometry'] is fc.features[1]['geometry']
+        assert (
+            fixed.features[0]['geometry']['coordinates']
+            is fc.features[1]['geometry']['coordinates']
+        )
+        assert (
+            simplified.features[1]['geometry']
+            is not fc.features[1]['geometry']
+        )
+        for feature in fc.features:
+            assert 'new_tag' not in feature.tags
+
     def test_fix_antimeridian(self):
         """
         Test splitting a feature that crosses the antimeridian (date line) into
@@ -289,6 +1162,74 @@ class TestFeatureCollection(TestCase):
         # make sure the fixed polygons are within -180 to 180 deg. lon.
         assert shapely.covers(globe_shape, shape)
 
+    def test_fix_antimeridian_batch(self):
+        """
+        Test splitting the features in a collection that cross the
+        antimeridian in both hemispheres, leaving the others alone
+        """
+        fc = self.read_feature()
+        boxes = {
+            'Antarctic Box': (170.0, 190.0, -80.0, -70.0),
+            'Arctic Box': (-190.0, -170.0, 70.0, 80.0),
+            'Bering Box': (165.0, 175.0, 55.0, 65.0),
+        }
+        for name, (lonMin, lonMax, latMin, latMax) in boxes.items():
+            fc.add_feature(
+                {
+                    'type': 'Feature',
+                    'properties': {
+                        'name': name,
+                        'object': 'region',
+                        'component': 'ocean',
+                    },
+                    'geometry': {
+                        'type': 'Polygon',
+                        'coordinates': [
+                            [
+                                [lonMin, latMin],
+                                [lonMax, latMin],
+                                [lonMax, latMax],
+                                [lonMin, latMax],
+                                [lonMin, latMin],
+                            ]
+                        ],
+                    },
+                }
+            )
+        fixed = fc.fix_antimeridian()
+        assert [
+            feature['properties']['name'] for feature in fixed.features
+        ] == [feature['properties']['name'] for feature in fc.features]
+        for index in [1, 2]:
+            assert fixed.features[index]['geometry']['type'] == 'MultiPolygon'
+        # features that don't cross the antimeridian share their geometry
+        for index in [0, 3]:
+            assert (
+                fixed.features[index]['geometry']
+                is fc.features[index]['geometry']
+            )
+
+        # the features are split just as they would be on their own
+        for feature, shape in zip(
+            fc.features, fixed.get_shapes(), strict=True
+        ):
+            single = FeatureCollection([feature]).fix_antimeridian()
+            assert single.get_shapes()[0].equals_exact(shape, 0.0)
+            bounds = shape.bounds
+            assert bounds[0] >= -180.0 and bounds[2] <= 180.0
+
+        # columnar features are still columnar after they are split
+        fc_columnar = FeatureCollection.from_bytes(
+            fc.to_bytes(), columnar=True
+        )
+        fixed_columnar = fc_columnar.fix_antimeridian()
+        for feature in fixed_columnar.features:
+            assert isinstance(feature['geometry'], ColumnarGeometry)
+        for shape, expected in zip(
+            fixed_columnar.get_shapes(), fixed.get_shapes(), strict=True
+        ):
+            assert shape.equals(expected)
+
     def test_simplify(self):
         """
         Test simplifying a feature to remove redundant points
@@ -338,6 +1279,97 @@ class TestFeatureCollection(TestCase):
         simplified_shape = shapely.geometry.shape(geom)
         assert len(simplified_shape.exterior.coords) == 5
 
+    def test_simplify_tolerances(self):
+        """
+        Test simplifying features with a tolerance for each feature and in
+        pools of processes and threads
+        """
+        fc = self.read_feature()
+        fc.merge(self.read_feature('Aegean_Sea'))
+        fc.merge(self.read_feature('Global_Ocean'))
+        shapes = fc.get_shapes()
+
+        simplified = fc.simplify({'Adriatic Sea': 0.5, 'Global Ocean': 0.1})
+        simplified_shapes = simplified.get_shapes()
+        assert shapely.get_num_coordinates(
+            simplified_shapes[0]
+        ) < shapely.get_num_coordinates(shapes[0])
+        assert simplified_shapes[0].equals_exact(shapes[0].simplify(0.5), 0.0)
+        assert simplified_shapes[2].equals_exact(shapes[2].simplify(0.1), 0.0)
+        # the Aegean Sea has no tolerance so it isn't simplified
+        assert simplified.features[1]['geometry'] is fc.features[1]['geometry']
+
+        with pytest.raises(ValueError):
+            fc.simplify(0.1, preserveTopology='unknown')
+
+        expected = fc.simplify(0.1).get_shapes()
+        for executor in ['process', 'thread']:
+            simplified = fc.simplify(0.1, maxWorkers=2, executor=executor)
+            for shape, expected_shape in zip(
+                simplified.get_shapes(), expected, strict=True
+            ):
+                assert shape.equals_exact(expected_shape, 0.0)
+
+    @requires_coverage_simplify
+    def test_simplify_coverage(self):
+        """
+        Test simplifying regions that share a boundary together, so they
+        still share it afterwards
+        """
+        # two regions that share a wiggly boundary along x = 0, and a point
+        edge = [[0.3 * math.sin(index), 0.1 * index] for index in range(101)]
+        fc = FeatureCollection()
+        for name, coordinates in [
+            ('West', [[-5.0, 0.0]] + edge + [[-5.0, 10.0], [-5.0, 0.0]]),
+            ('East', [[5.0, 0.0], [5.0, 10.0]] + edge[::-1] + [[5.0, 0.0]]),
+        ]:
+            fc.add_feature(
+                {
+                    'type': 'Feature',
+                    'properties': {
+                        'name': name,
+                        'object': 'region',
+                        'component': 'ocean',
+                    },
+                    'geometry': {
+                        'type': 'Polygon',
+                        'coordinates': [coordinates],
+                    },
+                }
+            )
+        fc.add_feature(
+            {
+                'type': 'Feature',
+                'properties': {
+                    'name': 'Point',
+                    'object': 'point',
+                    'component': 'ocean',
+                },
+                'geometry': {'type': 'Point', 'coordinates': [1.0, 1.0]},
+            }
+        )
+        regions = fc.get_shapes()[0:2]
+        assert shapely.coverage_is_valid(regions)
+
+        # simplifying the regions separately leaves a gap between them
+        separate = fc.simplify(0.5).get_shapes()[0:2]
+        assert shapely.union_all(separate).area < 99.0
+
+        simplified = fc.simplify(0.5, preserveTopology='coverage')
+        shapes = simplified.get_shapes()
+        assert shapely.coverage_is_valid(shapes[0:2])
+        assert (
+            shapely.get_num_coordinates(shapes[0:2]).sum()
+            < shapely.get_num_coordinates(regions).sum()
+        )
+        # no gaps or overlaps
+        assert shapes[0].area + shapes[1].area == pytest.approx(100.0)
+        assert shapely.union_all(shapes[0:2]).area == pytest.approx(100.0)
+        assert shapes[2].equals(fc.get_shapes()[2])
+
+        with pytest.raises(ValueError):
+            fc.simplify({'West': 0.5}, preserveTopology='coverage')
+
     def test_feature_in_collection(self):
         """
         Test whether a given feature is in a feature collection
@@ -361,6 +1393,230 @@ class TestFeatureCollection(TestCase):
         fc_check = read_feature_collection(dest_filename)
         self.check_feature(fc_check.features[0])
 
+    def test_to_geojson_compressed(self):
+        """
+        Test writing a feature collection to gzip-compressed geojson files
+        and reading them back
+        """
+        self.check_compressed('gz')
+
+    @requires_zstd
+    def test_to_geojson_zstd(self):
+        """
+        Test writing a feature collection to zstandard-compressed geojson
+        files and reading them back
+        """
+        self.check_compressed('zst')
+
+    def check_compressed(self, compression):
+        """
+        Check writing a feature collection to compressed geojson files and
+        reading them back
+
+        Parameters
+        ----------
+        compression : {'gz', 'zst'}
+            The type of compression
+        """
+        fc = self.read_feature()
+        filename = str(self.datadir.join('test.geojson'))
+        fc.to_geojson(filename, stripHistory=True)
+        with open(filename) as f:
+            expected = f.read()
+        fc = read_feature_collection(filename)
+        for compression_level in [None, 1]:
+            compressed_filename = f'{filename}.{compression}'
+            fc.to_geojson(
+                compressed_filename,
+                stripHistory=True,
+                compressionLevel=compression_level,
+            )
+            with open(compressed_filename, 'rb') as f:
+                assert f.read() != expected.encode('utf-8')
+            with open_feature_file(compressed_filename) as f:
+                assert f.read() == expected
+            fc_check = read_feature_collection(compressed_filename)
+            assert fc_check.features == fc.features
+            assert fc_check.otherProperties == fc.otherProperties
+
+    def test_to_geojson_format(self):
+        """
+        Test that writing features matches formatting the whole collection
+        with ``json.dumps()`` and leaves the features unchanged
+        """
+        fc = self.read_feature()
+        fc.merge(self.read_feature('Aegean_Sea'))
+        fc.features[0]['properties']['history'] = 'previous'
+        fc.add_feature(
+            {
+                'type': 'Feature',
+                'properties': {
+                    'name': 'Point',
+                    'component': 'ocean',
+                    'object': 'point',
+                },
+                'geometry': {'type': 'Point', 'coordinates': [1, 2.1234567]},
+            }
+        )
+        fc.add_feature(
+            {
+                'type': 'Feature',
+                'properties': {
+                    'name': 'Line 3D',
+                    'component': 'ocean',
+                    'object': 'transect',
+                },
+                'geometry': {
+                    'type': 'LineString',
+                    'coordinates': [[0.0, 1.0, 2.0000004], [3.5, 4.5, 5.5]],
+                },
+            }
+        )
+        fc.set_group_name('testGroupName')
+        features = json.loads(
+            json.dumps([feature.to_geojson() for feature in fc.features])
+        )
+
+        for indent in [4, None, 0]:
+            dest_filename = str(self.datadir.join('test.geojson'))
+            fc.to_geojson(dest_filename, stripHistory=True, indent=indent)
+            assert fc.features == features
+
+            expected = dict(fc.otherProperties)
+            expected['features'] = json.loads(json.dumps(features))
+            for feature in expected['features']:
+                feature['properties'].pop('history', None)
+                geometry = feature['geometry']
+                geometry['coordinates'] = _round_coords(
+                    geometry['coordinates']
+                )
+            with open(dest_filename) as f:
+                assert f.read() == json.dumps(expected, indent=indent)
+
+        dest_filename = str(self.datadir.join('test.geojson'))
+        fc.to_geojson(dest_filename)
+        assert fc.features == features
+        fc_check = read_feature_collection(dest_filename)
+        history = fc_check.features[0]['properties']['history']
+        assert history.startswith('previous ')
+        assert 'history' in fc_check.features[1]['properties']
+
+    @requires_pyarrow
+    def test_parquet(self):
+        """
+        Test writing features to GeoParquet and Arrow IPC files and reading
+        them back
+        """
+        fc = self.read_feature()
+        fc.merge(self.read_feature('Aegean_Sea'))
+        # properties that are null are different from missing properties
+        fc.features[0]['properties']['count'] = 3
+        fc.features[0]['properties']['note'] = None
+        fc.features[1]['properties']['count'] = None
+        fc.features[1]['properties']['extra'] = ['a', 1]
+        fc.set_group_name('testGroupName')
+        filename = str(self.datadir.join('test.geojson'))
+        fc.to_geojson(filename, stripHistory=True)
+
+        for encoding in [None, 'WKB', 'geoarrow']:
+            table = fc.to_arrow(geometryEncoding=encoding)
+            geo = json.loads(table.schema.metadata[b'geo'])
+            expected = 'WKB' if encoding == 'WKB' else 'polygon'
+            assert geo['columns']['geometry']['encoding'] == expected
+
+            parquet_filename = str(self.datadir.join('test.parquet'))
+            fc.to_parquet(parquet_filename, geometryEncoding=encoding)
+            ipc_filename = str(self.datadir.join('test.arrow'))
+            fc.to_arrow_ipc(ipc_filename, geometryEncoding=encoding)
+            for fc_check in [
+                FeatureCollection.from_arrow(table),
+                FeatureCollection.from_parquet(parquet_filename),
+                FeatureCollection.from_arrow_ipc(ipc_filename),
+                FeatureCollection.from_parquet(
+                    parquet_filename, columnar=True
+                ),
+            ]:
+                assert fc_check.otherProperties['groupName'] == (
+                    'testGroupName'
+                )
+                assert 'extra' not in fc_check.features[0]['properties']
+                assert fc_check.features[1]['properties']['extra'] == [
+                    'a',
+                    1,
+                ]
+                assert fc_check.features[0]['properties']['note'] is None
+                assert 'note' not in fc_check.features[1]['properties']
+                assert fc_check.features[0]['properties']['count'] == 3
+                assert fc_check.features[1]['properties']['count'] is None
+                check_filename = str(self.datadir.join('test_check.geojson'))
+                fc_check.to_geojson(check_filename, stripHistory=True)
+                with open(filename) as f1, open(check_filename) as f2:
+                    assert f1.read() == f2.read()
+
+        fc_check = FeatureCollection.from_parquet(
+            parquet_filename, columns=['tags']
+        )
+        self.check_feature(fc_check.features[0])
+        assert 'tags' in fc_check.features[0]['properties']
+        # validation fills in an empty author if it wasn't read
+        assert fc_check.features[0]['properties']['author'] == ''
+
+        fc.merge(
+            FeatureCollection(
+                [
+                    {
+                        'type': 'Feature',
+                        'properties': {
+                            'name': 'Point',
+                            'component': 'ocean',
+                            'object': 'point',
+                        },
+                        'geometry': {'type': 'Point', 'coordinates': [1, 2]},
+                    }
+                ]
+            )
+        )
+        with pytest.raises(ValueError):
+            fc.to_arrow(geometryEncoding='geoarrow')
+        fc_check = FeatureCollection.from_arrow(fc.to_arrow())
+        assert fc_check.features[2]['geometry']['coordinates'] == [1.0, 2.0]
+
+    def test_json_backends(self):
+        """
+        Test that all available json backends read and write identically
+        """
+        fc = self.read_feature()
+        fc.merge(self.read_feature('Aegean_Sea'))
+        # ascii characters that the json module escapes
+        fc.features[1]['properties']['note'] = 'a\tb\x7f'
+
+        expected = {}
+        try:
+            for backend in reversed(get_json_backends()):
+                set_json_backend(backend)
+                assert get_json_backend() == backend
+                for compact in [False, True]:
+                    dest_filename = str(
+                        self.datadir.join(f'test_{backend}_{compact}.geojson')
+                    )
+                    fc.to_geojson(
+                        dest_filename, stripHistory=True, compact=compact
+                    )
+                    with open(dest_filename) as f:
+                        text = f.read()
+                    if backend == 'json':
+                        expected[compact] = text
+                    assert text == expected[compact]
+
+                    fc_check = read_feature_collection(dest_filename)
+                    assert len(fc_check.features) == 2
+                    self.check_feature(fc_check.features[0])
+        finally:
+            set_json_backend()
+
+        with pytest.raises(ValueError):
+            set_json_backend('not_a_backend')
+
     def test_to_geojson_without_user_env(self):
         """
         Test writing a feature when username environment variables are unset
@@ -409,3 +1665,11 @@ class TestFeatureCollection(TestCase):
 
         dest_filename = str(self.datadir.join('plot.png'))
         fig.savefig(dest_filename)
+
+
+def _get_shared_areas(name):
+    """
+    Get the areas of the features in a feature collection in shared memory
+    """
+    fc = FeatureCollection.from_shared_memory(name)
+    return [shape.area for shape in fc.get_shapes()]
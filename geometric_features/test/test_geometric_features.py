@@ -1,8 +1,17 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import pytest
 
-from geometric_features import GeometricFeatures
+from geometric_features import (
+    ColumnarGeometry,
+    FeatureCollection,
+    GeometricFeatures,
+)
+from geometric_features.bundle import FeatureBundle
+from geometric_features.catalog_cache import CatalogCache
+from geometric_features.geometric_features import _get_file_name
 from geometric_features.test import TestCase, loaddatadir  # noqa: F401
 
 
@@ -99,6 +108,71 @@ class TestGeometricFeatures(TestCase):
             expected_type=object_type,
         )
 
+    def test_read_parallel(
+        self,
+        component='ocean',
+        object_type='region',
+        tag='Mediterranean_Basin',
+    ):
+        """
+        Read features in pools of threads and processes and check that they
+        are the same and in the same order as when they are read serially
+
+        Parameters
+        ----------
+         component : str, optional
+            The component from which to retrieve the feature
+
+        object_type : {'point', 'transect', 'region'}, optional
+            The type of geometry to load, a point (0D), transect (1D) or region
+            (2D)
+
+        tag : str, optional
+            The name of a tag to read
+        """
+        gf = GeometricFeatures()
+        fc = gf.read(
+            componentName=component, objectType=object_type, tags=[tag]
+        )
+        feature_names = list(
+            reversed(
+                [feature['properties']['name'] for feature in fc.features]
+            )
+        )
+        fc = gf.read(
+            component,
+            object_type,
+            feature_names,
+            useCache=False,
+            useBundle=False,
+        )
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for kwargs in [
+                dict(maxWorkers=2, executor='thread'),
+                dict(maxWorkers=2),
+                dict(executor=executor),
+            ]:
+                fc_parallel = gf.read(
+                    component,
+                    object_type,
+                    feature_names,
+                    useCache=False,
+                    useBundle=False,
+                    **kwargs,
+                )
+                assert fc_parallel.features == fc.features
+
+        with pytest.raises(ValueError):
+            gf.read(
+                component,
+                object_type,
+                feature_names,
+                useCache=False,
+                useBundle=False,
+                maxWorkers=2,
+                executor='fork',
+            )
+
     def test_read_all_tag(
         self,
         component='ocean',
@@ -171,6 +245,56 @@ class TestGeometricFeatures(TestCase):
             path = f'{self.datadir}/{component}/{object_type}/{subdir}/{object_type}.geojson'  # noqa: E501
             assert os.path.exists(path)
 
+    def test_split_compressed(
+        self,
+        component='ocean',
+        object_type='region',
+        tag='Mediterranean_Basin',
+    ):
+        """
+        Split features into compressed files and check that they are read
+        back in, both directly and from a binary cache and a bundle
+
+        Parameters
+        ----------
+         component : str, optional
+            The component from which to retrieve the feature
+
+        object_type : {'point', 'transect', 'region'}, optional
+            The type of geometry to load, a point (0D), transect (1D) or region
+            (2D)
+
+        tag : str, optional
+            The name of a tag to read
+        """
+        fc = GeometricFeatures().read(
+            componentName=component, objectType=object_type, tags=[tag]
+        )
+        cache_location = str(self.datadir)
+        gf = GeometricFeatures(cacheLocation=cache_location)
+        gf.split(fc, destinationDir=cache_location, compression='gz')
+        feature_names = [
+            feature['properties']['name'] for feature in fc.features
+        ]
+        for feature_name in feature_names:
+            file_name = os.path.join(
+                cache_location,
+                _get_file_name(component, object_type, feature_name),
+            )
+            assert not os.path.exists(file_name)
+            assert os.path.exists(f'{file_name}.gz')
+
+        fc_compressed = gf.read(component, object_type, feature_names)
+        assert fc_compressed.features == fc.features
+
+        gf.build_cache(component, object_type)
+        gf.build_bundles(component, object_type)
+        for use_bundle in [False, True]:
+            fc_compressed = gf.read(
+                component, object_type, feature_names, useBundle=use_bundle
+            )
+            assert fc_compressed.features == fc.features
+
     def test_read_by_name_from_outside_repo_data_dir(
         self, component='ocean', object_type='region', feature='Celtic Sea'
     ):
@@ -208,3 +332,191 @@ class TestGeometricFeatures(TestCase):
             expected_component=component,
             expected_type=object_type,
         )
+
+    def test_build_cache(
+        self,
+        component='ocean',
+        object_type='region',
+        tag='Mediterranean_Basin',
+    ):
+        """
+        Build a binary cache of a few features and check that reading from it
+        gives the same features as reading from the geojson files, falling
+        back on the files that have changed
+
+        Parameters
+        ----------
+         component : str, optional
+            The component from which to retrieve the feature
+
+        object_type : {'point', 'transect', 'region'}, optional
+            The type of geometry to load, a point (0D), transect (1D) or region
+            (2D)
+
+        tag : str, optional
+            The name of a tag to read
+        """
+        fc = GeometricFeatures().read(
+            componentName=component, objectType=object_type, tags=[tag]
+        )
+        cache_location = str(self.datadir)
+        gf = GeometricFeatures(cacheLocation=cache_location)
+        gf.split(fc, destinationDir=cache_location)
+        feature_names = [
+            feature['properties']['name'] for feature in fc.features
+        ]
+        gf.build_cache()
+
+        cache = CatalogCache.open(cache_location, component, object_type)
+        assert cache is not None
+        assert isinstance(cache.coords, np.memmap)
+
+        fc_geojson = gf.read(
+            component, object_type, feature_names, useCache=False
+        )
+        fc_cache = gf.read(component, object_type, feature_names)
+        assert fc_cache.features == fc_geojson.features
+
+        fc_columnar = gf.read(
+            component, object_type, feature_names, columnar=True
+        )
+        for feature, columnar_feature in zip(
+            fc_geojson.features, fc_columnar.features, strict=True
+        ):
+            geometry = columnar_feature['geometry']
+            assert isinstance(geometry, ColumnarGeometry)
+            assert (
+                geometry['coordinates'] == feature['geometry']['coordinates']
+            )
+
+        # a file with a new modification time but the same contents is
+        # still read from the cache
+        filename = os.path.join(
+            cache_location,
+            _get_file_name(component, object_type, feature_names[0]),
+        )
+        os.utime(filename, ns=(0, 0))
+        assert cache.read(filename) is not None
+
+        # a modified file is read from the geojson file
+        modified = FeatureCollection([fc.features[0]])
+        modified.features[0]['properties']['tags'] = 'modified'
+        modified.to_geojson(filename, stripHistory=True)
+        assert cache.read(filename) is None
+        fc_check = gf.read(component, object_type, feature_names)
+        assert fc_check.features[0]['properties']['tags'] == 'modified'
+        assert fc_check.features[1:] == fc_geojson.features[1:]
+
+        # rebuilding the cache with fewer features leaves the memory-mapped
+        # coordinates of features read earlier intact
+        os.remove(
+            os.path.join(
+                cache_location,
+                _get_file_name(component, object_type, feature_names[-1]),
+            )
+        )
+        gf.build_cache()
+        for feature, columnar_feature in zip(
+            fc_geojson.features, fc_columnar.features, strict=True
+        ):
+            assert (
+                columnar_feature['geometry']['coordinates']
+                == feature['geometry']['coordinates']
+            )
+
+    def test_build_bundles(
+        self,
+        component='ocean',
+        object_type='region',
+        tag='Mediterranean_Basin',
+    ):
+        """
+        Build a single-file bundle of a few features and check that reading
+        from it gives the same features as reading from the geojson files,
+        falling back on the files that have changed
+
+        Parameters
+        ----------
+         component : str, optional
+            The component from which to retrieve the feature
+
+        object_type : {'point', 'transect', 'region'}, optional
+            The type of geometry to load, a point (0D), transect (1D) or region
+            (2D)
+
+        tag : str, optional
+            The name of a tag to read
+        """
+        fc = GeometricFeatures().read(
+            componentName=component, objectType=object_type, tags=[tag]
+        )
+        cache_location = str(self.datadir)
+        gf = GeometricFeatures(cacheLocation=cache_location)
+        gf.split(fc, destinationDir=cache_location)
+        feature_names = [
+            feature['properties']['name'] for feature in fc.features
+        ]
+        gf.build_bundles(component, object_type)
+
+        bundle = FeatureBundle.open(cache_location, component, object_type)
+        assert bundle is not None
+        assert all(name in bundle for name in feature_names)
+
+        fc_geojson = gf.read(
+            component, object_type, feature_names, useBundle=False
+        )
+
+        filenames = [
+            os.path.join(
+                cache_location, _get_file_name(component, object_type, name)
+            )
+            for name in feature_names
+        ]
+        for name in feature_names:
+            assert bundle.is_current(name)
+
+        for columnar in [False, True]:
+            fc_bundle = gf.read(
+                component,
+                object_type,
+                list(reversed(feature_names)),
+                columnar=columnar,
+            )
+            assert len(fc_bundle.features) == len(fc_geojson.features)
+            for feature, bundle_feature in zip(
+                reversed(fc_geojson.features), fc_bundle.features, strict=True
+            ):
+                assert bundle_feature['properties'] == feature['properties']
+                geometry = bundle_feature['geometry']
+                assert isinstance(geometry, ColumnarGeometry) == columnar
+                assert (
+                    geometry['coordinates']
+                    == feature['geometry']['coordinates']
+                )
+
+        # a file with a new modification time but the same contents is
+        # still read from the bundle
+        os.utime(filenames[0], ns=(0, 0))
+        assert bundle.is_current(feature_names[0])
+
+        # a modified file is only read from the geojson file if the bundle
+        # is verified
+        modified = FeatureCollection([fc.features[0]])
+        modified.features[0]['properties']['tags'] = 'modified'
+        modified.to_geojson(filenames[0], stripHistory=True)
+        assert not bundle.is_current(feature_names[0])
+        fc_check = gf.read(component, object_type, feature_names)
+        assert fc_check.features == fc_geojson.features
+        fc_check = gf.read(
+            component, object_type, feature_names, verifyBundle=True
+        )
+        assert fc_check.features[0]['properties']['tags'] == 'modified'
+        assert fc_check.features[1:] == fc_geojson.features[1:]
+
+        # features in the bundle are read without their files being checked
+        # for or downloaded
+        os.remove(filenames[1])
+        assert not bundle.is_current(feature_names[1])
+        fc_check = gf.read(component, object_type, feature_names)
+        assert fc_check.features == fc_geojson.features
+        assert not os.path.exists(filenames[1])
@@ -1,10 +1,30 @@
 import datetime
+import gc
 import glob
+import gzip
 import json
 import os
 import socket
 import sys
 from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    # python >= 3.14
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# the extensions of (possibly compressed) geojson files
+geojsonExtensions = ['.geojson', '.geojson.gz', '.geojson.zst']
+
+# the default compression levels, the same as the command-line tools
+_defaultCompressionLevels = {'gz': 6, 'zst': 3}
 
 
 def write_feature_names_and_tags(cacheLocation='./geometry_data', quiet=False):
@@ -25,13 +45,17 @@ def write_feature_names_and_tags(cacheLocation='./geometry_data', quiet=False):
     # -------
     # Xylar Asay-Davis
     outFileName = 'features_and_tags.json'
-    fileNames = sorted(glob.glob(f'{cacheLocation}/*/*/*/*.geojson'))
+    fileNames = sorted(
+        fileName
+        for fileName in glob.glob(f'{cacheLocation}/*/*/*/*.geojson*')
+        if fileName.endswith(tuple(geojsonExtensions))
+    )
 
     allFeaturesAndTags = OrderedDict()
     for fileName in fileNames:
         if not quiet:
             print(fileName)
-        with open(fileName) as f:
+        with open_feature_file(fileName) as f:
             features = json.load(f)['features']
             feature = features[0]
             featureName = feature['properties']['name']
@@ -71,3 +95,112 @@ def provenance_command():
     sep = ' : '
     provstr = sep.join([curtime, host, user, cwd, call]) + ';'
     return provstr
+
+
+@contextmanager
+def paused_garbage_collection():
+    """
+    A context manager that pauses cyclic garbage collection, used while
+    creating many lists and dictionaries (e.g. coordinates) that can't
+    contain reference cycles, so there is no point in the garbage collector
+    repeatedly scanning (potentially millions of) new objects
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def open_feature_file(fileName, mode='r', compressionLevel=None):
+    """
+    Open a geojson file for reading or writing text, transparently
+    (de)compressing the file in a streaming fashion if its name ends with
+    ``.gz`` (gzip) or ``.zst`` (zstandard)
+
+    Parameters
+    ----------
+    fileName : str
+        The file to open
+
+    mode : {'r', 'w'}, optional
+        Whether to open the file for reading or writing
+
+    compressionLevel : int, optional
+        The compression level to use when writing a compressed file, 6 for
+        gzip and 3 for zstandard by default
+
+    Returns
+    -------
+    f : file
+        A file object for reading or writing text
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    compression = get_compression(fileName)
+    if compression is None:
+        return open(fileName, mode)
+
+    if compressionLevel is None:
+        compressionLevel = _defaultCompressionLevels[compression]
+    writing = mode == 'w'
+
+    if compression == 'gz':
+        if writing:
+            return gzip.open(
+                fileName,
+                'wt',
+                compresslevel=compressionLevel,
+                encoding='utf-8',
+            )
+        return gzip.open(fileName, 'rt', encoding='utf-8')
+
+    if zstd is not None:
+        if writing:
+            return zstd.open(
+                fileName, 'wt', level=compressionLevel, encoding='utf-8'
+            )
+        return zstd.open(fileName, 'rt', encoding='utf-8')
+    if zstandard is not None:
+        if writing:
+            compressor = zstandard.ZstdCompressor(level=compressionLevel)
+            return zstandard.open(
+                fileName, 'wt', cctx=compressor, encoding='utf-8'
+            )
+        return zstandard.open(fileName, 'rt', encoding='utf-8')
+    raise ImportError(
+        f'The zstandard package (or python >= 3.14) is '
+        f'required to read or write {fileName}'
+    )
+
+
+def get_compression(fileName):
+    """
+    Get the compression of a file from its extension
+
+    Parameters
+    ----------
+    fileName : str
+        The file name
+
+    Returns
+    -------
+    compression : {'gz', 'zst', None}
+        The type of compression, or ``None`` if the file is not compressed
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    for compression in ['gz', 'zst']:
+        if fileName.endswith(f'.{compression}'):
+            return compression
+    return None